@@ -1,897 +1,4866 @@
 '''
     This program contains functions to manipulate images.
     It contains the following methods in the class netpbm: __init__, readHeader, readPGMPixels,
-    ReadPPMPixels, isPGM, getMagicNumber, getNumCols, getComment, getNumRows, getMaxLevel, getHeader,
-    getPixels, writeImage, writeHeader, writePixels, changeBrightness, invert, rotate, flip, posterize,
-    crop, toGrayscale, and glass. Details of each are provided in
-    function comments below.
+    ReadPPMPixels, readRaster, isPGM, isBinary, getMagicNumber, getNumCols, getComment, getNumRows,
+    getMaxLevel, getHeader, getPixels, getPixelView, getRaster, copy, aopen, awrite, arun,
+    setLazy, writeImage, toBytes, writeHeader, writePixels, changeBrightness, invert, gamma, levels, curves,
+    rotate, rotate180, rotateFile, flip, posterize, crop, toGrayscale, glass, boxBlur, gaussianBlur,
+    unsharpMask, sobel, median, histogram, statistics, percentile, autoLevels, equalize, threshold,
+    resize, mipmaps, and parallel. Details of each are provided in function comments below.
+
+    Plain (ASCII) P2/P3 files and raw (binary) P5/P6 files with 8 or 16 bit samples are
+    supported. Raw files are memory-mapped and their pixel payload is kept as a zero-copy
+    memoryview until an operation needs to change it. Passing a region to the constructor
+    loads just that part of an image, decoding only its rows. Plain files get a row index,
+    saved next to them as a .rowidx file (see setRowIndex), which lets a region be parsed
+    from the nearest indexed row and lets several processes parse one file (workers).
+
+    An image opened with lazy=True records its operations and runs them together, as one
+    remap of the pixel positions and one pass over the sample values, when the pixels are
+    next needed. The NetpbmStream class processes images too large for memory a strip at a time.
+
+    Pixels are stored in compact typed arrays from the standard library array module rather
+    than lists of Python integers: one array for a PGM file and one each for red, green and
+    blue for a PPM file. Arrays hold unsigned bytes ('B') when the maximum level fits in 8 bits
+    and unsigned shorts ('H') otherwise.
+
+    setInstrumentation sends a record of every call (its duration, I/O and allocations) to
+    a sink such as a LoggingSink or a JsonLinesSink; it costs nothing while it is off.
+
+    openImage opens images through a process-wide ImageCache, which keeps recently parsed
+    images in memory (bounded in bytes, least recently used first out) and hands out
+    copy-on-write copies of them.
+
+    setDiskCache (or the NETPBM_CACHE_DIR environment variable) keeps the decoded pixels of
+    plain files in sidecar files, so that later openings map them instead of parsing text.
+
+    Coroutines can open, change and write images without blocking their event loop with
+    Netpbm.aopen, awrite and arun, which share an executor behind a concurrency limiter.
+
+    Images can be read from and written to bytes, binary file objects and the standard
+    input and output pipes as well as files (see toBytes), so the class works as a filter.
+
+    Run as a program it applies a recipe of operations to a batch of files, or to standard
+    input as a filter; see main.
 
     Authors: Kyle Sprague (ksprague@bates.edu)
 
     Date Written: December 13 2021
 '''
 
+import argparse
+import asyncio
+import collections
+import contextvars
+import functools
+import glob
+import hashlib
+import inspect
+import io
+import itertools
+import json
+import logging
+import math
+import mmap
+import operator
+import os
 import random
-import copy
+import re
+import stat
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import shared_memory
+
+#magic numbers understood by the class, and how many channels each one has
+PGM_MAGIC_NUMBERS = ("P2", "P5")
+PPM_MAGIC_NUMBERS = ("P3", "P6")
+BINARY_MAGIC_NUMBERS = ("P5", "P6")
+
+#plain pixel payloads are parsed in pieces of this many bytes so the text of a large
+#file never has to be held in memory all at once
+CHUNK_SIZE = 1 << 18
+
+#how many bytes after a plain payload are looked at for samples the header did not count
+PEEK_BYTES = 4096
+
+#the longest line, in characters, of a plain payload written with the default line width;
+#the Netpbm formats ask plain files to keep their lines to 70 characters
+PLAIN_LINE_LENGTH = 70
+
+#number of rows NetpbmStream reads, processes and writes at a time
+STRIP_ROWS = 64
+
+#operations that Netpbm.parallel can split into strips, with the number of rows above and
+#below each strip (given the arguments of the operation) that a worker needs to read
+PARALLEL_OPERATIONS = {
+    "changeBrightness": lambda amount: 0,
+    "invert": lambda: 0,
+    "gamma": lambda gamma: 0,
+    "levels": lambda black_level, white_level, gamma=1.0: 0,
+    "curves": lambda points: 0,
+    "posterize": lambda num_levels: 0,
+    "toGrayscale": lambda standard="rec709": 0,
+    "glass": lambda radius, mode="wrap": radius,
+    "boxBlur": lambda radius: radius,
+    "gaussianBlur": lambda sigma: sum(_gaussianRadii(sigma)),
+    "unsharpMask": lambda sigma=1.0, amount=1.0, threshold=0: sum(_gaussianRadii(sigma)),
+    "sobel": lambda: 1,
+    "median": lambda radius=1: radius,
+}
+
+#operations that use random numbers; Netpbm.parallel passes each strip its own seed
+SEEDED_OPERATIONS = ("glass",)
+
+#how glass treats offsets that fall off an edge: take the pixel from the opposite edge,
+#or from the nearest edge
+GLASS_MODES = ("wrap", "clamp")
+
+#glass radii up to this span (2*radius + 1) are displaced a whole channel at a time with
+#masks; larger ones, which would need too many masks, gather one sample at a time
+GLASS_MASK_SPAN = 64
+
+#the most bytes of pixels the process-wide ImageCache holds by default
+IMAGE_CACHE_BYTES = 256 << 20
+
+#how many row indexes of plain files, used to load a region of them (see Netpbm.__init__),
+#are kept in memory at once, and by default how many rows apart the indexed rows are
+ROW_INDEX_ENTRIES = 64
+ROW_INDEX_STRIDE = 16
+
+#the most bytes the sidecar files of the disk cache take up by default (see setDiskCache)
+DISK_CACHE_BYTES = 1 << 30
+
+#how many Netpbm.aopen, awrite and arun calls run at once in an event loop by default, and
+#the number of threads of the executor they share (None for the ThreadPoolExecutor default)
+ASYNC_MAX_CONCURRENCY = 64
+ASYNC_WORKERS = None
+
+#methods Netpbm.resize understands, and the number of fractional bits in its integer weights
+RESIZE_METHODS = ("nearest", "bilinear", "area")
+RESIZE_BITS = 12
+
+#luma standards toGrayscale understands, with the red, green and blue weights of each as
+#integers that add up to 1 << GRAY_BITS, so a gray level is a multiply-add-shift with no floats
+GRAY_BITS = 16
+GRAY_WEIGHTS = {
+    "rec709": (13933, 46871, 4732),
+    "rec601": (19595, 38470, 7471),
+    "average": (21845, 21846, 21845),
+}
+
+#raw payloads are rotated a band of source rows at a time, each band holding about this
+#many bytes so that it stays in cache while every one of its columns is read
+TILE_BYTES = 1 << 20
+
+#the position (after self) of the argument naming what a method of each class reads and
+#what it writes, a filename or a file handle, for the methods setInstrumentation wraps that
+#do I/O; every other method it wraps is charged no I/O (see INSTRUMENTED_METHODS).
+#A NetpbmStream is charged with the whole of its source file when it is opened
+INSTRUMENTED_IO = {
+    "Netpbm": {
+        "__init__": (0, None), "aopen": (0, None), "readHeader": (0, None), "readRaster": (0, None),
+        "readPGMPixels": (0, None), "readPPMPixels": (0, None), "writeImage": (None, 0),
+        "awrite": (None, 0), "writeHeader": (None, 0), "writePixels": (None, 0), "rotateFile": (0, 1),
+    },
+    "NetpbmStream": {
+        "__init__": (0, None), "writeImage": (None, 0),
+    },
+}
+
+#private methods setInstrumentation wraps besides the public ones: the constructor, and the
+#running of the operations recorded by a lazy image
+INSTRUMENTED_PRIVATE = ("__init__", "_runPlan")
+
+_COMMENT_PATTERN = re.compile(rb"#[^\n]*")
+_TOKEN_PATTERN = re.compile(rb"\S+")
+_token_tables = {}
+_level_texts = {}
+_gray_tables = {}
+_row_indexes = collections.OrderedDict()
+_peekable_readers = weakref.WeakKeyDictionary()
+_row_index_lock = threading.Lock()
+_row_index_settings = {"stride": ROW_INDEX_STRIDE, "persist": True}
+
+
+def _indexRows(image_file: 'BinaryIO', row_samples: int, num_rows: int, stride: int = 1,
+               chunk_size: int = CHUNK_SIZE) -> array:
+    '''
+    Function that finds where every stride-th row of a plain pixel payload starts, so that
+    the rows of the image can be parsed without parsing the rows above them. The payload is
+    counted a line at a time rather than parsed: only a line in which a row starts part
+    way through has the positions of its samples worked out.
+    Args:
+        image_file: BinaryIO -- the filehandle, positioned on the first byte of the payload
+        row_samples: int -- the number of samples in a row (columns times channels)
+        num_rows: int -- the number of rows
+        stride: int -- the number of rows from one indexed row to the next
+        chunk_size: int -- the number of bytes read from the file at a time
+    Returns:
+        An array of the file positions from which rows 0, stride, 2*stride... can be
+        parsed, cut short if the payload is truncated
+    '''
+    offsets = array("Q")
+    num_entries = -(-num_rows // stride)
+    position = image_file.tell()
+    if row_samples == 0:
+        return array("Q", [position]) * num_entries
+    entry_samples = row_samples * stride
+    count = 0
+    carry = b""
+    at_end = False
+    while len(offsets) < num_entries and at_end == False:
+        chunk = image_file.read(chunk_size)
+        data = carry + chunk
+        if chunk == b"":
+            at_end = True
+            cut = len(data)
+        else:
+            cut = data.rfind(b"\n") + 1
+            if cut == 0 and b"#" not in data:
+                cut = max(data.rfind(b" "), data.rfind(b"\t"), data.rfind(b"\r")) + 1
+        start = 0
+        for line in data[:cut].split(b"\n"):
+            text = line
+            if b"#" in line:
+                text = line[:line.index(b"#")]
+            num_samples = len(text.split())
+            starts = None
+            boundary = len(offsets) * entry_samples
+            while boundary < count + num_samples and len(offsets) < num_entries:
+                if boundary == count:
+                    offsets.append(position + start)
+                else: #the row starts part way through the line
+                    if starts is None:
+                        starts = [match.start() for match in _TOKEN_PATTERN.finditer(text)]
+                    offsets.append(position + start + starts[boundary - count])
+                boundary = boundary + entry_samples
+            count = count + num_samples
+            start = start + len(line) + 1
+        position = position + cut
+        carry = data[cut:]
+    return offsets
+
+
+def _typecode(max_level: int) -> str:
+    '''
+    Function that picks the array typecode able to hold every sample of an image.
+    Args:
+        max_level: int -- the maximum pixel level of the image
+    Returns:
+        'B' (unsigned 8 bit) if max_level fits in a byte, otherwise 'H' (unsigned 16 bit)
+    '''
+    if max_level < 256:
+        return 'B'
+    return 'H'
+
+
+def _tokenTable(max_level: int) -> dict:
+    '''
+    Function that returns a dictionary from the decimal text of every level between 0 and
+    max_level (as bytes) to its integer value. Looking tokens up in it is about twice as fast
+    as calling int on each of them. Tables are built once per maximum level and reused.
+    Args:
+        max_level: int -- the maximum pixel level of the image
+    Returns:
+        The lookup table as a dictionary
+    '''
+    table = _token_tables.get(max_level)
+    if table is None:
+        table = {str(level).encode("ascii"): level for level in range(max_level + 1)}
+        _token_tables[max_level] = table
+    return table
+
+
+def _samplesPattern(num_samples: int) -> 're.Pattern':
+    '''
+    Function that returns a pattern matching the first num_samples samples of a plain
+    payload, with the whitespace and comments around them, so that the end of the last of
+    them is found by a single match rather than by walking the tokens in Python.
+    Args:
+        num_samples: int -- the number of samples to match
+    Returns:
+        The compiled pattern
+    '''
+    return re.compile(rb"(?:\s*(?:#[^\n]*\s*)*[^\s#]+){%d}" % num_samples)
+
+
+def _levelTexts(typecode: str) -> list:
+    '''
+    Function that returns a list holding the decimal text (as bytes) of every value an
+    array of the given typecode can store, so that samples can be formatted by indexing
+    instead of calling str on each of them. Lists are built once per typecode and reused.
+    Args:
+        typecode: str -- 'B' or 'H', as returned by _typecode
+    Returns:
+        The list of texts, indexed by sample value
+    '''
+    texts = _level_texts.get(typecode)
+    if texts is None:
+        texts = [str(level).encode("ascii") for level in range(1 << (8 * array(typecode).itemsize))]
+        _level_texts[typecode] = texts
+    return texts
+
+
+def _grayTables(weight: int, rounding: int, width: int) -> list:
+    '''
+    Function that builds the tables _grayPlane translates one byte of a channel with: table
+    j holds byte j (from the lowest) of level * weight + rounding for every byte value, so
+    translating with each of the width tables spells out the weighted levels as fields of
+    width bytes. Tables are cached.
+    Args:
+        weight: int -- the fixed-point weight of the channel, times 256 for the high byte
+        of 16 bit samples
+        rounding: int -- a constant added to every weighted level
+        width: int -- the number of bytes in a field
+    Returns:
+        A list of width 256 byte tables
+    '''
+    key = (weight, rounding, width)
+    if key not in _gray_tables:
+        _gray_tables[key] = [bytes([((level * weight + rounding) >> (8 * j)) & 0xFF for level in range(256)])
+                             for j in range(width)]
+    return _gray_tables[key]
+
+
+def _grayPlane(byte_planes: list, standard: str, typecode: str) -> array:
+    '''
+    Function that mixes three channels into gray levels with fixed-point integer arithmetic,
+    the weighted sum of every pixel being worked out at once. Each byte of each channel is
+    translated through tables into its weighted levels, written as little-endian fields of
+    a bytearray, which is read as one big integer. The integers of every channel and byte
+    are added, and since the weights add up to 1 << GRAY_BITS no field ever carries into
+    the next, so the gray levels are the bytes of each field above GRAY_BITS. The weight of
+    red holds the rounding half, so levels are rounded to nearest.
+    Args:
+        byte_planes: list -- a (channel, significance, levels) tuple for every channel (0
+        for red, 1 for green, 2 for blue) and every byte of its samples (significance 0 for
+        the low byte, 1 for the high byte of a 16 bit sample), levels being the bytes
+        holding that byte of every sample of the channel
+        standard: str -- a key of GRAY_WEIGHTS
+        typecode: str -- the typecode of the array returned
+    Returns:
+        The gray levels as an array
+    '''
+    itemsize = array(typecode).itemsize
+    width = itemsize + GRAY_BITS // 8
+    count = len(byte_planes[0][2])
+    weights = GRAY_WEIGHTS[standard]
+    total = 0
+    for channel, significance, levels in byte_planes:
+        rounding = 0
+        if channel == 0 and significance == 0:
+            rounding = 1 << (GRAY_BITS - 1)
+        field = bytearray(width * count)
+        for j, table in enumerate(_grayTables(weights[channel] << (8 * significance), rounding, width)):
+            field[j::width] = levels.translate(table)
+        total = total + int.from_bytes(field, "little")
+    fields = total.to_bytes(width * count, "little")
+    gray = bytearray(itemsize * count)
+    for k in range(itemsize):
+        gray[k::itemsize] = fields[GRAY_BITS // 8 + k::width]
+    plane = array(typecode)
+    plane.frombytes(gray)
+    if itemsize > 1 and sys.byteorder == "big":
+        plane.byteswap()
+    return plane
+
+
+def _planeBytes(planes: list) -> list:
+    '''
+    Function that splits channel arrays into the byte planes _grayPlane takes.
+    Args:
+        planes: list -- the red, green and blue channel arrays
+    Returns:
+        A list of (channel, significance, levels) tuples
+    '''
+    byte_planes = []
+    for channel in range(len(planes)):
+        data = planes[channel].tobytes()
+        itemsize = planes[channel].itemsize
+        for k in range(itemsize):
+            significance = k if sys.byteorder == "little" else itemsize - 1 - k
+            byte_planes.append((channel, significance, data[k::itemsize] if itemsize > 1 else data))
+    return byte_planes
+
+
+#a lookup table holds the new value of every possible sample value. Tables for 8 bit
+#channel arrays are 256 byte bytes objects, so they can be applied and composed with
+#bytes.translate; tables for 16 bit channel arrays are lists of max_level + 1 integers.
+
+def _buildTable(function: 'Callable', max_level: int, typecode: str) -> 'bytes | list':
+    '''
+    Function that builds the lookup table of a function of the sample value alone by
+    calling it once for every level.
+    Args:
+        function: Callable -- takes a sample value and returns the new one
+        max_level: int -- the maximum pixel level of the image
+        typecode: str -- the typecode of the channel arrays the table will be applied to
+    Returns:
+        The lookup table, with an entry for every value the typecode can hold
+    '''
+    #values above the maximum level are not valid (loading rejects them), they are
+    #treated as the maximum
+    if typecode == 'B':
+        return bytes([function(min(value, max_level)) for value in range(256)])
+    table = [function(value) for value in range(max_level + 1)]
+    return table + table[-1:] * (65535 - max_level)
+
+
+def _checkRaster(raster: memoryview, max_level: int) -> None:
+    '''
+    Function that checks that no sample of a raw payload is above the maximum level. The
+    payload is only looked at when the maximum level leaves some sample values unused: one
+    byte samples are searched for in C, without copying a memory-mapped payload, and two
+    byte samples are decoded.
+    Args:
+        raster: memoryview -- the raw payload, in the layout returned by Netpbm.readRaster
+        max_level: int -- the maximum pixel level of the image
+    Returns:
+        Nothing. This function is nonfruitful
+    Raises:
+        ValueError: if a sample is above the maximum level
+    '''
+    if max_level == 255 or max_level == 65535 or raster.nbytes == 0:
+        return
+    if max_level < 255:
+        found = re.search(rb"[\x%02x-\xff]" % (max_level + 1), raster)
+        if found is not None:
+            raise ValueError(f"Pixel level {found.group()[0]} is above the maximum level {max_level}")
+        return
+    samples = array("H")
+    samples.frombytes(raster)
+    if sys.byteorder == "little":
+        samples.byteswap()
+    level = max(samples)
+    if level > max_level:
+        raise ValueError(f"Pixel level {level} is above the maximum level {max_level}")
+
+
+def _composeTables(first: 'bytes | list', second: 'bytes | list') -> 'bytes | list':
+    '''
+    Function that folds two lookup tables into one.
+    Args:
+        first: bytes | list -- the table applied first
+        second: bytes | list -- the table applied after it
+    Returns:
+        A table that does both in a single lookup
+    '''
+    if isinstance(first, bytes):
+        return first.translate(second)
+    return list(map(second.__getitem__, first))
+
+
+def _lookUp(plane: array, table: 'bytes | list') -> array:
+    '''
+    Function that applies a lookup table to every sample of a channel array.
+    Args:
+        plane: array -- the channel array
+        table: bytes | list -- the lookup table
+    Returns:
+        A new channel array
+    '''
+    if isinstance(table, bytes):
+        return array(plane.typecode, plane.tobytes().translate(table))
+    return array(plane.typecode, list(map(table.__getitem__, plane)))
+
+
+#a remap is a tuple (row_r, row_c, row_0, col_r, col_c, col_0) that sends the row r and
+#column c of an output image to row (row_r*r + row_c*c + row_0) and column
+#(col_r*r + col_c*c + col_0) of its source image. rotate, flip and crop are all remaps.
+IDENTITY_REMAP = (1, 0, 0, 0, 1, 0)
+
+
+def _composeRemaps(first: tuple, second: tuple) -> tuple:
+    '''
+    Function that folds two remaps into one.
+    Args:
+        first: tuple -- the remap of the operations applied first
+        second: tuple -- the remap of the operation applied after them
+    Returns:
+        The remap that does both in a single step
+    '''
+    a, b, e, c, d, f = first
+    a2, b2, e2, c2, d2, f2 = second
+    return (a*a2 + b*c2, a*b2 + b*d2, a*e2 + b*f2 + e,
+            c*a2 + d*c2, c*b2 + d*d2, c*e2 + d*f2 + f)
+
+
+def _remapPlane(plane: array, num_cols: int, remap: tuple, out_cols: int, out_rows: int) -> array:
+    '''
+    Function that builds the channel array of an output image from its source through a
+    remap. Every output row lies along a straight line through the source, so each row
+    is copied with a single extended slice instead of one pixel at a time.
+    Args:
+        plane: array -- a channel array of the source image
+        num_cols: int -- the number of columns of the source image
+        remap: tuple -- the remap from output positions to source positions
+        out_cols: int -- the number of columns of the output image
+        out_rows: int -- the number of rows of the output image
+    Returns:
+        The channel array of the output image
+    '''
+    row_r, row_c, row_0, col_r, col_c, col_0 = remap
+    if remap == (-1, 0, out_rows - 1, 0, -1, out_cols - 1) and len(plane) == out_cols * out_rows:
+        return plane[::-1] #a half turn of the whole image reverses the array
+    step = (row_c * num_cols) + col_c
+    pixel_array = array(plane.typecode)
+    if out_cols == 0:
+        return pixel_array
+    for r in range(out_rows):
+        start = ((row_r*r + row_0) * num_cols) + (col_r*r + col_0)
+        stop = start + (step * out_cols)
+        if stop < 0: #a backwards slice that ends on index 0
+            stop = None
+        pixel_array.extend(plane[start:stop:step])
+    return pixel_array
+
+
+def _rotateRaster(source: 'memoryview | bytes', num_cols: int, num_rows: int, pixel_size: int,
+                  degrees: int, destination: 'bytearray | memoryview') -> None:
+    '''
+    Function that rotates a raw P5/P6 payload clockwise by 90, 180 or 270 degrees. The
+    source is read one band of contiguous rows at a time (about TILE_BYTES each), so a
+    memory-mapped source is read front to back and the columns gathered from each band are
+    served from cache. For a quarter turn each column of a band becomes a segment of one
+    destination row, written with one extended slice per byte of the pixel; for a half turn
+    each band becomes the mirrored band at the other end of the destination.
+    Args:
+        source: memoryview | bytes -- the payload to rotate
+        num_cols: int -- the number of columns of the source image
+        num_rows: int -- the number of rows of the source image
+        pixel_size: int -- the number of bytes per pixel (1, 2, 3 or 6)
+        degrees: int -- 90, 180 or 270
+        destination: bytearray | memoryview -- a writable buffer the size of the source
+    Returns:
+        Nothing. This function is nonfruitful
+    '''
+    row_bytes = num_cols * pixel_size
+    if row_bytes == 0 or num_rows == 0:
+        return
+    band_rows = max(1, TILE_BYTES // row_bytes)
+    for first_row in range(0, num_rows, band_rows):
+        last_row = min(first_row + band_rows, num_rows)
+        height = last_row - first_row
+        band = bytes(source[first_row * row_bytes:last_row * row_bytes])
+        if degrees == 180:
+            mirrored = bytearray(len(band))
+            for k in range(pixel_size):
+                mirrored[k::pixel_size] = band[k::pixel_size][::-1]
+            start = (num_rows - last_row) * row_bytes
+            destination[start:start + len(band)] = mirrored
+            continue
+        out_row_bytes = num_rows * pixel_size
+        segment_bytes = height * pixel_size
+        for c in range(num_cols):
+            if degrees == 90: #source column c becomes destination row c, read bottom to top
+                out_start = (c * out_row_bytes) + ((num_rows - last_row) * pixel_size)
+                band_start = ((height - 1) * row_bytes) + (c * pixel_size)
+                step = -row_bytes
+            else: #source column c becomes destination row num_cols-1-c, read top to bottom
+                out_start = ((num_cols - 1 - c) * out_row_bytes) + (first_row * pixel_size)
+                band_start = c * pixel_size
+                step = row_bytes
+            for k in range(pixel_size):
+                stop = band_start + k + (step * height)
+                if stop < 0:
+                    stop = None
+                destination[out_start + k:out_start + segment_bytes:pixel_size] = band[band_start + k:stop:step]
+
+
+def _randomChoices(rng: random.Random, count: int, span: int) -> 'bytes | list':
+    '''
+    Function that draws count independent, uniformly distributed integers from 0 to
+    span - 1. Up to a span of 256 they are drawn as one block of random bytes reduced with
+    bytes.translate, and the few bytes that would make the reduction uneven are redrawn.
+    Args:
+        rng: random.Random -- the generator to draw from
+        count: int -- how many integers to draw
+        span: int -- the number of possible values
+    Returns:
+        bytes when span is at most 256, a list of integers otherwise
+    '''
+    if span > 256:
+        return rng.choices(range(span), k=count)
+    reduce = bytes(value % span for value in range(256))
+    drawn = rng.randbytes(count)
+    choices = drawn.translate(reduce)
+    limit = 256 - (256 % span)
+    if limit == 256:
+        return choices
+    choices = bytearray(choices)
+    uneven = bytes(limit) + b"\x01" * (256 - limit)
+    positions = _positionsOf(drawn.translate(uneven))
+    while len(positions) > 0:
+        drawn = rng.randbytes(len(positions))
+        for position, value in zip(positions, drawn.translate(reduce)):
+            choices[position] = value
+        positions = [positions[i] for i in _positionsOf(drawn.translate(uneven))]
+    return bytes(choices)
+
+
+def _positionsOf(flags: bytes) -> list:
+    '''
+    Function that finds the positions of the set bytes among bytes that are all 0 or 1.
+    Args:
+        flags: bytes -- the bytes to search
+    Returns:
+        A list of the positions holding 1
+    '''
+    positions = []
+    position = flags.find(1)
+    while position != -1:
+        positions.append(position)
+        position = flags.find(1, position + 1)
+    return positions
+
+
+def _padPlane(plane: array, num_cols: int, num_rows: int, radius: int, mode: str) -> bytes:
+    '''
+    Function that surrounds a channel array with radius extra rows and columns on every
+    side, taken from the opposite edge ("wrap") or repeating the nearest edge ("clamp").
+    Args:
+        plane: array -- the channel array
+        num_cols: int -- the number of columns of the image
+        num_rows: int -- the number of rows of the image
+        radius: int -- the width of the border
+        mode: str -- "wrap" or "clamp"
+    Returns:
+        The samples of the padded image in native byte order, num_cols + 2*radius per row
+    '''
+    if mode == "wrap":
+        rows = [(r - radius) % num_rows for r in range(num_rows + 2 * radius)]
+        columns = [(c - radius) % num_cols for c in range(num_cols + 2 * radius)]
+    else:
+        rows = [min(max(r - radius, 0), num_rows - 1) for r in range(num_rows + 2 * radius)]
+        columns = [min(max(c - radius, 0), num_cols - 1) for c in range(num_cols + 2 * radius)]
+    padded_rows = {}
+    for r in set(rows):
+        row = plane[r * num_cols:(r + 1) * num_cols]
+        if radius <= num_cols and mode == "wrap":
+            row = row[num_cols - radius:] + row + row[:radius]
+        elif radius <= num_cols:
+            row = array(plane.typecode, [row[0]]) * radius + row + array(plane.typecode, [row[-1]]) * radius
+        else:
+            row = array(plane.typecode, map(row.__getitem__, columns))
+        padded_rows[r] = row.tobytes()
+    return b"".join([padded_rows[r] for r in rows])
+
+
+def _displace(sources: list, itemsize: int, length: int, stride: int, choices: 'bytes | list',
+              span: int) -> list:
+    '''
+    Function that moves every sample of one or more buffers by a randomly chosen multiple
+    of stride: sample j of each result is sample j + choices[j]*stride of its source.
+    Small spans build, for each possible choice, a mask selecting the samples that made it,
+    and combine masked, shifted copies of each source with big-integer arithmetic, so the
+    work is done a whole buffer at a time. Larger spans gather the samples one by one.
+    Args:
+        sources: list -- buffers of samples in native byte order, all the same length, which
+        must be at least length + (span - 1)*stride samples
+        itemsize: int -- the number of bytes in each sample
+        length: int -- the number of samples in each result
+        stride: int -- the distance, in samples, between two consecutive choices
+        choices: bytes | list -- length integers from 0 to span - 1
+        span: int -- the number of possible choices
+    Returns:
+        A list holding the result for each source, as bytes in native byte order
+    '''
+    if span > GLASS_MASK_SPAN:
+        typecode = _typecode(256 ** itemsize - 1)
+        offsets = [choice * stride for choice in range(span)]
+        indices = array("L", map(operator.add, range(length), map(offsets.__getitem__, choices)))
+        results = []
+        for source in sources:
+            samples = array(typecode)
+            samples.frombytes(source)
+            results.append(array(typecode, map(samples.__getitem__, indices)).tobytes())
+        return results
+
+    values = [int.from_bytes(source, "little") for source in sources]
+    displaced = [0] * len(sources)
+    for choice in range(span):
+        selected = bytearray(256)
+        selected[choice] = 255
+        mask_bytes = choices.translate(selected)
+        if itemsize > 1:
+            spread = bytearray(length * itemsize)
+            for k in range(itemsize):
+                spread[k::itemsize] = mask_bytes
+            mask_bytes = spread
+        mask = int.from_bytes(mask_bytes, "little")
+        shift = 8 * itemsize * choice * stride
+        for i in range(len(values)):
+            displaced[i] = displaced[i] | ((values[i] >> shift) & mask)
+    return [value.to_bytes(length * itemsize, "little") for value in displaced]
+
+
+def _clampedRows(plane: array, num_cols: int, num_rows: int, radius: int) -> list:
+    '''
+    Function that splits a channel array into rows, adding radius copies of the first row
+    above and of the last row below, so that neighbourhood filters can read past the top
+    and bottom edges.
+    Args:
+        plane: array -- the channel array
+        num_cols: int -- the number of columns of the image
+        num_rows: int -- the number of rows of the image
+        radius: int -- the number of rows to add on each side
+    Returns:
+        A list of num_rows + 2*radius rows
+    '''
+    rows = [plane[r * num_cols:(r + 1) * num_cols] for r in range(num_rows)]
+    return [rows[0]] * radius + rows + [rows[-1]] * radius
+
+
+def _windowSums(values: 'array | list', radius: int) -> array:
+    '''
+    Function that adds up every window of 2*radius + 1 consecutive values, repeating the
+    first and last value past the ends. The sums come from differences of running totals,
+    so the cost per value does not depend on radius.
+    Args:
+        values: array | list -- the values
+        radius: int -- the number of values on each side of the centre of a window
+    Returns:
+        An array of the window sums, one per value
+    '''
+    padded = [values[0]] * radius + list(values) + [values[-1]] * radius
+    totals = list(itertools.accumulate(padded, initial=0))
+    return array("q", map(operator.sub, totals[2 * radius + 1:], totals))
+
+
+def _boxBlurPlane(plane: array, num_cols: int, num_rows: int, radius: int) -> array:
+    '''
+    Function that replaces every sample of a channel array by the mean of the
+    (2*radius + 1) square around it, rounded, with the edges of the image repeated. The
+    square is summed as running sums along each row and then down the columns, so the cost
+    per sample does not depend on radius.
+    Args:
+        plane: array -- the channel array
+        num_cols: int -- the number of columns of the image
+        num_rows: int -- the number of rows of the image
+        radius: int -- the radius of the square
+    Returns:
+        A new channel array
+    '''
+    if radius <= 0 or num_cols == 0 or num_rows == 0:
+        return array(plane.typecode, plane)
+    row_sums = [_windowSums(row, radius) for row in _clampedRows(plane, num_cols, num_rows, radius)]
+    area = (2 * radius + 1) ** 2
+    max_sum = area * (256 ** plane.itemsize - 1)
+    if max_sum < (1 << 20): #small enough to look the rounded means up
+        means = [(total + area // 2) // area for total in range(max_sum + 1)]
+        mean = lambda window: map(means.__getitem__, window)
+    else:
+        mean = lambda window: map(operator.floordiv, map(operator.add, window, itertools.repeat(area // 2)),
+                                  itertools.repeat(area))
+    window = row_sums[0]
+    for row in row_sums[1:2 * radius + 1]:
+        window = array("q", map(operator.add, window, row))
+    blurred = array(plane.typecode)
+    for r in range(num_rows):
+        blurred.extend(mean(window))
+        if r + 1 < num_rows:
+            window = array("q", map(operator.sub, map(operator.add, window, row_sums[r + 2 * radius + 1]),
+                                    row_sums[r]))
+    return blurred
+
+
+def _gaussianRadii(sigma: float, passes: int = 3) -> list:
+    '''
+    Function that chooses the radii of box blurs which, applied one after the other,
+    approximate a Gaussian blur of standard deviation sigma.
+    Args:
+        sigma: float -- the standard deviation of the Gaussian, in pixels
+        passes: int -- the number of box blurs
+    Returns:
+        A list of passes radii
+    '''
+    ideal_width = (12 * sigma * sigma / passes + 1) ** 0.5
+    lower_width = int(ideal_width)
+    if lower_width % 2 == 0:
+        lower_width = lower_width - 1
+    num_lower = round((12 * sigma * sigma - passes * lower_width * lower_width - 4 * passes * lower_width
+                       - 3 * passes) / (-4 * lower_width - 4))
+    return [(lower_width - 1) // 2 if i < num_lower else (lower_width + 1) // 2 for i in range(passes)]
+
+
+def _gaussianBlurPlane(plane: array, num_cols: int, num_rows: int, sigma: float) -> array:
+    '''
+    Function that blurs a channel array with three box blurs approximating a Gaussian.
+    Args:
+        plane: array -- the channel array
+        num_cols: int -- the number of columns of the image
+        num_rows: int -- the number of rows of the image
+        sigma: float -- the standard deviation of the Gaussian, in pixels
+    Returns:
+        A new channel array
+    '''
+    for radius in _gaussianRadii(sigma):
+        plane = _boxBlurPlane(plane, num_cols, num_rows, radius)
+    return plane
+
+
+def _signedTable(function: 'Callable', low: int, high: int) -> list:
+    '''
+    Function that tabulates a function over low to high (low <= 0 <= high) so that it can
+    be looked up with the argument itself as the index: non-negative arguments are stored
+    from the start of the list and negative ones from the end, where Python's negative
+    indexing finds them.
+    Args:
+        function: Callable -- the function to tabulate
+        low: int -- the smallest argument
+        high: int -- the largest argument
+    Returns:
+        The table, a list of high - low + 1 values
+    '''
+    return [function(value) for value in range(high + 1)] + [function(value) for value in range(low, 0)]
+
+
+def _sobelPlane(plane: array, num_cols: int, num_rows: int, max_level: int) -> array:
+    '''
+    Function that computes the Sobel gradient magnitude of a channel array, with the edges
+    of the image repeated. Both 3x3 kernels are separable, so each is a [1, 2, 1] smoothing
+    in one direction followed by a difference in the other. The magnitude is divided by 4,
+    so that a step from 0 to the maximum level gives the maximum level, and clamped.
+    Args:
+        plane: array -- the channel array
+        num_cols: int -- the number of columns of the image
+        num_rows: int -- the number of rows of the image
+        max_level: int -- the maximum level of the image
+    Returns:
+        A new channel array
+    '''
+    rows = _clampedRows(plane, num_cols, num_rows, 1)
+    #[1, 2, 1] across each row, with the first and last column repeated
+    smoothed_across = []
+    for row in rows:
+        padded = [row[0]] + list(row) + [row[-1]]
+        smoothed_across.append(list(map(operator.add, map(operator.add, padded, padded[2:]),
+                                        map(operator.add, padded[1:-1], padded[1:-1]))))
+    edges = array(plane.typecode)
+    for r in range(num_rows):
+        above, centre, below = rows[r], rows[r + 1], rows[r + 2]
+        smoothed_down = list(map(operator.add, map(operator.add, above, below), map(operator.add, centre, centre)))
+        padded = [smoothed_down[0]] + smoothed_down + [smoothed_down[-1]]
+        across = list(map(operator.sub, padded[2:], padded))
+        down = list(map(operator.sub, smoothed_across[r + 2], smoothed_across[r]))
+        magnitudes = map(math.isqrt, map(operator.add, map(operator.mul, across, across), map(operator.mul, down, down)))
+        edges.extend(map(min, map(operator.floordiv, magnitudes, itertools.repeat(4)), itertools.repeat(max_level)))
+    return edges
+
+
+def _medianPlane(plane: array, num_cols: int, num_rows: int, radius: int, max_level: int) -> array:
+    '''
+    Function that replaces every sample of a channel array by the median of the
+    (2*radius + 1) square around it, with the edges of the image repeated. Along each row
+    a histogram of the square is kept up to date as it slides one column at a time, and
+    the median is found by moving from the previous median through the histogram.
+    Args:
+        plane: array -- the channel array
+        num_cols: int -- the number of columns of the image
+        num_rows: int -- the number of rows of the image
+        radius: int -- the radius of the square
+        max_level: int -- the maximum level of the image
+    Returns:
+        A new channel array
+    '''
+    if radius <= 0 or num_cols == 0 or num_rows == 0:
+        return array(plane.typecode, plane)
+    rows = _clampedRows(plane, num_cols, num_rows, radius)
+    columns = [min(max(c, 0), num_cols - 1) for c in range(-radius, num_cols + radius + 1)]
+    rank = (2 * radius + 1) ** 2 // 2 #the median has this many samples below it
+    filtered = array(plane.typecode)
+    for r in range(num_rows):
+        window = rows[r:r + 2 * radius + 1]
+        histogram = [0] * (max_level + 1)
+        for row in window:
+            for c in columns[:2 * radius + 1]:
+                histogram[row[c]] += 1
+        median = 0
+        below = 0 #number of samples in the square smaller than median
+        for c in range(num_cols):
+            while below + histogram[median] <= rank:
+                below = below + histogram[median]
+                median = median + 1
+            while below > rank:
+                median = median - 1
+                below = below - histogram[median]
+            filtered.append(median)
+            leaving = columns[c]
+            entering = columns[c + 2 * radius + 1]
+            for row in window:
+                value = row[leaving]
+                histogram[value] -= 1
+                if value < median:
+                    below = below - 1
+                value = row[entering]
+                histogram[value] += 1
+                if value < median:
+                    below = below + 1
+    return filtered
+
+
+def _histogramOf(plane: array, max_level: int) -> tuple:
+    '''
+    Function that counts how many samples of a channel array have each level, in a single
+    pass over the samples.
+    Args:
+        plane: array -- the channel array
+        max_level: int -- the maximum level of the image
+    Returns:
+        A tuple of max_level + 1 counts
+    '''
+    counts = collections.Counter(plane)
+    return tuple(counts.get(level, 0) for level in range(max_level + 1))
+
+
+def _percentileOf(histogram: tuple, percent: float) -> int:
+    '''
+    Function that finds the level below or at which percent of the samples lie (the
+    nearest-rank percentile) from a histogram.
+    Args:
+        histogram: tuple -- the count of samples at each level
+        percent: float -- from 0 to 100
+    Returns:
+        The smallest level whose cumulative count reaches percent of the samples
+    Raises:
+        ValueError: if the histogram is empty or percent is out of range
+    '''
+    if percent < 0 or percent > 100:
+        raise ValueError(f"Percentile must be between 0 and 100, not {percent}")
+    total = sum(histogram)
+    if total == 0:
+        raise ValueError("The image has no pixels")
+    rank = max(math.ceil(total * percent / 100), 1)
+    cumulative = 0
+    for level in range(len(histogram)):
+        cumulative = cumulative + histogram[level]
+        if cumulative >= rank:
+            return level
+    return len(histogram) - 1
+
+
+def _otsuLevel(histogram: tuple) -> int:
+    '''
+    Function that picks the threshold separating a histogram into two classes with the
+    largest variance between them (Otsu's method).
+    Args:
+        histogram: tuple -- the count of samples at each level
+    Returns:
+        The lowest level of the upper class
+    '''
+    total = sum(histogram)
+    level_sum = sum(level * count for level, count in enumerate(histogram))
+    best_level = 0
+    best_variance = -1.0
+    lower_count = 0
+    lower_sum = 0
+    for level in range(1, len(histogram)):
+        lower_count = lower_count + histogram[level - 1]
+        lower_sum = lower_sum + (level - 1) * histogram[level - 1]
+        upper_count = total - lower_count
+        if lower_count == 0 or upper_count == 0:
+            continue
+        difference = lower_sum / lower_count - (level_sum - lower_sum) / upper_count
+        variance = lower_count * upper_count * difference * difference
+        if variance > best_variance:
+            best_variance = variance
+            best_level = level
+    return best_level
+
+
+def _checkResize(num_cols: int, num_rows: int, method: str) -> None:
+    '''
+    Function that checks the arguments of a resize.
+    Args:
+        num_cols: int -- the number of columns after resizing
+        num_rows: int -- the number of rows after resizing
+        method: str -- the resize method
+    Returns:
+        Nothing. This function is nonfruitful
+    Raises:
+        ValueError: if the method is unknown or a size is not positive
+    '''
+    if method not in RESIZE_METHODS:
+        raise ValueError(f"Unknown resize method: {method!r}")
+    if num_cols <= 0 or num_rows <= 0:
+        raise ValueError(f"Cannot resize to {num_cols}x{num_rows}")
+
+
+def _resizeWeights(source_size: int, target_size: int, method: str) -> list:
+    '''
+    Function that works out, along one axis, which source samples make up each sample of
+    a resized image and how much each one counts. Weights are integers adding up to
+    1 << RESIZE_BITS for every target sample, so resizing needs no floating point.
+    Args:
+        source_size: int -- the number of samples along the axis before resizing
+        target_size: int -- the number of samples along the axis after resizing
+        method: str -- one of RESIZE_METHODS
+    Returns:
+        A list with, for every target sample, a list of (source index, weight) pairs in
+        increasing order of source index
+    '''
+    one = 1 << RESIZE_BITS
+    scale = source_size / target_size
+    weights = []
+    for target in range(target_size):
+        if method == "nearest":
+            weights.append([(min(int((target + 0.5) * scale), source_size - 1), one)])
+            continue
+        if method == "bilinear":
+            centre = (target + 0.5) * scale - 0.5
+            lower = math.floor(centre)
+            fraction = centre - lower
+            taps = [(min(max(lower, 0), source_size - 1), 1 - fraction),
+                    (min(max(lower + 1, 0), source_size - 1), fraction)]
+        else: #area: the share of the source interval of the target sample in each source sample
+            start = target * scale
+            stop = start + scale
+            taps = [(source, (min(stop, source + 1) - max(start, source)) / scale)
+                    for source in range(int(start), min(math.ceil(stop), source_size))]
+        merged = {}
+        for source, weight in taps:
+            merged[source] = merged.get(source, 0) + round(weight * one)
+        largest = max(merged, key=merged.get)
+        merged[largest] = merged[largest] + one - sum(merged.values())
+        weights.append([(source, weight) for source, weight in sorted(merged.items()) if weight != 0])
+    return weights
+
+
+def _resizeRows(rows: 'Iterator[list]', num_cols: int, num_rows: int, out_cols: int, out_rows: int,
+                method: str, typecode: str) -> 'Iterator[list]':
+    '''
+    Function that resizes an image given one row at a time, yielding the rows of the
+    result as soon as the source rows they need have arrived, so that only the few source
+    rows under the current output row are held in memory. Rows are resized across first,
+    with a C-level gather and multiply per tap of the column weights, then down. When the
+    area method divides both dimensions exactly (as every level of a power-of-two mipmap
+    does) each output sample is the mean of a block, summed with strided slices.
+    Args:
+        rows: Iterator[list] -- for every source row, a list holding that row of each channel
+        num_cols: int -- the number of columns of the source
+        num_rows: int -- the number of rows of the source
+        out_cols: int -- the number of columns of the result
+        out_rows: int -- the number of rows of the result
+        method: str -- one of RESIZE_METHODS
+        typecode: str -- the typecode of the channel arrays
+    Yields:
+        For every row of the result, a list holding that row of each channel as an array
+    '''
+    rows = iter(rows)
+    if method == "area" and num_cols % out_cols == 0 and num_rows % out_rows == 0:
+        across = num_cols // out_cols
+        down = num_rows // out_rows
+        area = across * down
+        max_sum = area * (256 ** array(typecode).itemsize - 1)
+        if max_sum < (1 << 20):
+            means = [(total + area // 2) // area for total in range(max_sum + 1)]
+            mean = lambda sums: map(means.__getitem__, sums)
+        else:
+            mean = lambda sums: map(operator.floordiv, map(operator.add, sums, itertools.repeat(area // 2)),
+                                    itertools.repeat(area))
+        for r in range(out_rows):
+            block = None
+            for k in range(down):
+                sums = []
+                for row in next(rows):
+                    total = row[0::across]
+                    for offset in range(1, across):
+                        total = map(operator.add, total, row[offset::across])
+                    sums.append(total)
+                if block is None:
+                    block = [list(total) for total in sums]
+                else:
+                    block = [list(map(operator.add, before, total)) for before, total in zip(block, sums)]
+            yield [array(typecode, mean(total)) for total in block]
+        for row in rows:
+            pass
+        return
+
+    column_weights = _resizeWeights(num_cols, out_cols, method)
+    row_weights = _resizeWeights(num_rows, out_rows, method)
+    if method == "nearest":
+        columns = [weights[0][0] for weights in column_weights]
+        across = lambda row: array(typecode, map(row.__getitem__, columns))
+    elif method == "area" and num_cols >= 4 * out_cols:
+        #every whole source pixel under an output sample has the same weight, so their sum
+        #is a difference of running totals; the few taps with other weights (the partly
+        #covered pixels at each end) are added as corrections
+        uniform = round((1 << RESIZE_BITS) * out_cols / num_cols)
+        starts = [weights[0][0] for weights in column_weights]
+        stops = [weights[-1][0] + 1 for weights in column_weights]
+        corrections = [[(source, weight - uniform) for source, weight in weights if weight != uniform]
+                       for weights in column_weights]
+        num_taps = max(len(weights) for weights in corrections)
+        taps = []
+        for k in range(num_taps):
+            indices = [weights[k][0] if k < len(weights) else 0 for weights in corrections]
+            factors = [weights[k][1] if k < len(weights) else 0 for weights in corrections]
+            taps.append((indices, factors))
+
+        def across(row: array) -> list:
+            totals = list(itertools.accumulate(row, initial=0))
+            total = map(operator.mul, map(operator.sub, map(totals.__getitem__, stops), map(totals.__getitem__, starts)),
+                        itertools.repeat(uniform))
+            for indices, factors in taps:
+                total = map(operator.add, total, map(operator.mul, map(row.__getitem__, indices), factors))
+            return list(total)
+
+    else:
+        #tap k of every output column, padded with zero weights where a column has fewer taps
+        num_taps = max(len(weights) for weights in column_weights)
+        taps = []
+        for k in range(num_taps):
+            indices = [weights[k][0] if k < len(weights) else 0 for weights in column_weights]
+            factors = [weights[k][1] if k < len(weights) else 0 for weights in column_weights]
+            taps.append((indices, factors))
+
+        def across(row: array) -> list:
+            total = None
+            for indices, factors in taps:
+                products = map(operator.mul, map(row.__getitem__, indices), factors)
+                total = products if total is None else map(operator.add, total, products)
+            return list(total)
+
+    half = itertools.repeat(1 << (2 * RESIZE_BITS - 1))
+    shift = itertools.repeat(2 * RESIZE_BITS)
+    resized = {} #source row index -> that row of each channel, already resized across
+    next_row = 0
+    for r in range(out_rows):
+        while next_row <= row_weights[r][-1][0]:
+            resized[next_row] = [across(row) for row in next(rows)]
+            next_row = next_row + 1
+        if method == "nearest":
+            yield resized[row_weights[r][0][0]]
+        else:
+            totals = None
+            for source, weight in row_weights[r]:
+                weighted = [map(operator.mul, row, itertools.repeat(weight)) for row in resized[source]]
+                if totals is None:
+                    totals = weighted
+                else:
+                    totals = [map(operator.add, total, products) for total, products in zip(totals, weighted)]
+            yield [array(typecode, map(operator.rshift, map(operator.add, total, half), shift)) for total in totals]
+        if r + 1 < out_rows:
+            first_needed = row_weights[r + 1][0][0]
+            for source in [source for source in resized if source < first_needed]:
+                del resized[source]
+    for row in rows:
+        pass
+
+
+class _Plan:
+    '''
+    Class that holds the operations recorded by a lazy Netpbm object until its pixels are
+    needed. Position-only operations (rotate, flip, crop) are folded into a single remap and
+    value-only operations (changeBrightness, invert, posterize, gamma, levels, curves) into a
+    single lookup table. toGrayscale splits that table in two: one applied to each channel
+    before the channels are mixed, and one applied to the gray level after. Because none of the
+    value-only operations depend on position, the two kinds commute and the whole plan runs as
+    one remap followed by one lookup per sample.
+    '''
+
+    __slots__ = ('planes', 'num_cols', 'num_rows', 'remap', 'channel_table', 'grayscale', 'gray_table')
+
+    def __init__(self, planes: list, num_cols: int, num_rows: int):
+        '''
+        Method that starts an empty plan.
+        Args:
+            self: argument used for all methods within a given class
+            planes: list -- the channel arrays of the image when the plan was started
+            num_cols: int -- the number of columns of the image when the plan was started
+            num_rows: int -- the number of rows of the image when the plan was started
+        Returns:
+            Nothing. This method is nonfruitful.
+        '''
+        self.planes = planes
+        self.num_cols = num_cols
+        self.num_rows = num_rows
+        self.remap = IDENTITY_REMAP
+        self.channel_table = None
+        self.grayscale = None
+        self.gray_table = None
+
+#a sidecar file of the disk cache is a DISK_CACHE_HEADER (its magic, the modification time,
+#size and SHA-256 digest of the source, the image dimensions, maximum level, magic number and
+#comment length), then the comment, then the pixels in the raw P5/P6 layout
+DISK_CACHE_MAGIC = b"NPBMPIX1"
+DISK_CACHE_HEADER = struct.Struct("<8sqq32sIII2sI")
+_disk_cache = {"directory": os.environ.get("NETPBM_CACHE_DIR"), "max_bytes": DISK_CACHE_BYTES, "validate": "mtime"}
+
+
+def setDiskCache(directory: str = None, max_bytes: int = DISK_CACHE_BYTES, validate: str = "mtime") -> None:
+    '''
+    Function that turns the disk cache of decoded pixels on or off. While it is on, the
+    first time a plain (P2/P3) file is opened its header and pixels are written to a
+    sidecar file in directory, and later openings of the unchanged file memory-map the
+    pixels from the sidecar instead of parsing the text. It starts out on if the
+    NETPBM_CACHE_DIR environment variable names a directory.
+    Args:
+        directory: str -- where the sidecar files are kept (created if needed), or None to
+        turn the cache off
+        max_bytes: int -- the most bytes the sidecar files may take up; the least recently
+        used ones are deleted beyond that
+        validate: str -- "mtime" to trust a sidecar while the modification time and size of
+        its source are unchanged, or "hash" to compare the SHA-256 digest of the source
+        instead, which reads the source every time but also catches changes that keep
+        the modification time
+    Returns:
+        Nothing. This function is nonfruitful
+    Raises:
+        ValueError: if validate is neither "mtime" nor "hash"
+    '''
+    if validate not in ("mtime", "hash"):
+        raise ValueError(f"Unknown disk cache validation: {validate!r}")
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    _disk_cache["directory"] = directory
+    _disk_cache["max_bytes"] = max_bytes
+    _disk_cache["validate"] = validate
+    if directory is not None:
+        _trimDiskCache()
+
+
+def _fileDigest(filename: str) -> bytes:
+    '''
+    Function that computes the SHA-256 digest of a file, reading it a CHUNK_SIZE at a time.
+    Args:
+        filename: str -- the file
+    Returns:
+        The 32 byte digest
+    '''
+    digest = hashlib.sha256()
+    with open(filename, "rb") as source_file:
+        for chunk in iter(lambda: source_file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _sidecarPath(filename: str) -> str:
+    '''
+    Function that names the sidecar file of an image in the disk cache directory.
+    Args:
+        filename: str -- the image
+    Returns:
+        The path of the sidecar file
+    '''
+    name = hashlib.sha1(os.path.realpath(filename).encode("utf-8", "surrogateescape")).hexdigest()
+    return os.path.join(_disk_cache["directory"], name + ".npc")
+
+
+def _loadSidecar(filename: str, status: os.stat_result) -> tuple:
+    '''
+    Function that looks for a valid sidecar file of an image and maps its pixels.
+    Args:
+        filename: str -- the image
+        status: os.stat_result -- the status of the image file
+    Returns:
+        The header list and a read-only memoryview of the raw payload, or None if there is
+        no sidecar or it does not match the image
+    '''
+    try:
+        with open(_sidecarPath(filename), "rb") as sidecar:
+            fields = DISK_CACHE_HEADER.unpack(sidecar.read(DISK_CACHE_HEADER.size))
+            magic, mtime, size, digest, num_cols, num_rows, max_level, magic_number, comment_size = fields
+            if magic != DISK_CACHE_MAGIC or size != status.st_size:
+                return None
+            if _disk_cache["validate"] == "hash":
+                if digest != _fileDigest(filename):
+                    return None
+            elif mtime != status.st_mtime_ns:
+                return None
+            comment = sidecar.read(comment_size).decode("latin-1")
+            header = [magic_number.decode("ascii"), comment, [num_cols, num_rows], max_level]
+            offset = DISK_CACHE_HEADER.size + comment_size
+            image = Netpbm._fromParts(header)
+            num_bytes = image._rasterSize()
+            if num_bytes == 0:
+                return header, memoryview(b"")
+            mapped_file = mmap.mmap(sidecar.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(mapped_file) < offset + num_bytes:
+                mapped_file.close()
+                return None
+        os.utime(_sidecarPath(filename)) #marks it as recently used
+        return header, memoryview(mapped_file)[offset:offset + num_bytes]
+    except (OSError, struct.error, UnicodeDecodeError):
+        return None
+
+
+def _saveSidecar(filename: str, status: os.stat_result, image: 'Netpbm') -> None:
+    '''
+    Function that writes the sidecar file of an image that has just been parsed, then
+    deletes the least recently used sidecar files if the cache has grown too large.
+    Failures are ignored: the cache only ever saves work.
+    Args:
+        filename: str -- the image
+        status: os.stat_result -- the status of the image file before it was parsed
+        image: Netpbm -- the parsed image
+    Returns:
+        Nothing. This function is nonfruitful
+    '''
+    header = image._header
+    comment = header[1].encode("latin-1", "replace")
+    payload = image._encodeRaster()
+    if DISK_CACHE_HEADER.size + len(comment) + payload.nbytes > _disk_cache["max_bytes"]:
+        return
+    path = _sidecarPath(filename)
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        digest = _fileDigest(filename) if _disk_cache["validate"] == "hash" else bytes(32)
+        with open(temporary, "wb") as sidecar:
+            sidecar.write(DISK_CACHE_HEADER.pack(DISK_CACHE_MAGIC, status.st_mtime_ns, status.st_size, digest,
+                                                 header[2][0], header[2][1], header[3],
+                                                 header[0].encode("ascii"), len(comment)))
+            sidecar.write(comment)
+            sidecar.write(payload)
+        os.replace(temporary, path)
+        _trimDiskCache()
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def _trimDiskCache() -> None:
+    '''
+    Function that deletes the least recently used sidecar files until they fit in the
+    size limit of the disk cache.
+    Returns:
+        Nothing. This function is nonfruitful
+    '''
+    directory = _disk_cache["directory"]
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith(".npc"):
+            status = os.stat(os.path.join(directory, name))
+            entries.append((status.st_mtime_ns, status.st_size, name))
+    total = sum(entry[1] for entry in entries)
+    for mtime, size, name in sorted(entries):
+        if total <= _disk_cache["max_bytes"]:
+            break
+        try:
+            os.remove(os.path.join(directory, name))
+            total = total - size
+        except OSError:
+            pass
+
+
+#a row index file, kept next to its plain image as filename + ".rowidx", is a ROW_INDEX_HEADER
+#(its magic, the modification time and size of the image, the stride, the number of rows and
+#of samples in a row) followed by the little-endian 64 bit positions of the indexed rows
+ROW_INDEX_MAGIC = b"NPBMIDX1"
+ROW_INDEX_HEADER = struct.Struct("<8sqqIII")
+
+
+def setRowIndex(stride: int = ROW_INDEX_STRIDE, persist: bool = True) -> None:
+    '''
+    Function that sets how the row indexes of plain files are built and kept. An index
+    records where every stride-th row starts so that a region (see Netpbm.__init__) or a
+    strip for a worker process can be parsed from the nearest indexed row above it. With
+    persist on, an index is saved next to its image and reused by later processes until
+    the modification time or size of the image changes.
+    Args:
+        stride: int -- the number of rows from one indexed row to the next; smaller strides
+        skip fewer rows to reach a given one but make larger indexes
+        persist: bool -- True to save indexes next to their images and load them from
+        there, False to keep them in memory only
+    Returns:
+        Nothing. This function is nonfruitful
+    Raises:
+        ValueError: if stride is not positive
+    '''
+    if stride < 1:
+        raise ValueError(f"The row index stride must be positive, not {stride}")
+    _row_index_settings["stride"] = stride
+    _row_index_settings["persist"] = persist
+    with _row_index_lock:
+        _row_indexes.clear()
+
+
+def buildRowIndex(filename: str) -> None:
+    '''
+    Function that indexes the rows of a plain file ahead of time, so that the first region
+    load of it is as quick as later ones. Raw files need no index and are left alone.
+    Args:
+        filename: str -- the image
+    Returns:
+        Nothing. This function is nonfruitful
+    '''
+    image = Netpbm._fromParts(None)
+    with open(filename, "rb") as image_file:
+        image._header = image.readHeader(image_file)
+        if image.isBinary() == False:
+            _rowIndex(filename, image_file, image.getNumCols() * image._numChannels(), image.getNumRows())
+
+
+def _rowIndex(filename: str, image_file: 'BinaryIO', row_samples: int, num_rows: int) -> tuple:
+    '''
+    Function that gets the row index of a plain file (see _indexRows): from memory, then
+    from the index file next to the image, while the modification time and size of the
+    image are unchanged, and otherwise by building it (and saving it, if indexes persist).
+    Args:
+        filename: str -- the name of the file, or None for a file object, whose index is
+        built every time
+        image_file: BinaryIO -- the filehandle, positioned on the first byte of the payload
+        row_samples: int -- the number of samples in a row
+        num_rows: int -- the number of rows
+    Returns:
+        A tuple of the stride of the index and its array of row positions
+    '''
+    stride = _row_index_settings["stride"]
+    if filename is None:
+        return stride, _indexRows(image_file, row_samples, num_rows, stride)
+    key = os.path.realpath(filename)
+    status = os.fstat(image_file.fileno())
+    with _row_index_lock:
+        entry = _row_indexes.get(key)
+        if entry is not None and entry[0] == status.st_mtime_ns and entry[1] == status.st_size:
+            _row_indexes.move_to_end(key)
+            return entry[2], entry[3]
+    loaded = None
+    if _row_index_settings["persist"] == True:
+        loaded = _loadRowIndex(filename, status, row_samples, num_rows)
+    if loaded is None:
+        loaded = (stride, _indexRows(image_file, row_samples, num_rows, stride))
+        if _row_index_settings["persist"] == True:
+            _saveRowIndex(filename, status, row_samples, num_rows, *loaded)
+    with _row_index_lock:
+        _row_indexes[key] = (status.st_mtime_ns, status.st_size) + loaded
+        _row_indexes.move_to_end(key)
+        while len(_row_indexes) > ROW_INDEX_ENTRIES:
+            _row_indexes.popitem(last=False)
+    return loaded
+
+
+def _loadRowIndex(filename: str, status: os.stat_result, row_samples: int, num_rows: int) -> tuple:
+    '''
+    Function that reads the index file of a plain image, if there is one that matches it.
+    Args:
+        filename: str -- the image
+        status: os.stat_result -- the status of the image file
+        row_samples: int -- the number of samples in a row of the image
+        num_rows: int -- the number of rows of the image
+    Returns:
+        A tuple of the stride and the array of row positions, or None if there is no index
+        file or it was made for another version of the image
+    '''
+    try:
+        with open(filename + ".rowidx", "rb") as index_file:
+            data = index_file.read()
+        magic, mtime, size, stride, index_rows, index_samples = ROW_INDEX_HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    positions = data[ROW_INDEX_HEADER.size:]
+    if (magic != ROW_INDEX_MAGIC or mtime != status.st_mtime_ns or size != status.st_size
+            or index_rows != num_rows or index_samples != row_samples or stride < 1
+            or len(positions) % 8 != 0):
+        return None
+    offsets = array("Q")
+    offsets.frombytes(positions)
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    return stride, offsets
+
+
+def _saveRowIndex(filename: str, status: os.stat_result, row_samples: int, num_rows: int,
+                  stride: int, offsets: array) -> None:
+    '''
+    Function that writes the index file of a plain image. Failures, such as a directory
+    that cannot be written to, are ignored: the index only ever saves work.
+    Args:
+        filename: str -- the image
+        status: os.stat_result -- the status of the image file when it was indexed
+        row_samples: int -- the number of samples in a row of the image
+        num_rows: int -- the number of rows of the image
+        stride: int -- the stride of the index
+        offsets: array -- the row positions
+    Returns:
+        Nothing. This function is nonfruitful
+    '''
+    path = filename + ".rowidx"
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if sys.byteorder == "big":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    try:
+        with open(temporary, "wb") as index_file:
+            index_file.write(ROW_INDEX_HEADER.pack(ROW_INDEX_MAGIC, status.st_mtime_ns, status.st_size,
+                                                   stride, num_rows, row_samples))
+            index_file.write(offsets)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+class _PeekableReader:
+    '''
+    Class that gives a file object that can neither seek nor peek a peek method, by keeping
+    what it has read ahead of its caller in a buffer (see _openSource).
+    '''
+
+    __slots__ = ('_source', '_buffer', '__weakref__')
+
+    def __init__(self, source: 'BinaryIO'):
+        '''
+        Method that initializes the reader with an empty buffer.
+        Args:
+            self: argument used for all methods within a given class
+            source: BinaryIO -- the file object to read from
+        Returns:
+            Nothing. This method is nonfruitful.
+        '''
+        self._source = source
+        self._buffer = b""
+
+    def seekable(self) -> bool:
+        '''
+        Method that tells the readers of the Netpbm class not to seek.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            False
+        '''
+        return False
+
+    def peek(self, size: int = 1) -> bytes:
+        '''
+        Method that returns the bytes in the buffer without taking them, first filling the
+        buffer with a single read of up to size bytes if it is empty, as io.BufferedReader does.
+        Args:
+            self: argument used for all methods within a given class
+            size: int -- the most bytes to read into an empty buffer
+        Returns:
+            The buffered bytes, which are empty only at the end of the file
+        '''
+        if len(self._buffer) == 0:
+            self._buffer = self._source.read(max(size, 1)) or b""
+        return self._buffer
+
+    def read(self, size: int = -1) -> bytes:
+        '''
+        Method that takes bytes from the buffer, then from the file object once the buffer
+        is empty.
+        Args:
+            self: argument used for all methods within a given class
+            size: int -- the most bytes to take, or -1 for all of them up to the end of the file
+        Returns:
+            The bytes taken
+        '''
+        if len(self._buffer) == 0:
+            return self._source.read(size) or b""
+        if size is None or size < 0:
+            data = self._buffer + (self._source.read() or b"")
+            self._buffer = b""
+            return data
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return data
+
+    def readline(self) -> bytes:
+        '''
+        Method that takes bytes up to and including the next line break.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The line, without a line break only at the end of the file
+        '''
+        line = b""
+        data = self.peek(PEEK_BYTES)
+        while data != b"":
+            end = data.find(b"\n") + 1
+            if end > 0:
+                self._buffer = data[end:]
+                return line + data[:end]
+            line = line + data
+            self._buffer = b""
+            data = self.peek(PEEK_BYTES)
+        return line
+
+
+def _checkBinary(image_file: 'BinaryIO') -> None:
+    '''
+    Function that rejects text mode filehandles, which decode the bytes of an image as text.
+    Args:
+        image_file: BinaryIO -- the filehandle to read an image from
+    Returns:
+        Nothing. This function is nonfruitful
+    Raises:
+        TypeError: if image_file is a text mode filehandle
+    '''
+    if isinstance(image_file, io.TextIOBase):
+        raise TypeError("Images must be read from a binary filehandle (opened with 'rb'), not a text one")
+
+
+def _openSource(source: 'str | bytes | BinaryIO') -> tuple:
+    '''
+    Function that turns anything an image can be read from into a binary filehandle.
+    Args:
+        source: str | bytes | BinaryIO -- a filename, "-" for standard input, the bytes
+        of an image (bytes, bytearray or memoryview), or a binary file object
+    Returns:
+        A tuple of the filehandle and whether it was opened here (and so must be closed here).
+        A file object that can neither seek nor peek, such as an unbuffered pipe or a socket,
+        is wrapped in a _PeekableReader that is kept for as long as the file object lives, so
+        the bytes read ahead of the end of one image are there for the next one read from it.
+    Raises:
+        TypeError: if source is a text mode filehandle
+    '''
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), True
+    if hasattr(source, "read"):
+        _checkBinary(source)
+        if hasattr(source, "peek") or hasattr(source, "seekable") and source.seekable() == True:
+            return source, False
+        try:
+            reader = _peekable_readers.get(source)
+            if reader is None:
+                reader = _peekable_readers[source] = _PeekableReader(source)
+        except TypeError: #the file object cannot be weakly referenced
+            reader = _PeekableReader(source)
+        return reader, False
+    if source == "-":
+        return sys.stdin.buffer, False
+    return open(source, "rb"), True
+
+
+def _openSink(destination: 'str | BinaryIO') -> tuple:
+    '''
+    Function that turns anything an image can be written to into a binary filehandle.
+    Args:
+        destination: str | BinaryIO -- a filename, "-" for standard output, or a binary
+        file object
+    Returns:
+        A tuple of the filehandle and whether it was opened here (and so must be closed here)
+    '''
+    if hasattr(destination, "write"):
+        return destination, False
+    if destination == "-":
+        return sys.stdout.buffer, False
+    return open(destination, "wb"), True
+
+
+def _closeSink(output_file: 'BinaryIO', owned: bool) -> None:
+    '''
+    Function that finishes writing to a filehandle from _openSink: files opened by
+    _openSink are closed, file objects of the caller are only flushed.
+    Args:
+        output_file: BinaryIO -- the filehandle
+        owned: bool -- whether _openSink opened it
+    Returns:
+        Nothing. This function is nonfruitful
+    '''
+    if owned == True:
+        output_file.close()
+    else:
+        output_file.flush()
+
+
+def _isRegularFile(image_file: 'BinaryIO') -> bool:
+    '''
+    Function that tells whether a filehandle reads from a regular file, which can be
+    memory-mapped, rather than from a pipe, a terminal or memory.
+    Args:
+        image_file: BinaryIO -- the filehandle
+    Returns:
+        True for a regular file, False otherwise
+    '''
+    try:
+        return stat.S_ISREG(os.fstat(image_file.fileno()).st_mode)
+    except (AttributeError, OSError):
+        return False
+
+
+def _readExactly(image_file: 'BinaryIO', num_bytes: int) -> bytes:
+    '''
+    Function that reads num_bytes bytes from a filehandle, going on reading after short
+    reads such as those of pipes.
+    Args:
+        image_file: BinaryIO -- the filehandle
+        num_bytes: int -- the number of bytes to read
+    Returns:
+        The bytes read, which are fewer than num_bytes only if the end of the file came first
+    '''
+    data = image_file.read(num_bytes)
+    if len(data) == num_bytes or len(data) == 0:
+        return data
+    pieces = [data]
+    remaining = num_bytes - len(data)
+    while remaining > 0:
+        piece = image_file.read(remaining)
+        if not piece:
+            break
+        pieces.append(piece)
+        remaining = remaining - len(piece)
+    return b"".join(pieces)
+
 
 #hello
 class Netpbm:
 
-    __slots__ = ('_header', '_pixels')
+    __slots__ = ('_header', '_pixels', '_raster', '_lazy', '_plan', '_histogram_cache')
 
 
-    def __init__(self, filename: str):
+    def __init__(self, source: 'str | bytes | BinaryIO', lazy: bool = False, region: tuple = None,
+                 workers: int = None):
+
+        '''
+        Method that initializes an object of the Netpbm class along with the isntance variables
+        used throughout the program.
+        Args:
+            self: argument used for all methods within a given class
+            source: str | bytes | BinaryIO -- The filename of the image to be operated on
+            using an object of the Netpbm class, "-" to read it from standard input, the
+            bytes of an image (bytes, bytearray or memoryview), or a binary file object such
+            as a pipe or a socket file. File objects are read up to the end of the image and
+            left open. A raw payload given as bytes is used in place without copying it.
+            lazy: bool -- True to record operations and run them only when the pixels are
+            needed (see setLazy)
+            region: tuple -- the upper left row and column and lower right row and column of
+            the only part of the image to load, as the arguments of crop, or None (the
+            default) to load all of it. Only the rows of the region are decoded: raw payloads
+            are sliced and plain ones are parsed from the indexed row nearest above the
+            region (see setRowIndex), using an index that is built on the first such load of
+            a file and kept until the file changes.
+            workers: int -- for a plain file named by a filename, the number of processes
+            to parse it with, each taking strips that start on indexed rows, or None (the
+            default) to parse it in this process
+        Returns:
+            Nothing. This method is nonfruitful.
+        Raises:
+            ValueError: if the region is not inside the image
+        '''
+
+        self._pixels = None
+        self._raster = None
+        self._lazy = lazy
+        self._plan = None
+        self._histogram_cache = None
+        status = None
+        is_filename = isinstance(source, (str, os.PathLike)) and source != "-"
+        if is_filename == True and _disk_cache["directory"] is not None: #a sidecar of a plain file saves parsing it
+            status = os.stat(source)
+            cached = _loadSidecar(source, status)
+            if cached is not None:
+                self._header, self._raster = cached
+                if region is not None:
+                    self._raster = self._rasterRegion(self._raster, region)
+                return
+        data = None
+        if isinstance(source, (bytearray, memoryview)): #a snapshot, so later changes by the caller do not show
+            source = bytes(source)
+        if isinstance(source, bytes):
+            data = source
+        file_handle, owned = _openSource(source)
+        try:
+            self._header = self.readHeader(file_handle)
+            if region is not None:
+                self._checkRegion(region)
+            if self.isBinary() == True: #p5 and p6 payloads are mapped or sliced, not parsed
+                self._raster = self.readRaster(file_handle, data)
+                if region is not None:
+                    self._raster = self._rasterRegion(self._raster, region)
+                    region = None
+            elif (region is not None and hasattr(file_handle, "seekable") and file_handle.seekable() == True
+                  or workers is not None and is_filename == True):
+                stride, offsets = _rowIndex(source if is_filename == True else None, file_handle,
+                                            self.getNumCols() * self._numChannels(), self.getNumRows())
+                if region is None:
+                    self._pixels = self._readRegion(file_handle, (0, 0, self.getNumRows(), self.getNumCols()),
+                                                    stride, offsets, source, workers)
+                else:
+                    self._pixels = self._readRegion(file_handle, region, stride, offsets,
+                                                    source if is_filename == True else None, workers)
+                    region = None
+                    status = None
+            elif self.isPGM() == True:
+                self._pixels = self.readPGMPixels(file_handle)
+            else: #if magic number is p2, pgm header; if its its p3, we use ppm header
+                self._pixels = self.readPPMPixels(file_handle)
+        finally:
+            if owned == True:
+                file_handle.close()
+        if region is not None: #a pipe cannot be skipped through, so all of it was parsed
+            self.crop(*region)
+        elif status is not None and self.isBinary() == False:
+            _saveSidecar(source, status, self)
+
+    @classmethod
+    def _fromParts(cls, header: list, pixels: 'array | list' = None, raster: memoryview = None) -> 'Netpbm':
+        '''
+        Method that builds a Netpbm object from a header and pixels that are already in
+        memory, without reading a file.
+        Args:
+            cls: the class being instantiated
+            header: list -- the header list, in the layout returned by readHeader
+            pixels: array | list -- the pixel array of a PGM, or the red, green and blue arrays of a PPM
+            raster: memoryview -- a raw P5/P6 payload to decode lazily instead of pixels
+        Returns:
+            The new Netpbm object
+        '''
+        image = cls.__new__(cls)
+        image._header = header
+        image._pixels = pixels
+        image._raster = raster
+        image._lazy = False
+        image._plan = None
+        image._histogram_cache = None
+        return image
+
+
+
+    def readHeader(self, image_file: 'BinaryIO') -> list: #image file is the file handle here
+
+        '''
+        Method that reads the header information of a given PGM or PPM file using the file
+        handle, then returns this information as part of a header list. The header is read
+        token by token so that comments may appear anywhere in it, and the file handle is
+        left on the first byte of the pixel payload.
+        Args:
+            self: argument used for all methods within a given class
+            image_file: 'BinaryIO' -- The filehandle for the given file, opened in binary mode.
+        Returns:
+            A list called header contianing the header information for a file, including the magic number, a comment,
+            the number of columns and rows, and the maximum level. The comment is the first
+            comment found in the header, or an empty string if there is none.
+        Raises:
+            ValueError: if the magic number is not P2, P3, P5 or P6
+            TypeError: if image_file is a text mode filehandle
+        '''
+
+        #As a reminder: PGM files contain the following
+            #line 1: P2: the magic magic_number (part of header info)
+            #Line 2: Comment beginning with # (part of header info)
+            #Line 3: Number of columns then rows (part of header info)
+            #Line 4 Maximum gray level (part of header info)
+            #Remainder of file: pixel payload with integer between 0 and max level (both inclusive)
+
+            #Also: a note on filename vs. file handle. Above we are using the file handle, which
+            #can be used in functions like readline and close, while the filename can not
+            #In this situation, passing in the file handle enables us to track our work in the file.
+            #readheader for a pgm file
+
+        _checkBinary(image_file)
+        comments = []
+        magic_number = self._readHeaderToken(image_file, comments).decode("ascii")
+        if magic_number not in PGM_MAGIC_NUMBERS + PPM_MAGIC_NUMBERS:
+            raise ValueError(f"Unsupported magic number: {magic_number!r}")
+        cols_rows_list = [int(self._readHeaderToken(image_file, comments)),
+                          int(self._readHeaderToken(image_file, comments))]
+
+        #the single whitespace character after the max level is consumed here, so a
+        #binary payload starts exactly at the current position of the file handle
+        max_level = int(self._readHeaderToken(image_file, comments))
+        comment = ""
+        if len(comments) > 0:
+            comment = comments[0]
+        header = [magic_number, comment, cols_rows_list, max_level]
+        return header
+
+    def _readHeaderToken(self, image_file: 'BinaryIO', comments: list) -> bytes:
+        '''
+        Method that reads the next whitespace separated token of a header one byte at a
+        time, skipping over any comments on the way.
+        Args:
+            self: argument used for all methods within a given class
+            image_file: 'BinaryIO' -- The filehandle for the given file, opened in binary mode.
+            comments: list -- a list that every skipped comment is appended to as a string
+        Returns:
+            The token as bytes, along with the whitespace character that ended it consumed.
+        '''
+        token = b""
+        char = image_file.read(1)
+        while char != b"":
+            if char == b"#":
+                comments.append((char + image_file.readline()).decode("latin-1").strip())
+                if token != b"":
+                    return token
+            elif char.isspace():
+                if token != b"":
+                    return token
+            else:
+                token = token + char
+            char = image_file.read(1)
+        return token
+
+    def readRaster(self, image_file: 'BinaryIO', data: bytes = None) -> memoryview:
+        '''
+        Method that returns the pixel payload of a raw P5 or P6 file without parsing it.
+        A regular file is memory-mapped so the payload is not copied; pipes and other
+        streams that cannot be mapped are read. Samples are one byte each when the maximum
+        level is below 256 and two big-endian bytes each otherwise, with the red, green and
+        blue samples of a PPM pixel stored next to each other. The file handle is left on
+        the first byte after the payload.
+        Args:
+            self: argument used for all methods within a given class
+            image_file: 'BinaryIO' -- The filehandle for the given file, positioned on the
+            first byte of the payload as left by readHeader.
+            data: bytes -- the bytes image_file reads from, when they are already in memory,
+            so that the payload is sliced out of them instead of being copied
+        Returns:
+            A read-only memoryview over the pixel payload.
+        Raises:
+            ValueError: if the file is shorter than the header says it should be, or a
+            sample is above the maximum level
+            TypeError: if image_file is a text mode filehandle
+        '''
+        _checkBinary(image_file)
+        num_bytes = self._rasterSize()
+        if num_bytes == 0:
+            return memoryview(b"")
+        if data is not None:
+            offset = image_file.tell()
+            raster = memoryview(data)[offset:offset + num_bytes]
+            image_file.seek(offset + len(raster))
+        elif _isRegularFile(image_file) == True:
+            offset = image_file.tell()
+            mapped_file = mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(mapped_file) < offset + num_bytes:
+                mapped_file.close()
+                raise ValueError(f"Pixel payload is truncated: expected {num_bytes} bytes")
+            image_file.seek(offset + num_bytes)
+            raster = memoryview(mapped_file)[offset:offset + num_bytes]
+        else:
+            raster = memoryview(_readExactly(image_file, num_bytes))
+        if len(raster) < num_bytes:
+            raise ValueError(f"Pixel payload is truncated: expected {num_bytes} bytes")
+        _checkRaster(raster, self.getMaxLevel())
+        return raster
+
+    def _checkRegion(self, region: tuple) -> None:
+        '''
+        Method that checks that a region to load lies inside the image and is not empty.
+        Args:
+            self: argument used for all methods within a given class
+            region: tuple -- the upper left row and column and lower right row and column
+        Returns:
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if the region is empty or reaches outside the image
+        '''
+        upper_left_row, upper_left_column, lower_right_row, lower_right_column = region
+        if not (0 <= upper_left_row < lower_right_row <= self.getNumRows()
+                and 0 <= upper_left_column < lower_right_column <= self.getNumCols()):
+            raise ValueError(f"Region {tuple(region)} is empty or not inside the "
+                             f"{self.getNumCols()}x{self.getNumRows()} image")
+
+    def _rasterRegion(self, raster: memoryview, region: tuple) -> memoryview:
+        '''
+        Method that cuts a region out of a raw payload and makes the header describe it.
+        A region of whole rows is a zero-copy slice; otherwise only the part of each of its
+        rows inside the region is copied.
+        Args:
+            self: argument used for all methods within a given class
+            raster: memoryview -- the payload of the whole image
+            region: tuple -- the upper left row and column and lower right row and column
+        Returns:
+            The payload of the region
+        '''
+        self._checkRegion(region)
+        upper_left_row, upper_left_column, lower_right_row, lower_right_column = region
+        num_cols = self.getNumCols()
+        pixel_size = self._numChannels() * array(_typecode(self.getMaxLevel())).itemsize
+        row_size = num_cols * pixel_size
+        if upper_left_column == 0 and lower_right_column == num_cols:
+            raster = raster[upper_left_row * row_size:lower_right_row * row_size]
+        else:
+            first = upper_left_column * pixel_size
+            last = lower_right_column * pixel_size
+            raster = memoryview(b"".join([raster[row * row_size + first:row * row_size + last]
+                                          for row in range(upper_left_row, lower_right_row)]))
+        self._header[2] = [lower_right_column - upper_left_column, lower_right_row - upper_left_row]
+        return raster
+
+    def _readRegion(self, image_file: 'BinaryIO', region: tuple, stride: int, offsets: array,
+                    filename: str = None, workers: int = None) -> 'array | list':
+        '''
+        Method that parses a region of a plain payload: reading starts at the nearest
+        indexed row above the region and stops once its last row has been parsed. With
+        workers, the rows are cut into strips that start on indexed rows and parsed by that
+        many processes at once. The header is made to describe the region.
+        Args:
+            self: argument used for all methods within a given class
+            image_file: 'BinaryIO' -- a seekable filehandle for the file
+            region: tuple -- the upper left row and column and lower right row and column
+            stride: int -- the number of rows from one indexed row to the next
+            offsets: array -- where the indexed rows start, as found by _indexRows
+            filename: str -- the name of the file, which worker processes open themselves
+            workers: int -- the number of worker processes, or None to parse the rows here
+        Returns:
+            The pixel array of a PGM, or the red, green and blue arrays of a PPM
+        Raises:
+            ValueError: if the file is shorter than the header says it should be
+        '''
+        upper_left_row, upper_left_column, lower_right_row, lower_right_column = region
+        if (lower_right_row - 1) // stride >= len(offsets):
+            raise ValueError(f"Pixel payload is truncated: row {lower_right_row - 1} is missing")
+        if workers is None or filename is None:
+            image_file.seek(offsets[upper_left_row // stride])
+            samples = self._parseRows(image_file, upper_left_row % stride, lower_right_row - upper_left_row,
+                                      upper_left_column, lower_right_column)
+        else:
+            strip_rows = -(-STRIP_ROWS // stride) * stride
+            tasks = []
+            first_row = upper_left_row
+            while first_row < lower_right_row:
+                last_row = min(lower_right_row, (first_row // strip_rows + 1) * strip_rows)
+                tasks.append((filename, self.getHeader(), offsets[first_row // stride], first_row % stride,
+                              last_row - first_row, upper_left_column, lower_right_column))
+                first_row = last_row
+            samples = array(_typecode(self.getMaxLevel()))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for strip in executor.map(_parseStrip, tasks):
+                    samples.extend(strip)
+        self._header[2] = [lower_right_column - upper_left_column, lower_right_row - upper_left_row]
+        if self.isPGM() == True:
+            return samples
+        return [samples[i::3] for i in range(3)]
+
+    def _parseRows(self, image_file: 'BinaryIO', skip_rows: int, num_rows: int,
+                   first_column: int, last_column: int) -> array:
+        '''
+        Method that parses rows of a plain payload from the position of the filehandle,
+        reading no further than the chunk holding the last of them.
+        Args:
+            self: argument used for all methods within a given class
+            image_file: 'BinaryIO' -- The filehandle, positioned on the start of a row
+            skip_rows: int -- the number of rows to parse and throw away first
+            num_rows: int -- the number of rows to keep
+            first_column: int -- the first column kept in each row
+            last_column: int -- the column after the last one kept in each row
+        Returns:
+            The samples of the columns kept, in file order
+        Raises:
+            ValueError: if the file ends before the last row
+        '''
+        channels = self._numChannels()
+        row_samples = self.getNumCols() * channels
+        first_sample = skip_rows * row_samples
+        num_samples = first_sample + num_rows * row_samples
+        samples = array(_typecode(self.getMaxLevel()))
+        for chunk in self._iterSamples(image_file, num_samples=num_samples):
+            samples.extend(chunk)
+        if len(samples) < num_samples:
+            raise ValueError(f"Pixel payload is truncated: expected {num_samples - first_sample} more samples")
+        if first_column == 0 and last_column == self.getNumCols():
+            return samples[first_sample:num_samples]
+        rows = samples
+        samples = array(rows.typecode)
+        for start in range(first_sample, num_samples, row_samples):
+            samples.extend(rows[start + first_column * channels:start + last_column * channels])
+        return samples
+
+    def readPGMPixels(self, image_file: 'BinaryIO') -> array:
+        '''
+        Method that reads the pixels information from a given PGM file using the file
+        handle, then returns this information as part of a pixel array.
+        Args:
+            self: argument used for all methods within a given class
+            image_file: 'BinaryIO' -- The filehandle for the given file that can be used for reading.
+        Returns:
+            A 1d array of integers called pixel_array containing the value of each pixel that comprises the image,
+        Raises:
+            TypeError: if image_file is a text mode filehandle
+        '''
+        _checkBinary(image_file)
+        pixel_array = array(_typecode(self.getMaxLevel()))
+        num_samples = self.getNumCols() * self.getNumRows()
+        for samples in self._iterSamples(image_file, num_samples=num_samples): #read pixels for a pgm file
+            pixel_array.extend(samples)
+        self._checkSampleCount(image_file, len(pixel_array), num_samples)
+        return pixel_array
+
+
+    def readPPMPixels(self, image_file: 'BinaryIO') -> list:
+        '''
+        Method that reads the pixels information from a given PPM file using the file
+        handle, then returns this information as part of a pixel list. Each chunk of
+        samples is split into the three channels as soon as it is parsed.
+        Args:
+            self: argument used for all methods within a given class
+            image_file: 'BinaryIO' -- The filehandle for the given file that can be used for reading.
+        Returns:
+            A 3 element list called pixel_list containing an array of red pixels,
+            an array of green pixels, and an array of blue pixels.
+        Raises:
+            TypeError: if image_file is a text mode filehandle
+        '''
+        _checkBinary(image_file)
+        typecode = _typecode(self.getMaxLevel())
+        pixel_list = [array(typecode), array(typecode), array(typecode)]
+        left_over = array(typecode)
+        num_samples = self.getNumCols() * self.getNumRows() * 3
+        for samples in self._iterSamples(image_file, num_samples=num_samples):
+            if len(left_over) > 0: #a pixel can be split between two chunks
+                samples = left_over + samples
+            usable = len(samples) - (len(samples) % 3)
+            for i in range(3):
+                pixel_list[i].extend(samples[i:usable:3])
+            left_over = samples[usable:]
+        self._checkSampleCount(image_file, 3 * len(pixel_list[0]) + len(left_over), num_samples)
+        return pixel_list
+
+    def _checkSampleCount(self, image_file: 'BinaryIO', found: int, expected: int) -> None:
+        '''
+        Method that checks that a plain payload held as many samples as its header says,
+        and no more: whatever follows the last sample must be whitespace, comments or the
+        magic number of another image. The filehandle is not moved; a stream that cannot be
+        wound back is only checked as far as it has already been buffered.
+        Args:
+            self: argument used for all methods within a given class
+            image_file: 'BinaryIO' -- The filehandle, left just after the last sample
+            found: int -- the number of samples parsed
+            expected: int -- the number of samples the header says there are
+        Returns:
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if there are fewer samples than expected, or more follow them
+        '''
+        if found < expected:
+            raise ValueError(f"Pixel payload is truncated: expected {expected} samples, found {found}")
+        following = b""
+        if hasattr(image_file, "seekable") and image_file.seekable() == True:
+            position = image_file.tell()
+            following = image_file.read(PEEK_BYTES)
+            image_file.seek(position)
+        elif hasattr(image_file, "peek"):
+            following = image_file.peek(PEEK_BYTES)[:PEEK_BYTES]
+        tokens = _COMMENT_PATTERN.sub(b" ", following).split()
+        if len(tokens) > 0 and tokens[0][:1].isdigit():
+            raise ValueError(f"Pixel payload has more samples than the {expected} the header says")
+
+    def _iterSamples(self, image_file: 'BinaryIO', chunk_size: int = CHUNK_SIZE,
+                     num_samples: int = None) -> 'Iterator[array]':
+        '''
+        Method that parses a plain pixel payload in chunks of at most chunk_size bytes,
+        going straight from the bytes of the file to typed arrays. Comments may appear
+        anywhere in the payload. A chunk is cut after its last whitespace, or before a
+        comment its last line starts, and the partial token or comment after the cut is
+        carried over to the next chunk, so no token or comment is ever split and memory
+        stays bounded even for a payload on a single line.
+        With num_samples, parsing stops after that many samples and the filehandle is left
+        just after the last of them, so that another image can follow the payload. A
+        seekable binary file is wound back over what was read past it; other streams, such
+        as pipes, are looked at with peek and only the bytes that belong to the payload are
+        taken from them (see _openSource).
+        Args:
+            self: argument used for all methods within a given class
+            image_file: 'BinaryIO' -- The filehandle for the given file, positioned on the
+            first byte of the payload, opened in binary mode.
+            chunk_size: int -- the most bytes read from the file at a time
+            num_samples: int -- the number of samples in the payload, or None to parse up
+            to the end of the file
+        Yields:
+            An array of samples, in file order, for each chunk
+        Raises:
+            ValueError: if a sample is not a number from 0 to the maximum level
+        '''
+        max_level = self.getMaxLevel()
+        typecode = _typecode(max_level)
+        table = _tokenTable(max_level)
+        seekable = hasattr(image_file, "seekable") and image_file.seekable() == True
+        peeking = num_samples is not None and seekable == False and hasattr(image_file, "peek")
+        remaining = num_samples
+        carry = b""
+        at_end = remaining == 0
+        while at_end == False:
+            if peeking == True: #bytes are only taken once it is known they belong to the payload
+                chunk = image_file.peek(chunk_size)[:chunk_size]
+            else:
+                chunk = image_file.read(chunk_size)
+            data = carry + chunk
+            if chunk == b"":
+                at_end = True
+                cut = len(data)
+            else:
+                line_start = data.rfind(b"\n") + 1
+                cut = data.find(b"#", line_start)
+                if cut == -1:
+                    cut = max(data.rfind(b" ", line_start), data.rfind(b"\t", line_start),
+                              data.rfind(b"\r", line_start), line_start - 1) + 1
+            body = data[:cut]
+            carry = data[cut:]
+            if b"#" in body:
+                body = _COMMENT_PATTERN.sub(b" ", body)
+            tokens = body.split()
+            taken = len(chunk)
+            if remaining is not None and len(tokens) >= remaining:
+                at_end = True
+                #something other than whitespace was read past the last sample, whose end
+                #is then found by one match in C
+                if len(tokens) > remaining or carry.strip() != b"":
+                    taken = _samplesPattern(remaining).match(data).end() - len(data) + len(chunk)
+                tokens = tokens[:remaining]
+            if peeking == True:
+                image_file.read(taken)
+            elif taken < len(chunk) and seekable == True:
+                image_file.seek(taken - len(chunk), os.SEEK_CUR)
+            if remaining is not None:
+                remaining = remaining - len(tokens)
+            samples = array(typecode)
+            try:
+                samples.fromlist(list(map(table.__getitem__, tokens)))
+            except KeyError: #leading zeros, signs or levels above the maximum
+                levels = list(map(int, tokens))
+                if min(levels) < 0 or max(levels) > max_level:
+                    level = min(levels) if min(levels) < 0 else max(levels)
+                    raise ValueError(f"Pixel level {level} is outside 0 to the maximum level {max_level}")
+                samples.fromlist(levels)
+            if len(samples) > 0:
+                yield samples
+
+
+    def isPGM(self) -> bool:
+        '''
+        Method that determines the status of the file, whether PPM or PGM
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            A boolean expression (True or False) indicating whether or not the magic number
+            for the give file is P2 or P5 (a PGM) rather than P3 or P6 (a PPM)
+        '''
+        magicNumber = self.getMagicNumber()
+        if magicNumber in PGM_MAGIC_NUMBERS:
+            return True
+        else:
+            return False
+
+    def isBinary(self) -> bool:
+        '''
+        Method that determines whether the file uses the raw (binary) or plain (ASCII) encoding
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            A boolean expression (True or False) indicating whether or not the magic number
+            for the give file is P5 or P6
+        '''
+        return self.getMagicNumber() in BINARY_MAGIC_NUMBERS
+
+    def getMagicNumber(self) -> str:
+        '''
+        Method that gets the magic number.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The magic number at self._header[0] as a string
+        '''
+        return self._header[0]
+
+    def getComment(self) -> str:
+        '''
+        Method that gets comment from the header.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The comment at self._header[1] as a string
+        '''
+        return self._header[1]
+
+    def getNumCols(self) -> int:
+        '''
+        Method that gets the number of columns from the header
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The number of columns at self._header[2][0] as an integer
+        '''
+        return self._header[2][0]
+
+    def getNumRows(self) -> int:
+        '''
+        Method that gets the number of rows from the header
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The number of rows at self._header[2][1] as an integer
+            '''
+        return self._header[2][1]
+
+    def getMaxLevel(self) -> int:
+        return self._header[3]
+        '''
+        Method that gets the maximum pixel level for the image.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The maximum pixel level at self._header[3] as an integer
+        '''
+
+    def getHeader(self) -> list:
+        '''
+        Method that returns the header for an image
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            a copy of the header information from an image as a list
+        '''
+        header = self._header
+        return [header[0], header[1], list(header[2]), header[3]]
+
+    def getPixels(self) -> list:
+        '''
+        Method that returns the pixels for an image
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            a copy of the pixel information for either a PGM or PPM file as a list: a 1d list
+            of integers for a PGM file, or a list of red, green and blue lists for a PPM file
+        '''
+        planes = self._planes()
+        if self.isPGM() == True:
+            return planes[0].tolist()
+        return [plane.tolist() for plane in planes]
+
+    def getPixelView(self) -> 'memoryview | list':
+        '''
+        Method that returns the pixels for an image without copying them: read-only
+        memoryviews of the channel arrays. Operations never change a stored array, they
+        replace it, so a view keeps showing the pixels as they were when it was taken.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            a read-only memoryview of the samples for a PGM file, or a list of red, green
+            and blue memoryviews for a PPM file; each has format 'B' or 'H' and holds one
+            sample per pixel, row after row
+        '''
+        views = [memoryview(plane).toreadonly() for plane in self._planes()]
+        if self.isPGM() == True:
+            return views[0]
+        return views
+
+    def getRaster(self) -> memoryview:
+        '''
+        Method that returns the pixels for an image in the raw P5/P6 layout: samples of a
+        PPM pixel next to each other, one byte per sample when the maximum level is below
+        256 and two big-endian bytes otherwise. For a raw file that has not been changed
+        since it was loaded this is the memory-mapped payload itself and nothing is copied.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            a read-only memoryview of bytes holding the pixel payload
+        '''
+        if self._raster is not None:
+            return self._raster
+        return self._encodeRaster().toreadonly()
+
+    def copy(self) -> 'Netpbm':
+        '''
+        Method that returns an independent copy of an image without copying its pixels.
+        The copy shares the channel arrays (or the raw payload) of the image; because
+        operations replace arrays instead of changing them, whichever image is changed
+        first gets new arrays and the other keeps the shared ones, so pixels are only
+        copied when one of them is written to. Operations recorded by a lazy image are
+        copied as well.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The new Netpbm object
+        '''
+        pixels = self._pixels
+        if pixels is not None and self.isPGM() == False:
+            pixels = list(pixels)
+        image = Netpbm._fromParts(self.getHeader(), pixels, self._raster)
+        image._lazy = self._lazy
+        image._histogram_cache = self._histogram_cache
+        if self._plan is not None:
+            plan = self._plan
+            image._plan = _Plan(list(plan.planes), plan.num_cols, plan.num_rows)
+            image._plan.remap = plan.remap
+            image._plan.channel_table = plan.channel_table
+            image._plan.grayscale = plan.grayscale
+            image._plan.gray_table = plan.gray_table
+        return image
+
+    def __copy__(self) -> 'Netpbm':
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict) -> 'Netpbm':
+        return self.copy()
+
+    @classmethod
+    async def aopen(cls, source: 'str | bytes | BinaryIO', lazy: bool = False) -> 'Netpbm':
+        '''
+        Method that opens an image from a coroutine without blocking the event loop: the
+        file is read and parsed (a CHUNK_SIZE at a time) on the shared executor, once the
+        concurrency limiter lets the call through (see setAsyncLimits).
+        Args:
+            cls: the class being instantiated
+            source: str | bytes | BinaryIO -- The filename of the image, or any other source
+            the constructor accepts
+            lazy: bool -- True to record operations and run them only when the pixels are
+            needed (see setLazy)
+        Returns:
+            The new Netpbm object
+        '''
+        return await _runAsync(cls, source, lazy)
+
+    async def awrite(self, destination: 'str | BinaryIO', binary: bool = None, line_width: int = None) -> None:
+        '''
+        Method that writes an image from a coroutine without blocking the event loop: the
+        payload is formatted and written (a CHUNK_SIZE at a time) on the shared executor,
+        once the concurrency limiter lets the call through. The image must not be changed
+        until the call has finished.
+        Args:
+            self: argument used for all methods within a given class
+            destination: str | BinaryIO -- the name of the file as a string, or any other
+            destination writeImage accepts
+            binary: bool -- as for writeImage
+            line_width: int -- as for writeImage
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        await _runAsync(self.writeImage, destination, binary, line_width)
+
+    async def arun(self, operation: str, *args) -> None:
+        '''
+        Method that runs an operation from a coroutine without blocking the event loop, on
+        the shared executor behind the concurrency limiter. The image must not be used by
+        anything else until the call has finished.
+        Args:
+            self: argument used for all methods within a given class
+            operation: str -- the name of the method to call, such as "rotate"
+            args: the arguments to pass to the method
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        await _runAsync(getattr(self, operation), *args)
+
+    def _planes(self) -> list:
+        '''
+        Method that returns the channel arrays of an image so that operations can treat
+        PGM and PPM files the same way.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            a list holding the single array of a PGM file, or the red, green and blue
+            arrays of a PPM file
+        '''
+        if self._plan is not None:
+            self._runPlan()
+        if self._pixels is None:
+            self._pixels = self._decodeRaster()
+        if self.isPGM() == True:
+            return [self._pixels]
+        return list(self._pixels)
+
+    def _setPlanes(self, planes: list) -> None:
+        '''
+        Method that stores channel arrays produced by an operation back into the
+        self._pixels instance variable, in the shape expected for the magic number.
+        Stored arrays are never changed afterwards (copy and getPixelView rely on it), so
+        an operation must store new arrays rather than write into the ones it was given.
+        Args:
+            self: argument used for all methods within a given class
+            planes: list -- the channel arrays, as returned by _planes
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        if self.isPGM() == True:
+            self._pixels = planes[0]
+        else:
+            self._pixels = planes
+        self._raster = None
+        self._histogram_cache = None
+
+    def setLazy(self, lazy: bool) -> None:
+        '''
+        Method that turns lazy mode on or off. In lazy mode changeBrightness, invert, gamma,
+        levels, curves, posterize, toGrayscale, rotate, rotate180, flip and crop only record
+        themselves and update the header; the recorded operations run together, as one remap
+        and one pass over the samples, the next time the pixels are needed (getPixels,
+        writeImage, glass, ...).
+        Turning lazy mode off runs anything still recorded.
+        Args:
+            self: argument used for all methods within a given class
+            lazy: bool -- True to turn lazy mode on, False to turn it off
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        self._lazy = lazy
+        if lazy == False and self._plan is not None:
+            self._runPlan()
+
+    def _pendingPlan(self) -> _Plan:
+        '''
+        Method that returns the plan operations are being recorded into, starting one if
+        there is none yet. It must be called before the operation changes the header.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The pending plan
+        '''
+        if self._plan is None:
+            self._plan = _Plan(self._planes(), self.getNumCols(), self.getNumRows())
+            self._pixels = None
+            self._raster = None
+            self._histogram_cache = None
+        return self._plan
+
+    def _runPlan(self) -> None:
+        '''
+        Method that runs the pending plan: one remap of every channel array, then one lookup
+        table pass applying every value-only operation (and the gray conversion).
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        plan = self._plan
+        self._plan = None
+        planes = plan.planes
+        #a crop from the top left corner shrinks the image with an identity remap
+        if plan.remap != IDENTITY_REMAP or [plan.num_cols, plan.num_rows] != self._header[2]:
+            for i in range(len(planes)):
+                planes[i] = _remapPlane(planes[i], plan.num_cols, plan.remap,
+                                        self.getNumCols(), self.getNumRows())
+        if plan.channel_table is not None:
+            for i in range(len(planes)):
+                planes[i] = _lookUp(planes[i], plan.channel_table)
+        if plan.grayscale is not None:
+            planes = [_grayPlane(_planeBytes(planes), plan.grayscale, planes[0].typecode)]
+            if plan.gray_table is not None:
+                planes[0] = _lookUp(planes[0], plan.gray_table)
+        self._setPlanes(planes)
+
+    def _applyPoint(self, function: 'Callable') -> None:
+        '''
+        Method that applies a function of the sample value alone to every sample of every
+        channel. The function is called once per level to build a lookup table, and the
+        table is applied to the channel arrays, or composed into the plan when the image
+        is lazy so that chained operations still cost a single lookup per sample.
+        Args:
+            self: argument used for all methods within a given class
+            function: Callable -- takes a sample value and returns the new one, which must
+            be between 0 and the maximum level
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        if self._lazy == True:
+            plan = self._pendingPlan()
+            table = _buildTable(function, self.getMaxLevel(), plan.planes[0].typecode)
+            if plan.grayscale is not None:
+                if plan.gray_table is not None:
+                    table = _composeTables(plan.gray_table, table)
+                plan.gray_table = table
+            else:
+                if plan.channel_table is not None:
+                    table = _composeTables(plan.channel_table, table)
+                plan.channel_table = table
+            return
+        planes = self._planes()
+        table = _buildTable(function, self.getMaxLevel(), planes[0].typecode)
+        for i in range(len(planes)):
+            planes[i] = _lookUp(planes[i], table)
+        self._setPlanes(planes)
+
+    def _recordRemap(self, remap: tuple, num_cols: int, num_rows: int) -> None:
+        '''
+        Method that records a position-only operation in the plan of the image and updates
+        the dimensions in the header. flip and crop are always recorded this way, even when
+        the image is not lazy, so that they act as views until the pixels are needed.
+        Args:
+            self: argument used for all methods within a given class
+            remap: tuple -- the remap from the new image to the current one
+            num_cols: int -- the number of columns after the operation
+            num_rows: int -- the number of rows after the operation
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        plan = self._pendingPlan()
+        plan.remap = _composeRemaps(plan.remap, remap)
+        self._header[2][0] = num_cols
+        self._header[2][1] = num_rows
+
+    def _numChannels(self) -> int:
+        '''
+        Method that gets the number of samples per pixel.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            1 for a PGM file and 3 for a PPM file
+        '''
+        if self.isPGM() == True:
+            return 1
+        return 3
+
+    def _numBytes(self) -> int:
+        '''
+        Method that works out how many bytes the pixels of an image take up, whether they
+        are held as channel arrays or as a raw payload.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The number of bytes
+        '''
+        if self._pixels is None:
+            if self._raster is None:
+                return 0
+            return self._raster.nbytes
+        if self.isPGM() == True:
+            return len(self._pixels) * self._pixels.itemsize
+        return sum(len(plane) * plane.itemsize for plane in self._pixels)
+
+    def _rasterSize(self) -> int:
+        '''
+        Method that computes how many bytes the raw pixel payload of the image takes up.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            the payload size in bytes as an integer
+        '''
+        num_samples = self.getNumCols() * self.getNumRows() * self._numChannels()
+        return num_samples * array(_typecode(self.getMaxLevel())).itemsize
+
+    def _decodeRaster(self) -> 'array | list':
+        '''
+        Method that copies the memory-mapped raw payload into channel arrays, the first time
+        an operation needs to work on the pixels of a P5 or P6 file.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            the pixel array of a PGM file, or a list of red, green and blue arrays for a PPM file
+        '''
+        samples = array(_typecode(self.getMaxLevel()))
+        samples.frombytes(self._raster)
+        if samples.itemsize > 1 and sys.byteorder == "little":
+            samples.byteswap() #raw netpbm samples are big-endian
+        if self.isPGM() == True:
+            return samples
+        return [samples[0::3], samples[1::3], samples[2::3]]
+
+    def _encodeRaster(self) -> memoryview:
+        '''
+        Method that builds the raw P5/P6 payload from the channel arrays, interleaving the
+        red, green and blue samples of a PPM file.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            a memoryview of bytes holding the payload
+        '''
+        samples = self._interleavedSamples()
+        if samples.itemsize > 1 and sys.byteorder == "little":
+            samples = array(samples.typecode, samples)
+            samples.byteswap()
+        return memoryview(samples).cast("B")
+
+    def _interleavedSamples(self) -> array:
+        '''
+        Method that lays the samples of the image out in file order, with the red, green
+        and blue samples of each PPM pixel next to each other. The array of a PGM file is
+        returned as it is, without copying.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            an array of samples using the typecode that fits the maximum level
+        '''
+        typecode = _typecode(self.getMaxLevel())
+        planes = self._planes()
+        for i in range(len(planes)):
+            if planes[i].typecode != typecode: #posterize can shrink 16 bit images to 8 bit
+                planes[i] = array(typecode, planes[i])
+        if len(planes) == 1:
+            return planes[0]
+        samples = array(typecode, [0]) * (3 * len(planes[0]))
+        for i in range(3):
+            samples[i::3] = planes[i]
+        return samples
+
+
+    def writeImage(self, destination: 'str | BinaryIO', binary: bool = None, line_width: int = None) -> None:
+        '''
+        Method that writes out the pixel and header content of a Netpbm object
+        to another file.
+        Args:
+            self: argument used for all methods within a given class
+            destination: str | BinaryIO --the name of the file as a string, "-" for standard
+            output, or a binary file object (which is flushed and left open)
+            binary: bool -- True to write a raw P5/P6 file, False to write a plain P2/P3
+            file, or None (the default) to keep the encoding the image was loaded with
+            line_width: int -- for plain files, the number of samples written on each line,
+            or None (the default) to start each image row on a new line and fit as many whole
+            pixels on a line as PLAIN_LINE_LENGTH allows
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        if binary is None:
+            binary = self.isBinary()
+        output_file, owned = _openSink(destination)
+        try:
+            self.writeHeader(output_file, binary)
+            self.writePixels(output_file, binary, line_width)
+        finally:
+            _closeSink(output_file, owned)
+
+    def toBytes(self, binary: bool = None, line_width: int = None) -> bytes:
+        '''
+        Method that encodes the image as the bytes of a Netpbm file, as writeImage would
+        write them.
+        Args:
+            self: argument used for all methods within a given class
+            binary: bool -- True for a raw P5/P6 file, False for a plain P2/P3 file, or None
+            (the default) to keep the encoding the image was loaded with
+            line_width: int -- for plain files, the number of samples written on each line,
+            or None (the default) to start each image row on a new line and fit as many whole
+            pixels on a line as PLAIN_LINE_LENGTH allows
+        Returns:
+            The encoded file as bytes
+        '''
+        output_file = io.BytesIO()
+        self.writeImage(output_file, binary, line_width)
+        return output_file.getvalue()
+
+    def writeHeader(self, image_file: 'BinaryIO', binary: bool = None) -> None:
+        '''
+        Method that writes out the header information using the
+        filehandle from the fiven image and that is used by the
+        writeImage method.
+        Args:
+            self: argument used for all methods within a given class
+            image_file: BinaryIO -- the filehandle for a given file, opened in binary mode
+            binary: bool -- True to write a P5/P6 magic number, False to write a P2/P3 one,
+            or None (the default) to keep the magic number of the image
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        magic_number = self._header[0]
+        if binary is not None:
+            magic_number = self._magicNumberFor(binary)
+        header_text = magic_number + "\n"
+        if self._header[1] != "":
+            header_text = header_text + self._header[1] + "\n"
+        header_text = header_text + str(self._header[2][0]) + " " + str(self._header[2][1]) + "\n"
+        header_text = header_text + str(self._header[3]) + "\n"
+        image_file.write(header_text.encode("latin-1"))
+
+    def _magicNumberFor(self, binary: bool) -> str:
+        '''
+        Method that picks the magic number matching the kind of image (PGM or PPM) and the
+        requested encoding.
+        Args:
+            self: argument used for all methods within a given class
+            binary: bool -- True for the raw encoding, False for the plain encoding
+        Returns:
+            The magic number as a string
+        '''
+        if self.isPGM() == True:
+            return PGM_MAGIC_NUMBERS[binary]
+        return PPM_MAGIC_NUMBERS[binary]
+
+    def writePixels(self, image_file: 'BinaryIO', binary: bool = None, line_width: int = None) -> None:
+        '''
+        Method that writes out the pixel information using the
+        filehandle from the fiven image and that is used by the
+        writeImage method. A raw payload is written with a single
+        write call. A plain payload is formatted a block of lines at a time, with the
+        red, green and blue samples of each PPM pixel next to each other, and each
+        block of about CHUNK_SIZE bytes is written with one call.
+        Args:
+            self: argument used for all methods within a given class
+            image_file: BinaryIO -- the filehandle for a given file, opened in binary mode
+            binary: bool -- True to write the raw payload, False to write the plain one, or
+            None (the default) to keep the encoding of the image
+            line_width: int -- for plain files, the number of samples written on each line,
+            or None (the default) to start each image row on a new line and fit as many whole
+            pixels on a line as PLAIN_LINE_LENGTH allows
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        if binary is None:
+            binary = self.isBinary()
+        if binary == True:
+            image_file.write(self.getRaster())
+            return
+        samples = self._interleavedSamples()
+        if line_width is None:
+            row_length = max(1, len(samples) // max(1, self.getNumRows()))
+            channels = 1 if self.isPGM() == True else 3
+            pixels_per_line = (PLAIN_LINE_LENGTH + 1) // (channels * (len(str(self.getMaxLevel())) + 1))
+            line_width = min(max(1, pixels_per_line) * channels, row_length)
+        else:
+            row_length = line_width
+        texts = _levelTexts(samples.typecode)
+        rows_per_block = max(1, CHUNK_SIZE // (4 * row_length))
+        block_size = row_length * rows_per_block
+        for start in range(0, len(samples), block_size):
+            words = list(map(texts.__getitem__, samples[start:start + block_size]))
+            lines = [b" ".join(words[i:min(i + line_width, row_start + row_length)])
+                     for row_start in range(0, len(words), row_length)
+                     for i in range(row_start, min(row_start + row_length, len(words)), line_width)]
+            lines.append(b"")
+            image_file.write(b"\n".join(lines))
+
+    #new after working previous methods (up to B level specifications)
+
+
+    def changeBrightness(self, amount: int) -> None:
+        '''
+        Method that changes the brightness of an image by adding amount to every
+        sample in each channel array held in the self._pixels instance variable and
+        clamping the result between 0 and the maximum level. PGM files have a single
+        channel array while PPM files have one each for red, green and blue, and
+        the same steps are applied to each of them.
+        Args:
+            self: argument used for all methods within a given class
+            amount: int -- the integer value by which the brightness is to be altered
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        max_level = self.getMaxLevel()
+        self._applyPoint(lambda value: min(max(value + amount, 0), max_level))
+
+
+    def invert(self) -> None:
+        '''
+        Method that inverts an image by taking the maximum level for a given pixel
+        and subtracting from that the actual value to get the inverse value. The
+        same steps are applied to the single channel of a PGM file and to each of
+        the red, green and blue channels of a PPM file.
+        Args:
+            self: argument used for all methods within a given class
+
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        max_level = self.getMaxLevel()
+        self._applyPoint(lambda value: max_level - value)
+
+    def gamma(self, gamma: float) -> None:
+        '''
+        Method that applies a gamma curve to every channel of the image. Levels are scaled
+        to between 0 and 1, raised to the power 1 / gamma and scaled back, so a gamma above
+        1 brightens the mid tones and a gamma below 1 darkens them while black and the
+        maximum level stay where they are.
+        Args:
+            self: argument used for all methods within a given class
+            gamma: float -- the gamma value, which must be above 0
+        Returns:
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if gamma is not above 0
+        '''
+        if gamma <= 0:
+            raise ValueError(f"gamma must be above 0, not {gamma}")
+        max_level = self.getMaxLevel()
+        exponent = 1 / gamma
+        self._applyPoint(lambda value: round(max_level * ((value / max_level) ** exponent)))
+
+    def levels(self, black_level: int, white_level: int, gamma: float = 1.0) -> None:
+        '''
+        Method that stretches the levels between black_level and white_level out to the
+        full range of the image, the way the levels dialog of an image editor does. Levels
+        at or below black_level become 0, levels at or above white_level become the
+        maximum level, and a gamma curve is applied to the ones in between.
+        Args:
+            self: argument used for all methods within a given class
+            black_level: int -- the input level that becomes 0
+            white_level: int -- the input level that becomes the maximum level, which must
+            be above black_level
+            gamma: float -- the gamma applied to the mid tones, 1.0 (the default) for none
+        Returns:
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if white_level is not above black_level or gamma is not above 0
+        '''
+        if white_level <= black_level:
+            raise ValueError(f"white_level ({white_level}) must be above black_level ({black_level})")
+        if gamma <= 0:
+            raise ValueError(f"gamma must be above 0, not {gamma}")
+        max_level = self.getMaxLevel()
+        exponent = 1 / gamma
+        width = white_level - black_level
+
+        def level(value: int) -> int:
+            scaled = min(max((value - black_level) / width, 0.0), 1.0)
+            return round(max_level * (scaled ** exponent))
+
+        self._applyPoint(level)
+
+    def curves(self, points: list) -> None:
+        '''
+        Method that maps every level through a curve drawn straight between the given
+        (input level, output level) points, the way the curves dialog of an image editor
+        does. Levels before the first point or after the last one take the output level
+        of that point.
+        Args:
+            self: argument used for all methods within a given class
+            points: list -- (input level, output level) pairs; output levels must be between
+            0 and the maximum level
+        Returns:
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if there are no points, or a point is not a pair or has an output
+            level outside 0 to the maximum level
+        '''
+        if len(points) == 0:
+            raise ValueError("curves needs at least one (input level, output level) point")
+        max_level = self.getMaxLevel()
+        for point in points:
+            if len(point) != 2:
+                raise ValueError(f"curves points are (input level, output level) pairs, not {point!r}")
+            if point[1] < 0 or point[1] > max_level:
+                raise ValueError(f"Output level {point[1]} is outside 0 to {max_level}")
+        points = sorted(points)
+
+        def curve(value: int) -> int:
+            if value <= points[0][0]:
+                return points[0][1]
+            for i in range(1, len(points)):
+                x0, y0 = points[i - 1]
+                x1, y1 = points[i]
+                if value <= x1:
+                    return round(y0 + ((y1 - y0) * (value - x0) / (x1 - x0)))
+            return points[-1][1]
+
+        self._applyPoint(curve)
+
+    def rotate(self, rotate_right: bool = True) -> None:
+        '''
+        Method that rotates the image to the right by 90 degrees or to the left by 90 degrees
+        depending on the booleann given, then alters the number of rows and columns appropriately.
+        Each row of the rotated image is a column of the original read top to bottom or
+        bottom to top, so it is copied with a single extended slice of each channel array
+        (see _remapPlane) and the rotated arrays are built in one contiguous pass. Any
+        pending flip or crop is folded into the same pass.
+        Args:
+            self: argument used for all methods within a given class
+            rotate_right: bool -- A boolean indicating whether the method is to perform
+            rotate right or rotate left.
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        num_cols = self.getNumCols()
+        num_rows = self.getNumRows()
+        if rotate_right == True:
+            self._recordRemap((0, -1, num_rows - 1, 1, 0, 0), num_rows, num_cols)
+        else:
+            self._recordRemap((0, 1, 0, -1, 0, num_cols - 1), num_rows, num_cols)
+        if self._lazy == False:
+            self._runPlan()
+
+    def rotate180(self) -> None:
+        '''
+        Method that rotates the image by 180 degrees in a single pass, rather than as two
+        90 degree rotations. For a whole image this simply reverses each channel array.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        num_cols = self.getNumCols()
+        num_rows = self.getNumRows()
+        self._recordRemap((-1, 0, num_rows - 1, 0, -1, num_cols - 1), num_cols, num_rows)
+        if self._lazy == False:
+            self._runPlan()
+
+    @staticmethod
+    def rotateFile(source_filename: str, destination_filename: str, degrees: int = 90) -> None:
+        '''
+        Method that rotates a raw P5/P6 file into another file without loading either of
+        them into memory, for images too large for rotate: the source is memory-mapped and
+        read a band of rows at a time, and the destination is memory-mapped and filled in
+        place (see _rotateRaster).
+        Args:
+            source_filename: str -- the raw image to rotate
+            destination_filename: str -- where to write the rotated image
+            degrees: int -- 90 (to the right), 180, or 270 (to the left)
+        Returns:
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if the source is not a raw file, degrees is not 90, 180 or 270, or
+            the destination is the source file (it is truncated before the source is read)
+        '''
+        if degrees not in (90, 180, 270):
+            raise ValueError(f"Can only rotate by 90, 180 or 270 degrees, not {degrees}")
+        if os.path.exists(destination_filename) == True and \
+                os.path.samefile(source_filename, destination_filename) == True:
+            raise ValueError(f"rotateFile cannot write {destination_filename} over its own source")
+        source = Netpbm(source_filename)
+        if source.isBinary() == False:
+            raise ValueError("rotateFile needs a raw P5 or P6 file")
+        header = source.getHeader()
+        if degrees != 180:
+            header[2] = [header[2][1], header[2][0]]
+        raster = source.getRaster()
+        with open(destination_filename, "wb+") as output_file:
+            Netpbm._fromParts(header).writeHeader(output_file)
+            offset = output_file.tell()
+            output_file.truncate(offset + len(raster))
+            if len(raster) > 0:
+                with mmap.mmap(output_file.fileno(), 0) as mapped_file:
+                    with memoryview(mapped_file)[offset:] as destination:
+                        _rotateRaster(raster, source.getNumCols(), source.getNumRows(),
+                                      len(raster) // (source.getNumCols() * source.getNumRows()),
+                                      degrees, destination)
+
+    def flip(self, vertical: bool = True) -> None:
+        '''
+        Method that flips the image horizontally or vertically depending on the boolean given.
+        Nothing is copied straight away: the flip is recorded as a view of the current
+        pixels, and is carried out with one extended slice per row the next time the
+        pixels are needed, together with any other pending flip, crop or rotate.
+        Args:
+            self: argument used for all methods within a given class
+            vertical: bool -- a boolean term indicating whether the image should be
+            flipped horizontally or vertically
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        num_cols = self.getNumCols()
+        num_rows = self.getNumRows()
+        if vertical == True:
+            self._recordRemap((-1, 0, num_rows - 1, 0, 1, 0), num_cols, num_rows)
+        else:
+            self._recordRemap((1, 0, 0, 0, -1, num_cols - 1), num_cols, num_rows)
+
+
+#for posterize, everything between 0 and the half goes into the half; everything from half to the one goes into the 1
+#first chunki into 1, second into 2, third into 3, fourth into 4 (256/2)
+#separate colors
+#divide value by bin widths to get new value of pixel
+
+    def posterize(self, num_levels: int) -> None:
+        '''
+        Method that reduces the value of each pixel for a given image. It does this by stepping through
+        the given list of pixels and placing them in bins depending on the level of coloration a user in
+        photoshop desires. Each bin corresponds to specific levels that the pixel can take on. A range
+        of pixels with values that range widely are assorted into specific bins to reduce the number of values
+        that they can take on. The same steps are applied to every channel array of the image.
+        Args:
+            self: argument used for all methods within a given class
+            num_leves: int -- an integer term indicating the number of levels the user wants
+            the pixels in the image to be able to take on
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        max_level = self.getMaxLevel()
+        bin_width = (max_level + 1) / num_levels
+        self._applyPoint(lambda value: int(value / bin_width))
+        self._header[3] = (num_levels)
+
+    def crop(self, upper_left_row: int, upper_left_column: int, \
+    lower_right_row: int, lower_right_column: int) -> None:
+        '''
+        Method that crops the image to the area between the given corners, then adjusts
+        the number of colums and rows accordingly. Like flip, the crop is recorded as a
+        view of the current pixels and nothing is copied until the pixels are next needed,
+        when each row of the area is copied with a single slice.
+        Args:
+            self: argument used for all methods within a given class
+            upper_left_row: int -- the integer row position of where the crop starts
+            upper_left_column: int -- the integer column position of where the crop starts
+            lower_right_row: int -- the integer row positon of where the crop ends
+            lower_right_column: int -- the integer column position of where the crop ends
+        Returns:
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if the area is empty or reaches outside the image
+        '''
+        self._checkRegion((upper_left_row, upper_left_column, lower_right_row, lower_right_column))
+        self._recordRemap((1, 0, upper_left_row, 0, 1, upper_left_column),
+                          lower_right_column - upper_left_column, lower_right_row - upper_left_row)
+
+    def toGrayscale(self, standard: str = "rec709") -> None:
+        '''
+        Method that turns a PPM image into a PGM one, mixing the red, green and blue levels
+        of each pixel into a gray level with the luma weights of the given standard, in
+        fixed-point integer arithmetic: the levels are multiplied by their weights, added
+        and shifted right by GRAY_BITS, rounding to nearest, for every pixel at once (see
+        _grayPlane). 8 and 16 bit images are handled alike. A raw payload that has not been
+        decoded yet is mixed straight from its interleaved bytes, without being split into
+        channel arrays first. Nothing is done if the image is already a PGM.
+        Args:
+            self: argument used for all methods within a given class
+            standard: str -- "rec709" (the default) for the weights of Rec. 709 (HDTV),
+            "rec601" for those of Rec. 601 (SDTV and JPEG), or "average" for equal weights
+        Returns:
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if standard is not a key of GRAY_WEIGHTS
+        '''
+        if standard not in GRAY_WEIGHTS:
+            raise ValueError(f"Unknown luma standard: {standard!r}")
+        if self.isPGM() == True:
+            return
+        if self._lazy == True:
+            self._pendingPlan().grayscale = standard
+            self._header[0] = PGM_MAGIC_NUMBERS[self.isBinary()]
+            return
+        typecode = _typecode(self.getMaxLevel())
+        if self._pixels is None and self._raster is not None: #big-endian samples, interleaved
+            itemsize = array(typecode).itemsize
+            raster = self._raster.tobytes()
+            byte_planes = [(channel, itemsize - 1 - k, raster[channel * itemsize + k::3 * itemsize])
+                           for channel in range(3) for k in range(itemsize)]
+        else:
+            byte_planes = _planeBytes(self._planes())
+        pixel_array = _grayPlane(byte_planes, standard, typecode)
+        self._header[0] = PGM_MAGIC_NUMBERS[self.isBinary()]
+        self._setPlanes([pixel_array])
+
+    def glass (self, radius: int, mode: str = "wrap", seed: 'int | str' = None) -> None:
+        '''
+        Method that replaces each pixel with the value of a randomly chosen pixel within
+        radius rows and columns of it, thereby creating a washing out effect. The same
+        offset is used for every channel of a pixel.
+        The image is padded by radius on every side (see mode) and displaced in two passes,
+        each with one batch of random numbers: every pixel is first moved by a random number
+        of rows, then by a random number of columns, which leaves every pixel equally likely
+        to come from any position of its (2*radius + 1) square.
+        Args:
+            self: argument used for all methods within a given class
+            radius: int -- an integer corresponding to the maximum offset from the original pixel
+            mode: str -- "wrap" to take offsets that fall off an edge from the opposite side of
+            the image, "clamp" to take them from the nearest edge
+            seed: int | str -- the seed of the random numbers, or None (the default) for a
+            different result every time
+        Returns:
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if mode is not one of GLASS_MODES
+        '''
+        if mode not in GLASS_MODES:
+            raise ValueError(f"Unknown glass mode: {mode!r}")
+        num_rows = self.getNumRows()
+        num_cols = self.getNumCols()
+        if radius <= 0 or num_rows == 0 or num_cols == 0:
+            return
+        rng = random.Random(seed)
+        span = 2 * radius + 1
+        padded_cols = num_cols + 2 * radius
+        planes = self._planes()
+        typecode = planes[0].typecode
+        itemsize = planes[0].itemsize
+        padded = [_padPlane(plane, num_cols, num_rows, radius, mode) for plane in planes]
+
+        #rows radius to radius + num_rows of the padded image, each moved up or down
+        length = num_rows * padded_cols
+        moved = _displace(padded, itemsize, length, padded_cols, _randomChoices(rng, length, span), span)
+        #then moved left or right; output pixel (r, c) is sample r*padded_cols + c
+        length = length - 2 * radius
+        moved = _displace(moved, itemsize, length, 1, _randomChoices(rng, length, span), span)
+
+        row_bytes = num_cols * itemsize
+        padded_row_bytes = padded_cols * itemsize
+        for i in range(len(planes)):
+            plane = array(typecode)
+            plane.frombytes(b"".join([moved[i][start:start + row_bytes]
+                                      for start in range(0, num_rows * padded_row_bytes, padded_row_bytes)]))
+            planes[i] = plane
+        self._setPlanes(planes)
+
+    def boxBlur(self, radius: int) -> None:
+        '''
+        Method that blurs an image by replacing each sample with the mean of the
+        (2*radius + 1) square around it, each channel of a PPM file separately. Pixels past
+        the edges of the image repeat the edge pixels. The cost per pixel does not depend
+        on radius.
+        Args:
+            self: argument used for all methods within a given class
+            radius: int -- the number of pixels on each side of the centre of the square
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        num_cols = self.getNumCols()
+        num_rows = self.getNumRows()
+        planes = self._planes()
+        for i in range(len(planes)):
+            planes[i] = _boxBlurPlane(planes[i], num_cols, num_rows, radius)
+        self._setPlanes(planes)
+
+    def gaussianBlur(self, sigma: float) -> None:
+        '''
+        Method that blurs an image with an approximate Gaussian, made of three successive
+        box blurs, each channel of a PPM file separately. Pixels past the edges of the
+        image repeat the edge pixels. The cost per pixel does not depend on sigma.
+        Args:
+            self: argument used for all methods within a given class
+            sigma: float -- the standard deviation of the Gaussian, in pixels
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        num_cols = self.getNumCols()
+        num_rows = self.getNumRows()
+        planes = self._planes()
+        for i in range(len(planes)):
+            planes[i] = _gaussianBlurPlane(planes[i], num_cols, num_rows, sigma)
+        self._setPlanes(planes)
+
+    def unsharpMask(self, sigma: float = 1.0, amount: float = 1.0, threshold: int = 0) -> None:
+        '''
+        Method that sharpens an image by adding amount times the difference between each
+        sample and a Gaussian blur of the image, clamped to the levels of the image.
+        Args:
+            self: argument used for all methods within a given class
+            sigma: float -- the standard deviation of the blur, in pixels
+            amount: float -- how much of the difference is added
+            threshold: int -- differences smaller than this (in absolute value) are left alone,
+            so that flat areas and noise are not sharpened
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        max_level = self.getMaxLevel()
+        num_cols = self.getNumCols()
+        num_rows = self.getNumRows()
+
+        def boost(difference: int) -> int:
+            if abs(difference) < threshold:
+                return 0
+            return round(amount * difference)
+
+        #the difference and the sharpened value are both looked up with their own value
+        #as the index, negative ones counting back from the end of the table
+        boosts = _signedTable(boost, -max_level, max_level)
+        low = min(boosts)
+        high = max_level + max(boosts)
+        levels = _signedTable(lambda value: min(max(value, 0), max_level), low, high)
+        planes = self._planes()
+        for i in range(len(planes)):
+            plane = planes[i]
+            blurred = _gaussianBlurPlane(plane, num_cols, num_rows, sigma)
+            differences = map(boosts.__getitem__, map(operator.sub, plane, blurred))
+            planes[i] = array(plane.typecode, map(levels.__getitem__, map(operator.add, plane, differences)))
+        self._setPlanes(planes)
+
+    def sobel(self) -> None:
+        '''
+        Method that replaces an image by the strength of its edges: the magnitude of the
+        Sobel gradient, each channel of a PPM file separately. A step from 0 to the maximum
+        level gives the maximum level; stronger gradients are clamped to it.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        num_cols = self.getNumCols()
+        num_rows = self.getNumRows()
+        if num_cols == 0 or num_rows == 0:
+            return
+        planes = self._planes()
+        for i in range(len(planes)):
+            planes[i] = _sobelPlane(planes[i], num_cols, num_rows, self.getMaxLevel())
+        self._setPlanes(planes)
+
+    def median(self, radius: int = 1) -> None:
+        '''
+        Method that removes noise by replacing each sample with the median of the
+        (2*radius + 1) square around it, each channel of a PPM file separately. Pixels past
+        the edges of the image repeat the edge pixels. A histogram of the square slides
+        along each row, so the cost per pixel grows with radius rather than its square.
+        Args:
+            self: argument used for all methods within a given class
+            radius: int -- the number of pixels on each side of the centre of the square
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        num_cols = self.getNumCols()
+        num_rows = self.getNumRows()
+        planes = self._planes()
+        for i in range(len(planes)):
+            planes[i] = _medianPlane(planes[i], num_cols, num_rows, radius, self.getMaxLevel())
+        self._setPlanes(planes)
+
+    def _histograms(self) -> tuple:
+        '''
+        Method that returns the histogram of every channel, computing them only if the
+        pixels have changed since they were last computed (any change of the pixels
+        clears the cache, see _setPlanes).
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            A tuple holding one histogram per channel, each a tuple of max level + 1 counts
+        '''
+        planes = self._planes()
+        if self._histogram_cache is None:
+            max_level = self.getMaxLevel()
+            self._histogram_cache = tuple(_histogramOf(plane, max_level) for plane in planes)
+        return self._histogram_cache
+
+    def histogram(self) -> 'tuple | list':
+        '''
+        Method that returns how many pixels of an image have each level. The histograms are
+        computed in one pass over the pixels and kept until the pixels change, so asking for
+        statistics, percentiles or auto-levels afterwards does not read the pixels again.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            a tuple of max level + 1 counts for a PGM file, or a list of red, green and blue
+            tuples for a PPM file
+        '''
+        histograms = self._histograms()
+        if self.isPGM() == True:
+            return histograms[0]
+        return list(histograms)
+
+    def statistics(self) -> 'dict | list':
+        '''
+        Method that returns the smallest level, largest level, mean and standard deviation
+        of the pixels of an image, worked out from its cached histograms.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            a dictionary with the keys "min", "max", "mean" and "std" for a PGM file, or a
+            list of red, green and blue dictionaries for a PPM file
+        Raises:
+            ValueError: if the image has no pixels
+        '''
+        results = []
+        for histogram in self._histograms():
+            total = sum(histogram)
+            if total == 0:
+                raise ValueError("The image has no pixels")
+            levels = [level for level in range(len(histogram)) if histogram[level] > 0]
+            mean = sum(level * histogram[level] for level in levels) / total
+            variance = sum(histogram[level] * (level - mean) ** 2 for level in levels) / total
+            results.append({"min": levels[0], "max": levels[-1], "mean": mean, "std": variance ** 0.5})
+        if self.isPGM() == True:
+            return results[0]
+        return results
+
+    def percentile(self, percent: float) -> 'int | list':
+        '''
+        Method that returns the level below or at which percent of the pixels of an image
+        lie (50 gives the median), worked out from its cached histograms.
+        Args:
+            self: argument used for all methods within a given class
+            percent: float -- from 0 to 100
+        Returns:
+            the level for a PGM file, or a list of the red, green and blue levels for a PPM file
+        Raises:
+            ValueError: if the image has no pixels or percent is out of range
+        '''
+        levels = [_percentileOf(histogram, percent) for histogram in self._histograms()]
+        if self.isPGM() == True:
+            return levels[0]
+        return levels
+
+    def _applyChannelTables(self, tables: list) -> None:
+        '''
+        Method that applies a lookup table, built with _buildTable, to each channel array.
+        Args:
+            self: argument used for all methods within a given class
+            tables: list -- one table per channel
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        planes = self._planes()
+        for i in range(len(planes)):
+            planes[i] = _lookUp(planes[i], tables[i])
+        self._setPlanes(planes)
+
+    def autoLevels(self, clip: float = 0.0, per_channel: bool = True) -> None:
+        '''
+        Method that stretches the levels of an image so that its darkest pixels become 0
+        and its brightest the maximum level, like levels with the black and white levels
+        read off the histogram.
+        Args:
+            self: argument used for all methods within a given class
+            clip: float -- the percent of pixels at each end that are allowed to saturate,
+            so that a few outliers do not prevent the stretch
+            per_channel: bool -- for a PPM file, True to stretch each channel on its own
+            (which also corrects color casts), False to stretch all three the same way
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        max_level = self.getMaxLevel()
+        typecode = self._planes()[0].typecode
+        histograms = self._histograms()
+        if per_channel == False:
+            histograms = [tuple(map(sum, zip(*histograms)))] * len(histograms)
+        tables = []
+        for histogram in histograms:
+            black_level = _percentileOf(histogram, clip)
+            white_level = _percentileOf(histogram, 100 - clip)
+            if white_level <= black_level:
+                tables.append(_buildTable(lambda value: value, max_level, typecode))
+                continue
+
+            def stretch(value: int, black_level=black_level, white_level=white_level) -> int:
+                return min(max(round((value - black_level) * max_level / (white_level - black_level)), 0), max_level)
+
+            tables.append(_buildTable(stretch, max_level, typecode))
+        self._applyChannelTables(tables)
+
+    def equalize(self) -> None:
+        '''
+        Method that spreads the levels of an image so that each is used about equally often
+        (histogram equalization), each channel of a PPM file on its own.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        max_level = self.getMaxLevel()
+        typecode = self._planes()[0].typecode
+        tables = []
+        for histogram in self._histograms():
+            cumulative = list(itertools.accumulate(histogram))
+            total = cumulative[-1]
+            lowest = next((count for count in cumulative if count > 0), 0)
+
+            def spread(value: int, cumulative=cumulative, total=total, lowest=lowest) -> int:
+                if total == lowest:
+                    return value
+                return max(round((cumulative[value] - lowest) * max_level / (total - lowest)), 0)
+
+            tables.append(_buildTable(spread, max_level, typecode))
+        self._applyChannelTables(tables)
+
+    def threshold(self, level: int = None) -> None:
+        '''
+        Method that turns every sample at or above level to the maximum level and every
+        sample below it to 0. Without a level one is chosen from the histogram of all
+        channels together with Otsu's method.
+        Args:
+            self: argument used for all methods within a given class
+            level: int -- the threshold, or None to choose one
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        max_level = self.getMaxLevel()
+        if level is None:
+            level = _otsuLevel(tuple(map(sum, zip(*self._histograms()))))
+        self._applyPoint(lambda value: max_level if value >= level else 0)
+
+    def resize(self, num_cols: int, num_rows: int, method: str = "area") -> None:
+        '''
+        Method that changes the size of an image. The weights of the source pixels are
+        worked out once per column and once per row, and the image is resized across and
+        then down.
+        Args:
+            self: argument used for all methods within a given class
+            num_cols: int -- the number of columns after resizing
+            num_rows: int -- the number of rows after resizing
+            method: str -- "nearest" to copy the closest pixel, "bilinear" to interpolate
+            between the four closest pixels (best for enlarging), or "area" (the default) to
+            average every pixel covered, which gives the best thumbnails
+        Returns:
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if the method is unknown or a size is not positive
+        '''
+        _checkResize(num_cols, num_rows, method)
+        source_cols = self.getNumCols()
+        source_rows = self.getNumRows()
+        planes = self._planes()
+        typecode = planes[0].typecode
+        resized = [array(typecode) for plane in planes]
+        if source_rows > 0 and source_cols > 0:
+            rows = ([plane[r * source_cols:(r + 1) * source_cols] for plane in planes] for r in range(source_rows))
+            for row in _resizeRows(rows, source_cols, source_rows, num_cols, num_rows, method, typecode):
+                for i in range(len(row)):
+                    resized[i].extend(row[i])
+        self._header[2] = [num_cols, num_rows]
+        self._setPlanes(resized)
+
+    def mipmaps(self, min_size: int = 1) -> list:
+        '''
+        Method that makes the mipmap chain of an image: copies that are each half the size
+        of the one before (rounded down), made with the area method, until both sides are
+        no larger than min_size. Every level is made from the one before, so the whole
+        chain costs about a third more than the first level alone, and levels with even
+        sides are averaged with the block path of resize.
+        Args:
+            self: argument used for all methods within a given class
+            min_size: int -- the largest side the smallest level may have
+        Returns:
+            A list of Netpbm objects, largest first; the image itself is not changed
+        '''
+        levels = []
+        level = self
+        while level.getNumCols() > min_size or level.getNumRows() > min_size:
+            level = level.copy()
+            level.resize(max(level.getNumCols() // 2, 1), max(level.getNumRows() // 2, 1), "area")
+            levels.append(level)
+        return levels
+
+    def parallel(self, operation: str, *args, workers: int = None, strip_rows: int = STRIP_ROWS,
+                 seed: int = 0) -> None:
+        '''
+        Method that runs an operation on several processes at once. The channel arrays are
+        copied into shared memory and cut into horizontal strips of strip_rows rows, and
+        each worker process rebuilds its strip as a Netpbm object, calls the method named
+        operation on it and writes the rows back into a second block of shared memory.
+        Strips for glass and the neighbourhood filters also get halo rows above and below so
+        pixels near a strip edge can see across it. The halo stops at the top and bottom of
+        the image, where the operation repeats the edge rows itself, except for glass in
+        wrap mode, whose halo wraps around the image.
+
+        Operations in SEEDED_OPERATIONS are given a seed made from seed and the first row
+        of each strip, so results only depend on seed and strip_rows, never on the number
+        of workers or the order strips finish in.
+        Args:
+            self: argument used for all methods within a given class
+            operation: str -- one of the method names in PARALLEL_OPERATIONS
+            args: the arguments to pass to the method
+            workers: int -- the number of worker processes, or None (the default) for one
+            per CPU
+            strip_rows: int -- the number of rows in each strip
+            seed: int -- the seed for operations in SEEDED_OPERATIONS
+        Returns:
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if the operation cannot be run in parallel
+        '''
+        if operation not in PARALLEL_OPERATIONS:
+            raise ValueError(f"{operation} cannot be run in parallel")
+        halo = PARALLEL_OPERATIONS[operation](*args)
+        clamp = operation != "glass" or args[1:2] == ("clamp",)
+        planes = self._planes()
+        typecode = planes[0].typecode
+        num_cols = self.getNumCols()
+        num_rows = self.getNumRows()
+
+        #the operation is applied to an image with no rows to find the header (and the
+        #number of channels) it produces
+        result = Netpbm._fromParts([self._header[0], self._header[1], [num_cols, 0], self._header[3]])
+        result._setPlanes([array(typecode) for plane in planes])
+        getattr(result, operation)(*args)
+
+        plane_bytes = num_cols * num_rows * planes[0].itemsize
+        if plane_bytes == 0:
+            self._header = result.getHeader()
+            self._header[2][1] = num_rows
+            return
+        source = shared_memory.SharedMemory(create=True, size=plane_bytes * len(planes))
+        destination = shared_memory.SharedMemory(create=True, size=plane_bytes * result._numChannels())
+        try:
+            for i in range(len(planes)):
+                source.buf[i * plane_bytes:(i + 1) * plane_bytes] = memoryview(planes[i]).cast("B")
+            tasks = []
+            for first_row in range(0, num_rows, strip_rows):
+                tasks.append((source.name, destination.name, self.getHeader(), typecode, first_row,
+                              min(first_row + strip_rows, num_rows), halo, clamp, operation, args, seed))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for finished in executor.map(_runStrip, tasks):
+                    pass
+            pixels = []
+            for i in range(result._numChannels()):
+                plane = array(typecode)
+                plane.frombytes(destination.buf[i * plane_bytes:(i + 1) * plane_bytes])
+                pixels.append(plane)
+        finally:
+            source.close()
+            source.unlink()
+            destination.close()
+            destination.unlink()
+        self._header = result.getHeader()
+        self._header[2][1] = num_rows
+        self._setPlanes(pixels)
+
+
+def _runStrip(task: tuple) -> None:
+    '''
+    Function that a Netpbm.parallel worker process runs on one strip: it reads the rows of
+    the strip (and its halo rows) out of the source shared memory, applies the operation
+    and writes the rows of the strip, without the halo, into the destination shared memory.
+    Args:
+        task: tuple -- the source and destination shared memory names, the header of the
+        whole image, the typecode of its channel arrays, the first and last (excluded) rows
+        of the strip, the number of halo rows, whether the halo stops at the edges of the
+        image (leaving the operation to repeat the edge rows) rather than wrap around, the
+        name and arguments of the operation, and the seed
+    Returns:
+        Nothing. This function is nonfruitful
+    '''
+    (source_name, destination_name, header, typecode, first_row, last_row, halo, clamp,
+     operation, args, seed) = task
+    source = shared_memory.SharedMemory(name=source_name)
+    destination = shared_memory.SharedMemory(name=destination_name)
+    try:
+        num_cols = header[2][0]
+        num_rows = header[2][1]
+        itemsize = array(typecode).itemsize
+        row_bytes = num_cols * itemsize
+        plane_bytes = row_bytes * num_rows
+        top_row = first_row - halo
+        bottom_row = last_row + halo
+        if clamp == True:
+            top_row = max(top_row, 0)
+            bottom_row = min(bottom_row, num_rows)
+        strip = Netpbm._fromParts([header[0], header[1], [num_cols, bottom_row - top_row], header[3]])
+        planes = []
+        for i in range(strip._numChannels()):
+            plane = array(typecode)
+            for r in range(top_row, bottom_row):
+                start = (i * plane_bytes) + ((r % num_rows) * row_bytes)
+                plane.frombytes(source.buf[start:start + row_bytes])
+            planes.append(plane)
+        strip._setPlanes(planes)
+        if operation in SEEDED_OPERATIONS:
+            getattr(strip, operation)(*args, seed=f"{seed}:{first_row}")
+        else:
+            getattr(strip, operation)(*args)
+        planes = strip._planes()
+        for i in range(len(planes)):
+            start = (i * plane_bytes) + (first_row * row_bytes)
+            rows = planes[i][(first_row - top_row) * num_cols:(last_row - top_row) * num_cols]
+            destination.buf[start:start + len(rows) * itemsize] = memoryview(rows).cast("B")
+    finally:
+        source.close()
+        destination.close()
+
+
+def _parseStrip(task: tuple) -> array:
+    '''
+    Function that a worker process runs on one strip of a plain file being parsed in
+    parallel (see Netpbm._readRegion): it opens the file, seeks to the indexed row the
+    strip starts from and parses the rows of the strip.
+    Args:
+        task: tuple -- the filename, the header of the image, the position of the indexed
+        row, the number of rows from there to the first row of the strip, the number of
+        rows in the strip and the first and last (excluded) columns to keep
+    Returns:
+        The samples of the strip, in file order
+    '''
+    filename, header, offset, skip_rows, num_rows, first_column, last_column = task
+    image = Netpbm._fromParts(header)
+    with open(filename, "rb") as image_file:
+        image_file.seek(offset)
+        return image._parseRows(image_file, skip_rows, num_rows, first_column, last_column)
+
+
+class NetpbmStream:
+    '''
+    Class that processes an image one horizontal strip at a time, for images too large to
+    hold in memory. The file is read lazily, each operation is a generator stage applied to
+    every strip as it passes through, and writeImage writes each strip as soon as it comes
+    out of the last stage, so memory use depends on the width of the image and the strip
+    height but not on the number of rows.
+
+    Only operations that work on each strip independently are available: changeBrightness,
+    invert, gamma, levels, curves, posterize, toGrayscale and flip(vertical=False), plus
+    resize, which keeps just the source rows under the output row it is making. Nothing is read until
+    writeImage (or getStrips) is called, and a stream can only be written once.
+    '''
+
+    __slots__ = ('_image', '_num_rows', '_strip_rows', '_strips', '_file', '_owns_file')
+
+    def __init__(self, source: 'str | bytes | BinaryIO', strip_rows: int = STRIP_ROWS):
+        '''
+        Method that opens an image for streaming and reads its header.
+        Args:
+            self: argument used for all methods within a given class
+            source: str | bytes | BinaryIO -- The filename of the image to be operated on,
+            "-" to read it from standard input, the bytes of an image, or a binary file
+            object such as a pipe (which is left open)
+            strip_rows: int -- the number of rows in each strip
+        Returns:
+            Nothing. This method is nonfruitful.
+        '''
+        self._file, self._owns_file = _openSource(source)
+        header = Netpbm._fromParts(None).readHeader(self._file)
+        self._num_rows = header[2][1]
+        self._strip_rows = strip_rows
+        self._strips = self._readStrips(header)
+
+        #the operations are applied straight away to an image with no rows, which keeps
+        #its header in step with the header of the strips that will come out of them
+        self._image = Netpbm._fromParts(self._stripHeader(header, 0))
+        self._image._setPlanes([array(_typecode(header[3])) for i in range(self._image._numChannels())])
+
+    def getMagicNumber(self) -> str:
+        '''
+        Method that gets the magic number the image will have once the operations are applied.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The magic number as a string
+        '''
+        return self._image.getMagicNumber()
+
+    def getNumCols(self) -> int:
+        '''
+        Method that gets the number of columns of the image
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The number of columns as an integer
+        '''
+        return self._image.getNumCols()
+
+    def getNumRows(self) -> int:
+        '''
+        Method that gets the number of rows of the image
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            The number of rows as an integer
+        '''
+        return self._num_rows
 
+    def getMaxLevel(self) -> int:
         '''
-        Method that initializes an object of the Netpbm class along with the isntance variables
-        used throughout the program.
+        Method that gets the maximum pixel level the image will have once the operations are applied.
         Args:
             self: argument used for all methods within a given class
-            filename: str -- The filename of the image to be operated on using an object of
-            the Netpbm class.
         Returns:
-            Nothing. This method is nonfruitful.
+            The maximum pixel level as an integer
         '''
+        return self._image.getMaxLevel()
 
-        file_handle = open(filename,"r")
-        self._header = self.readHeader(file_handle)
-        if self._header[0] == "P2":
-            self._pixels = self.readPGMPixels(file_handle)
-        else: #if magic number is p2, pgm header; if its its p3, we use ppm header
-            self._pixels = self.readPPMPixels(file_handle)
-        file_handle.close()
-
-
+    def getStrips(self) -> 'Iterator[Netpbm]':
+        '''
+        Method that hands out the strips of the image, with every operation applied, as
+        they are read. Each strip is a Netpbm object holding strip_rows rows (fewer for the
+        last one) that can be inspected or written like any other image.
+        Args:
+            self: argument used for all methods within a given class
+        Returns:
+            An iterator of Netpbm objects, from the top of the image to the bottom
+        '''
+        return self._strips
 
-    def readHeader(self, image_file: 'TextIO') -> list: #image file is the file handle here
+    def _readStrips(self, header: list) -> 'Iterator[Netpbm]':
+        '''
+        Method that is the source of the pipeline: it reads the payload one strip at a time.
+        Raw strips are read with a single read call each, plain strips are cut from the
+        chunks produced by Netpbm._iterSamples.
+        Args:
+            self: argument used for all methods within a given class
+            header: list -- the header of the source file
+        Yields:
+            A Netpbm object for each strip
+        '''
+        num_cols = header[2][0]
+        num_rows = header[2][1]
+        source = Netpbm._fromParts(header)
+        samples_per_row = num_cols * source._numChannels()
+        try:
+            if source.isBinary() == True:
+                bytes_per_row = samples_per_row * array(_typecode(source.getMaxLevel())).itemsize
+                for first_row in range(0, num_rows, self._strip_rows):
+                    strip_rows = min(self._strip_rows, num_rows - first_row)
+                    raster = _readExactly(self._file, bytes_per_row * strip_rows)
+                    if len(raster) < bytes_per_row * strip_rows:
+                        raise ValueError(f"Pixel payload is truncated at row {first_row}")
+                    _checkRaster(memoryview(raster), source.getMaxLevel())
+                    yield Netpbm._fromParts(self._stripHeader(header, strip_rows), raster=memoryview(raster))
+            else:
+                pending = array(_typecode(source.getMaxLevel()))
+                first_row = 0
+                for samples in source._iterSamples(self._file, num_samples=samples_per_row * num_rows):
+                    pending.extend(samples)
+                    while first_row < num_rows and len(pending) >= samples_per_row * min(self._strip_rows, num_rows - first_row):
+                        strip_rows = min(self._strip_rows, num_rows - first_row)
+                        strip_samples = pending[:samples_per_row * strip_rows]
+                        del pending[:samples_per_row * strip_rows]
+                        yield self._stripFromSamples(header, strip_rows, strip_samples)
+                        first_row = first_row + strip_rows
+                source._checkSampleCount(self._file, first_row * samples_per_row + len(pending),
+                                         samples_per_row * num_rows)
+        finally:
+            if self._owns_file == True:
+                self._file.close()
 
+    def _stripHeader(self, header: list, strip_rows: int) -> list:
         '''
-        Method that reads the header information (lines 1-4) of a given PGM or PPM file using the file
-        handle, then returns this information as part of a header list.
+        Method that makes the header of a strip from the header of the whole image.
         Args:
             self: argument used for all methods within a given class
-            image_file: 'TextIO' -- The filehandle for the given file that can be used for reading.
+            header: list -- the header of the whole image
+            strip_rows: int -- the number of rows in the strip
         Returns:
-            A list called header contianing the header information for a file, including the magic number, a comment,
-            the number of columns and rows, and the maximum level.
+            A new header list
         '''
+        return [header[0], header[1], [header[2][0], strip_rows], header[3]]
 
-        #As a reminder: PGM files contain the following
-            #line 1: P2: the magic magic_number (part of header info)
-            #Line 2: Comment beginning with # (part of header info)
-            #Line 3: Number of columns then rows (part of header info)
-            #Line 4 Maximum gray level (part of header info)
-            #Remainder of file: pixel payload with integer between 0 and max level (both inclusive)
-
-            #Also: a note on filename vs. file handle. Above we are using the file handle, which
-            #can be used in functions like readline and close, while the filename can not
-            #In this situation, passing in the file handle enables us to track our work in the file.
-            #readheader for a pgm file
+    def _stripFromSamples(self, header: list, strip_rows: int, samples: array) -> Netpbm:
+        '''
+        Method that wraps the samples of a strip, in file order, in a Netpbm object.
+        Args:
+            self: argument used for all methods within a given class
+            header: list -- the header of the whole image
+            strip_rows: int -- the number of rows in the strip
+            samples: array -- the samples of the strip
+        Returns:
+            The strip as a Netpbm object
+        '''
+        strip = Netpbm._fromParts(self._stripHeader(header, strip_rows))
+        if strip.isPGM() == True:
+            strip._setPlanes([samples])
+        else:
+            strip._setPlanes([samples[0::3], samples[1::3], samples[2::3]])
+        return strip
 
-        magic_number = image_file.readline().strip()
-        comment = image_file.readline().strip()
-        cols_rows = image_file.readline().strip()
-        cols_rows_list = cols_rows.split()
+    def _addStage(self, operation: str, *args) -> None:
+        '''
+        Method that appends a generator stage to the pipeline which calls a Netpbm method
+        on every strip that passes through it.
+        Args:
+            self: argument used for all methods within a given class
+            operation: str -- the name of the Netpbm method to call
+            args: the arguments to pass to the method
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        getattr(self._image, operation)(*args)
+        upstream = self._strips
 
-        for i in range(len(cols_rows_list)):
-            cols_rows_list[i] = int(cols_rows_list[i])
+        def stage():
+            for strip in upstream:
+                getattr(strip, operation)(*args)
+                yield strip
 
-        max_level = int(image_file.readline().strip())
-        header = [magic_number, comment, cols_rows_list, max_level]
-        return header
+        self._strips = stage()
 
-    def readPGMPixels(self, image_file: 'TextIO') -> list:
+    def changeBrightness(self, amount: int) -> None:
         '''
-        Method that reads the pixels information from a given PGM file using the file
-        handle, then returns this information as part of a pixel list.
+        Method that adds a Netpbm.changeBrightness stage to the pipeline.
         Args:
             self: argument used for all methods within a given class
-            image_file: 'TextIO' -- The filehandle for the given file that can be used for reading.
+            amount: int -- the integer value by which the brightness is to be altered
         Returns:
-            A 1d list of integers called pixel_list containing the value of each pixel that comprises the image,
+            Nothing. This method is nonfruitful
         '''
-        line = image_file.readline() #read pixels for a pgm file
-        pixel_list = []
-        while line != '':
-            line_list = line.strip().split()
-            for i in range(len(line_list)):
-                pixel_list.append(int(line_list[i]))
-            line = image_file.readline()
-        return pixel_list
-
+        self._addStage("changeBrightness", amount)
 
-    def readPPMPixels(self, image_file: 'TextIO') -> list:
+    def invert(self) -> None:
         '''
-        Method that reads the pixels information from a given PPM file using the file
-        handle, then returns this information as part of a pixel list.
+        Method that adds a Netpbm.invert stage to the pipeline.
         Args:
             self: argument used for all methods within a given class
-            image_file: 'TextIO' -- The filehandle for the given file that can be used for reading.
         Returns:
-            A 3 element list of integers called pixel_list containing a list of red pixels,
-            a list of green pixels, and a list of blue pixels.
+            Nothing. This method is nonfruitful
         '''
-        all_values_list = (image_file.read().strip().split())
-        red_list = []
-        green_list = []
-        blue_list = []
+        self._addStage("invert")
 
-        for i in range(0, len(all_values_list),3):
-            red_list.append(int(all_values_list[i]))
-        for i in range(1, len(all_values_list),3):
-            green_list.append(int(all_values_list[i]))
-        for i in range(2, len(all_values_list), 3):
-            blue_list.append(int(all_values_list[i]))
-        return [red_list,green_list,blue_list]
+    def posterize(self, num_levels: int) -> None:
+        '''
+        Method that adds a Netpbm.posterize stage to the pipeline.
+        Args:
+            self: argument used for all methods within a given class
+            num_levels: int -- the number of levels the pixels are reduced to
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        self._addStage("posterize", num_levels)
 
+    def toGrayscale(self, standard: str = "rec709") -> None:
+        '''
+        Method that adds a Netpbm.toGrayscale stage to the pipeline.
+        Args:
+            self: argument used for all methods within a given class
+            standard: str -- the luma standard, as for Netpbm.toGrayscale
+        Returns:
+            Nothing. This method is nonfruitful
+        '''
+        self._addStage("toGrayscale", standard)
 
-    def isPGM(self) -> bool:
+    def flip(self, vertical: bool = True) -> None:
         '''
-        Method that determines the status of the file, whether PPM or PGM
+        Method that adds a horizontal Netpbm.flip stage to the pipeline. A vertical flip
+        needs the last row before the first one can be written, so it cannot be streamed.
         Args:
             self: argument used for all methods within a given class
+            vertical: bool -- must be False
         Returns:
-            A boolean expression (True or False) indicating whether or not the magic number
-            for the give file is P2 or P3
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if vertical is True
         '''
-        magicNumber = self.getMagicNumber()
-        if magicNumber == "P2":
-            return True
-        else:
-            return False
+        if vertical == True:
+            raise ValueError("A vertical flip cannot be streamed; load the image with Netpbm instead")
+        self._addStage("flip", False)
 
-    def getMagicNumber(self) -> str:
+    def gamma(self, gamma: float) -> None:
         '''
-        Method that gets the magic number.
+        Method that adds a Netpbm.gamma stage to the pipeline.
         Args:
             self: argument used for all methods within a given class
+            gamma: float -- the gamma value, which must be above 0
         Returns:
-            The magic number at self._header[0] as a string
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if gamma is not above 0
         '''
-        return self._header[0]
+        self._addStage("gamma", gamma)
 
-    def getComment(self) -> str:
+    def levels(self, black_level: int, white_level: int, gamma: float = 1.0) -> None:
         '''
-        Method that gets comment from the header.
+        Method that adds a Netpbm.levels stage to the pipeline.
         Args:
             self: argument used for all methods within a given class
+            black_level: int -- the input level that becomes 0
+            white_level: int -- the input level that becomes the maximum level
+            gamma: float -- the gamma applied to the mid tones
         Returns:
-            The comment at self._header[1] as a string
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if white_level is not above black_level or gamma is not above 0
         '''
-        return self._header[1]
+        self._addStage("levels", black_level, white_level, gamma)
 
-    def getNumCols(self) -> int:
+    def curves(self, points: list) -> None:
         '''
-        Method that gets the number of columns from the header
+        Method that adds a Netpbm.curves stage to the pipeline.
         Args:
             self: argument used for all methods within a given class
+            points: list -- (input level, output level) pairs
         Returns:
-            The number of columns at self._header[2][0] as an integer
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if the points are not valid (see Netpbm.curves)
         '''
-        return self._header[2][0]
+        self._addStage("curves", points)
 
-    def getNumRows(self) -> int:
+    def resize(self, num_cols: int, num_rows: int, method: str = "area") -> None:
         '''
-        Method that gets the number of rows from the header
+        Method that adds a Netpbm.resize stage to the pipeline. Source rows are resized
+        across as they arrive and each output row is made as soon as the source rows under
+        it have been read, so only those rows are held in memory.
         Args:
             self: argument used for all methods within a given class
+            num_cols: int -- the number of columns after resizing
+            num_rows: int -- the number of rows after resizing
+            method: str -- "nearest", "bilinear" or "area" (see Netpbm.resize)
         Returns:
-            The number of rows at self._header[2][1] as an integer
-            '''
-        return self._header[2][1]
+            Nothing. This method is nonfruitful
+        Raises:
+            ValueError: if the method is unknown or a size is not positive
+        '''
+        _checkResize(num_cols, num_rows, method)
+        source_cols = self.getNumCols()
+        source_rows = self._num_rows
+        self._image._header[2] = [num_cols, 0] #the template has no rows, so only its header changes
+        header = self._image.getHeader()
+        typecode = _typecode(header[3])
+        strip_rows = self._strip_rows
+        upstream = self._strips
+        self._num_rows = num_rows
 
-    def getMaxLevel(self) -> int:
-        return self._header[3]
+        def sourceRows():
+            for strip in upstream:
+                planes = strip._planes()
+                for r in range(strip.getNumRows()):
+                    yield [plane[r * source_cols:(r + 1) * source_cols] for plane in planes]
+
+        def stage():
+            pending = []
+            if source_rows > 0:
+                for row in _resizeRows(sourceRows(), source_cols, source_rows, num_cols, num_rows, method, typecode):
+                    pending.append(row)
+                    if len(pending) == strip_rows:
+                        yield self._stripFromRows(header, pending)
+                        pending = []
+            if len(pending) > 0:
+                yield self._stripFromRows(header, pending)
+
+        self._strips = stage()
+
+    def _stripFromRows(self, header: list, rows: list) -> Netpbm:
         '''
-        Method that gets the maximum pixel level for the image.
+        Method that joins rows, each a list holding that row of every channel, into a strip.
         Args:
             self: argument used for all methods within a given class
+            header: list -- the header of the whole image
+            rows: list -- the rows of the strip
         Returns:
-            The maximum pixel level at self._header[3] as an integer
+            The strip as a Netpbm object
         '''
+        typecode = _typecode(header[3])
+        planes = [array(typecode) for channel in rows[0]]
+        for row in rows:
+            for i in range(len(row)):
+                planes[i].extend(row[i])
+        strip = Netpbm._fromParts(self._stripHeader(header, len(rows)))
+        strip._setPlanes(planes)
+        return strip
 
-    def getHeader(self) -> list:
+    def writeImage(self, destination: 'str | BinaryIO', binary: bool = None, line_width: int = None) -> None:
         '''
-        Method that returns the header for an image
+        Method that is the sink of the pipeline: it pulls the strips through every stage
+        and writes each one to the file as soon as it arrives.
         Args:
             self: argument used for all methods within a given class
+            destination: str | BinaryIO -- the name of the file as a string, "-" for
+            standard output, or a binary file object (which is flushed and left open)
+            binary: bool -- True to write a raw P5/P6 file, False to write a plain P2/P3
+            file, or None (the default) to keep the encoding of the source
+            line_width: int -- for plain files, the number of samples written on each line,
+            or None (the default) to start each image row on a new line and fit as many whole
+            pixels on a line as PLAIN_LINE_LENGTH allows
         Returns:
-            a copy of the header information from an image as a list
+            Nothing. This method is nonfruitful
         '''
-        return copy.deepcopy(self._header)
+        header = self._image.getHeader()
+        header[2][1] = self._num_rows
+        output_file, owned = _openSink(destination)
+        try:
+            Netpbm._fromParts(header).writeHeader(output_file, binary)
+            if binary is None:
+                binary = self._image.isBinary()
+            for strip in self._strips:
+                strip.writePixels(output_file, binary, line_width)
+        finally:
+            _closeSink(output_file, owned)
 
-    def getPixels(self) -> list:
+
+class ImageCache:
+    '''
+    Class that keeps parsed images in memory so that opening the same file again does not
+    parse it again. Entries are found by path and are only used while the modification
+    time and size of the file are unchanged. When the pixels held add up to more than
+    max_bytes the least recently used images are dropped. Callers get copies (see
+    Netpbm.copy) that share the cached pixels until they change them, so a cached image is
+    never altered by its users. Raw payloads are copied out of their memory map before
+    they are cached, so changing the file later does not change the images already
+    handed out. It is safe to use from several threads.
+    '''
+
+    __slots__ = ('_entries', '_max_bytes', '_num_bytes', '_hits', '_misses', '_evictions', '_lock')
+
+    def __init__(self, max_bytes: int = IMAGE_CACHE_BYTES):
         '''
-        Method that returns the pixels for an image
+        Method that initializes an empty cache.
         Args:
             self: argument used for all methods within a given class
+            max_bytes: int -- the most bytes of pixels the cache may hold
         Returns:
-            a copy of the pixel information for either a PGM or PPM file as a list
+            Nothing. This method is nonfruitful.
         '''
-        return copy.deepcopy(self._pixels)
+        self._entries = collections.OrderedDict() #path -> (mtime, size, image, bytes), oldest first
+        self._max_bytes = max_bytes
+        self._num_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
 
+    def open(self, filename: str, lazy: bool = False) -> Netpbm:
+        '''
+        Method that returns an image, from the cache if the file has not changed since it
+        was cached, otherwise by parsing the file (and caching the result).
+        Args:
+            self: argument used for all methods within a given class
+            filename: str -- the filename of the image
+            lazy: bool -- passed on to the image returned (see Netpbm.setLazy)
+        Returns:
+            A Netpbm object of its own, sharing its pixels with the cache until it is changed
+        '''
+        path = os.path.realpath(filename)
+        status = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == status.st_mtime_ns and entry[1] == status.st_size:
+                self._entries.move_to_end(path)
+                self._hits = self._hits + 1
+                image = entry[2].copy()
+                image.setLazy(lazy)
+                return image
+            self._misses = self._misses + 1
+        #parsing happens outside the lock so that other files can be served meanwhile
+        cached = Netpbm(path)
+        if cached._raster is not None and isinstance(cached._raster.obj, mmap.mmap):
+            #a memory-mapped payload would change, or fault, with the file under it, and
+            #copies of the entry are handed out long after the file may have been rewritten
+            cached._raster = memoryview(cached._raster.tobytes())
+        num_bytes = cached._numBytes()
+        with self._lock:
+            self._remove(path)
+            if num_bytes <= self._max_bytes:
+                self._entries[path] = (status.st_mtime_ns, status.st_size, cached, num_bytes)
+                self._num_bytes = self._num_bytes + num_bytes
+                self._evict()
+        image = cached.copy()
+        image.setLazy(lazy)
+        return image
 
-    def writeImage(self, filename: str) -> None:
+    def _remove(self, path: str) -> None:
         '''
-        Method that writes out the pixel and header content of a Netpbm object
-        to another file.
+        Method that drops the entry of a path, if there is one. The lock must be held.
         Args:
             self: argument used for all methods within a given class
-            filename: str --the name of the file as a string
+            path: str -- the real path of the file
         Returns:
             Nothing. This method is nonfruitful
         '''
-        output_file = open(filename, "w")
-        self.writeHeader(output_file)
-        self.writePixels(output_file)
-        output_file.close()
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._num_bytes = self._num_bytes - entry[3]
 
-    def writeHeader(self, image_file: 'TextIO') -> None:
+    def _evict(self) -> None:
         '''
-        Method that writes out the header information using the
-        filehandle from the fiven image and that is used by the
-        writeImage method.
+        Method that drops least recently used entries until the cache fits in max_bytes.
+        The lock must be held.
         Args:
             self: argument used for all methods within a given class
-            image_file: TextIO -- the filehandle for a given file
         Returns:
             Nothing. This method is nonfruitful
         '''
-        image_file.write((str(self._header[0])) + "\n")
-        image_file.write((str(self._header[1])) + "\n")
-        num_cols = (str(self._header[2][0]) + " ")
-        num_rows = (str(self._header[2][1]) + "\n")
-        image_file.write(str(num_cols))
-        image_file.write(str(num_rows))
-        image_file.write((str(self._header[3])) + "\n")
+        while self._num_bytes > self._max_bytes and len(self._entries) > 0:
+            path, entry = self._entries.popitem(last=False)
+            self._num_bytes = self._num_bytes - entry[3]
+            self._evictions = self._evictions + 1
 
-    def writePixels(self, image_file: 'TextIO') -> None:
+    def setMaxBytes(self, max_bytes: int) -> None:
         '''
-        Method that writes out the pixel information using the
-        filehandle from the fiven image and that is used by the
-        writeImage method. The operation is altered for a 3-element
-        list PPM file vs. a 1D list PGM file using an if statement.
+        Method that changes the most bytes of pixels the cache may hold, evicting entries
+        if it now holds too many.
         Args:
             self: argument used for all methods within a given class
-            image_file: TextIO -- the filehandle for a given file
+            max_bytes: int -- the new limit
         Returns:
             Nothing. This method is nonfruitful
         '''
-        if self.isPGM() == True:
-            num_cols = self.getNumCols()
-            num_rows = self.getNumRows()
-            for i in range((num_cols) * (num_rows)):
-                image_file.write((str(self._pixels[i])) + "\n")
-        else:
-            num_cols = self.getNumCols()
-            num_rows = self.getNumRows()
-            for i in range(num_cols*num_rows):
-                for j in range(num_rows):
-                    image_file.write((str(self._pixels[j][i])) + "\n")
-
-    #new after working previous methods (up to B level specifications)
-
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
 
-    def changeBrightness(self, amount: int) -> None:
+    def clear(self) -> None:
         '''
-        Method that changes the brightness of an image by modifying
-        information containined in the self._pixels instance variable. The
-        approach varies depending on whether Fauxtoshop is operating on a PGM
-        file or PPM file and this change is illustrated via the use of an if
-        else statement which relates a specific set of steps to a specific
-        magic number.
+        Method that empties the cache. The counters are kept.
         Args:
             self: argument used for all methods within a given class
-            amount: int -- the integer value by which the brightness is to be altered
         Returns:
             Nothing. This method is nonfruitful
         '''
-        max_level = self.getMaxLevel()
-        if self.getMagicNumber() == "P2":
-            for i in range (len(self._pixels)):
-                max_value = self._pixels[i] + amount
-                if max_value < 0:
-                    max_value  = 0
-                    self._pixels[i] = max_value
-                if max_value > max_level:
-                    self._pixels[i] = max_level
-                else:
-                    self._pixels[i] = max_value
-        else:
-            num_rows = self.getNumRows()
-            num_cols = self.getNumCols()
-            reds = self._pixels[0]
-            greens = self._pixels[1]
-            blues = self._pixels[2]
-
-            for r in range(num_rows):
-                for c in range(num_cols):
-                    index = ((num_cols * r) + c)
-
-                    reds[index] = reds[index] + amount
-                    if (reds[index] + amount) < 0:
-                        reds[index] = 0
-                        self._pixels[0][index] = reds[index]
-                    if (reds[index] + amount) > max_level:
-                        reds[index] = max_level
-                        self._pixels[0][index] = reds[index]
-                    else:
-                        self._pixels[0][index] = reds[index]
-
-                    greens[index] = greens[index] + amount
-                    if (greens[index] + amount) < 0:
-                        greens[index] = 0
-                        self._pixels[1][index] = greens[index]
-                    if (greens[index] + amount) > max_level:
-                        greens[index] = max_level
-                        self._pixels[1][index] = greens[index]
-                    else:
-                        self._pixels[1][index] = greens[index]
-
-                    blues[index] = blues[index] + amount
-                    if (blues[index] + amount) < 0:
-                        blues[index] = 0
-                        self._pixels[2][index] = blues[index]
-                    if (blues[index] + amount) > max_level:
-                        blues[index] = max_level
-                        self._pixels[2][index] = blues[index]
-                    else:
-                        self._pixels[2][index] = blues[index]
-
+        with self._lock:
+            self._entries.clear()
+            self._num_bytes = 0
 
-    def invert(self) -> None:
+    def getStatistics(self) -> dict:
         '''
-        Method that inverts an image by taking the maximum value for a given pixel
-        and subtracting from that the actual value to get the inverse value. The
-        approach varies depending on whether Fauxtoshop is operating on a PGM
-        file or PPM file and this change is illustrated via the use of an if
-        else statement which relates a specific set of steps to a specific
-        magic number.
+        Method that returns the counters of the cache, to help choose its size.
         Args:
             self: argument used for all methods within a given class
-
         Returns:
-            Nothing. This method is nonfruitful
+            A dictionary with the number of hits, misses and evictions so far, and the
+            number of entries and bytes held now, and the limit on the bytes
         '''
-        magic_number = self.getMagicNumber()
-        if magic_number == "P2":
-            for i in range(len(self._pixels)):
-                originalPixelValue = int(self._pixels[i])
-                self._pixels[i] = 255 - originalPixelValue
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "evictions": self._evictions,
+                    "entries": len(self._entries), "bytes": self._num_bytes, "max_bytes": self._max_bytes}
 
-        if magic_number == "P3":
-            reds = self._pixels[0]
-            blues = self._pixels[1]
-            greens = self._pixels[2]
-            num_cols = self.getNumCols()
-            num_rows = self.getNumRows()
 
-            for r in range (num_rows):
-                for c in range (num_cols):
-                     index = ((num_cols * r) + c)
+_image_cache = ImageCache()
 
-                     original_value_reds = reds[index]
-                     self._pixels[0][index] = 255 - original_value_reds
 
-                     original_value_greens = greens[index]
-                     self._pixels[1][index] = 255 - original_value_greens
+def openImage(filename: str, lazy: bool = False) -> Netpbm:
+    '''
+    Function that opens an image through the process-wide ImageCache, parsing the file only
+    if it is not cached or has changed since.
+    Args:
+        filename: str -- the filename of the image
+        lazy: bool -- passed on to the image returned (see Netpbm.setLazy)
+    Returns:
+        A Netpbm object of its own, sharing its pixels with the cache until it is changed
+    '''
+    return _image_cache.open(filename, lazy)
 
-                     original_value_blues = blues[index]
-                     self._pixels[2][index] = 255 - original_value_blues
 
-    def rotate(self, rotate_right: bool = True) -> None:
+def getImageCache() -> ImageCache:
+    '''
+    Function that returns the process-wide ImageCache used by openImage, to read its
+    counters, resize or clear it.
+    Returns:
+        The ImageCache
+    '''
+    return _image_cache
+
+
+_async_state = {"executor": None, "max_workers": ASYNC_WORKERS, "max_concurrency": ASYNC_MAX_CONCURRENCY,
+                "limiters": weakref.WeakKeyDictionary()}
+_async_lock = threading.Lock()
+
+
+def setAsyncLimits(max_concurrency: int = ASYNC_MAX_CONCURRENCY, max_workers: int = ASYNC_WORKERS) -> None:
+    '''
+    Function that sets how much work the asyncio methods (Netpbm.aopen, awrite and arun)
+    may do at once. Calls beyond max_concurrency wait for a running one to finish, so a
+    burst of requests queues up instead of piling work and memory onto the executor.
+    Args:
+        max_concurrency: int -- the most calls running at once in each event loop
+        max_workers: int -- the number of threads of the shared executor, or None for the
+        ThreadPoolExecutor default
+    Returns:
+        Nothing. This function is nonfruitful
+    '''
+    with _async_lock:
+        executor = _async_state["executor"]
+        _async_state["executor"] = None
+        _async_state["max_workers"] = max_workers
+        _async_state["max_concurrency"] = max_concurrency
+        _async_state["limiters"] = weakref.WeakKeyDictionary()
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+async def _runAsync(function: 'Callable', *args) -> object:
+    '''
+    Function that runs a blocking call on the shared executor once the concurrency limiter
+    of the running event loop has room for it.
+    Args:
+        function: Callable -- the blocking call
+        args: the arguments to pass to it
+    Returns:
+        What the call returns
+    '''
+    loop = asyncio.get_running_loop()
+    with _async_lock:
+        if _async_state["executor"] is None:
+            _async_state["executor"] = ThreadPoolExecutor(max_workers=_async_state["max_workers"],
+                                                          thread_name_prefix="netpbm")
+        executor = _async_state["executor"]
+        limiter = _async_state["limiters"].get(loop)
+        if limiter is None:
+            limiter = asyncio.Semaphore(_async_state["max_concurrency"])
+            _async_state["limiters"][loop] = limiter
+    async with limiter:
+        #in the context of the caller, so that instrumented calls count as nested in it
+        return await loop.run_in_executor(executor, functools.partial(contextvars.copy_context().run,
+                                                                      function, *args))
+
+
+class LoggingSink:
+    '''
+    Instrumentation sink that logs every record as one message of a logging.Logger.
+    '''
+
+    __slots__ = ('_logger', '_level')
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO):
         '''
-        Method that rotates the image to the right by 90 degrees or to the left by 90 degrees
-        depending on the booleann given. It does this by stepping through
-        the columns and rows in a specific manner, appending the pixels in
-        that speciifc manner, then altering the number of rows and columns appropriately. The
-        approach varies depending on whether Fauxtoshop is operating on a PGM
-        file or PPM file and this change is illustrated via the use of an if
-        else statement which relates a specific set of steps to a specific
-        magic number.
+        Method that initializes the sink.
         Args:
             self: argument used for all methods within a given class
-            rotate_right: bool -- A boolean indicating whether the method is to perform
-            rotate right or rotate left.
+            logger: logging.Logger -- the logger to write to, or None for the "Netpbm" logger
+            level: int -- the logging level of the messages
         Returns:
-            Nothing. This method is nonfruitful
+            Nothing. This method is nonfruitful.
         '''
-        if self._header[0] == "P2":
-            num_cols = self.getNumCols()
-            num_rows = self.getNumRows()
-            pixel_list = []
-            if rotate_right == True: #WORKING
-                for c in range (0, num_cols, 1):
-                    for r in range (num_rows-1, -1, -1):
-                        index = ((num_cols*r)+c)
-                        pixel_list.append(self._pixels[index])
-                self._pixels = pixel_list
-                change_variable = num_cols
-                num_cols = num_rows
-                num_rows = change_variable
-                self._header[2][0] = num_cols
-                self._header[2][1] = num_rows
-            else:
-                for c in range (num_cols-1, -1, -1):
-                    for r in range (0, num_rows, 1):
-                        index = ((num_cols*r)+c)
-                        pixel_list.append(self._pixels[index])
-                self._pixels = pixel_list
-                change_variable = num_cols
-                num_cols = num_rows
-                num_rows = change_variable
-                self._header[2][0] = num_cols
-                self._header[2][1] = num_rows
-
-        if self._header[0] == "P3":
-            reds = self._pixels[0]
-            greens = self._pixels[1]
-            blues = self._pixels[2]
-            reds_list = []
-            blues_list = []
-            greens_list = []
-            num_cols = self.getNumCols()
-            num_rows = self.getNumRows()
-            pixel_list = [reds_list, greens_list, blues_list]
-            if rotate_right == True: #WORKING
-                for c in range (0, num_cols, 1):
-                    for r in range (num_rows-1, -1, -1):
-                        index = ((num_cols*r)+c)
-                        reds_list.append(self._pixels[0][index])
-                        greens_list.append(self._pixels[1][index])
-                        blues_list.append(self._pixels[2][index])
-                self._pixels = pixel_list
-                change_variable = num_cols
-                num_cols = num_rows
-                num_rows = change_variable
-                self._header[2][0] = num_cols
-                self._header[2][1] = num_rows
-            else:
-                for c in range (num_cols-1, -1, -1):
-                    for r in range (0, num_rows, 1):
-                        index = ((num_cols*r)+c)
-                        reds_list.append(self._pixels[0][index])
-                        greens_list.append(self._pixels[1][index])
-                        blues_list.append(self._pixels[2][index])
-                self._pixels = pixel_list
-                change_variable = num_cols
-                num_cols = num_rows
-                num_rows = change_variable
-                self._header[2][0] = num_cols
-                self._header[2][1] = num_rows
+        if logger is None:
+            logger = logging.getLogger("Netpbm")
+        self._logger = logger
+        self._level = level
 
-    def flip(self, vertical: bool = True) -> None:
+    def __call__(self, record: dict) -> None:
         '''
-        Method that flips the image horizontally or vertically depending on the boolean given
-        depending on the booleann given. It does this by stepping through
-        the columns and rows in a specific manner, then appending the pixels in
-        that speciifc manner. The approach varies depending on whether Fauxtoshop is operating on a PGM
-        file or PPM file and this change is illustrated via the use of an if
-        else statement which relates a specific set of steps to a specific
-        magic number.
+        Method that logs one record.
         Args:
             self: argument used for all methods within a given class
-            vertical: bool -- a boolean term indicating whether the image should be
-            flipped horizontally or vertically
+            record: dict -- the record, as described in setInstrumentation
         Returns:
-            Nothing. This method is nonfruitful
+            Nothing. This method is nonfruitful.
         '''
-        if self.isPGM() == True:
-            num_cols = self.getNumCols()
-            num_rows = self.getNumRows()
-            pixel_list = []
-            if vertical == True:
-                for r in range(num_rows-1, -1, -1):
-                    for c in range (0, num_cols, 1):
-                        index = ((num_cols*r)+c)
-                        pixel_list.append(self._pixels[index])
-                self._pixels = pixel_list
-            else:
-                for r in range(0, num_rows, 1):
-                    for c in range (num_cols - 1, -1, -1):
-                        index = ((num_cols*r)+c)
-                        pixel_list.append(self._pixels[index])
-                self._pixels = pixel_list
-
-        if self.isPGM() == False:
-            reds = self._pixels[0]
-            greens = self._pixels[1]
-            blues = self._pixels[2]
-            reds_list = []
-            blues_list = []
-            greens_list = []
-            pixel_list = [reds_list, greens_list, blues_list]
-            num_cols = self.getNumCols()
-            num_rows = self.getNumRows()
-            if vertical == True:
-                for r in range (num_rows-1, -1, -1):
-                    for c in range(0, num_cols, 1):
-                        index = ((num_cols*r)+c)
-                        reds_list.append(self._pixels[0][index])
-                        greens_list.append(self._pixels[1][index])
-                        blues_list.append(self._pixels[2][index])
-                self._pixels = pixel_list
-            else:
-                for r in range (0, num_rows, 1):
-                    for c in range(num_cols-1, -1, -1):
-                        index = ((num_cols*r)+c)
-                        reds_list.append(self._pixels[0][index])
-                        greens_list.append(self._pixels[1][index])
-                        blues_list.append(self._pixels[2][index])
-                self._pixels = pixel_list
+        self._logger.log(self._level, "%s %sx%s wall=%.6fs cpu=%.6fs read=%d written=%d allocated=%s",
+                         record["operation"], record["num_cols"], record["num_rows"], record["wall_seconds"],
+                         record["cpu_seconds"], record["bytes_read"], record["bytes_written"],
+                         record["allocated_bytes"], extra={"netpbm": record})
 
 
+class JsonLinesSink:
+    '''
+    Instrumentation sink that appends every record as one line of JSON to a file.
+    '''
 
-#for posterize, everything between 0 and the half goes into the half; everything from half to the one goes into the 1
-#first chunki into 1, second into 2, third into 3, fourth into 4 (256/2)
-#separate colors
-#divide value by bin widths to get new value of pixel
+    __slots__ = ('_file',)
 
-    def posterize(self, num_levels: int) -> None:
+    def __init__(self, filename: str):
         '''
-        Method that reduces the value of each pixel for a given image. It does this by stepping through
-        the given list of pixels and placing them in bins depending on the level of coloration a user in
-        photoshop desires. Each bin corresponds to specific levels that the pixel can take on. A range
-        of pixels with values that range widely are assorted into specific bins to reduce the number of values
-        that they can take on. The approach varies depending on whether Fauxtoshop is operating on a PGM
-        file or PPM file and this change is illustrated via the use of an if
-        else statement which relates a specific set of steps to a specific
-        magic number.
+        Method that initializes the sink, opening the file for appending.
         Args:
             self: argument used for all methods within a given class
-            num_leves: int -- an integer term indicating the number of levels the user wants
-            the pixels in the image to be able to take on
+            filename: str -- the file the records are appended to
         Returns:
-            Nothing. This method is nonfruitful
+            Nothing. This method is nonfruitful.
         '''
-        max_level = self.getMaxLevel()
-        bin_width = (max_level + 1) / num_levels
-        if self.isPGM() == True:
-            for i in range (len(self._pixels)):
-                binned = int(self._pixels[i] / bin_width)
-                self._pixels[i] = binned
-        else:
-            reds = self._pixels[0]
-            greens = self._pixels[1]
-            blues = self._pixels[2]
-            reds_list = []
-            blues_list = []
-            greens_list = []
-            pixel_list = [reds_list, greens_list, blues_list]
-            num_rows = self.getNumRows()
-            num_cols = self.getNumCols()
-            for r in range(num_rows):
-                for c in range(num_cols):
-                    index = ((num_cols * r) + c)
-                    red_binned = int((self._pixels[0][index]) / bin_width)
-                    blue_binned = int((self._pixels[1][index]) / bin_width)
-                    green_binned = int((self._pixels[2][index]) / bin_width)
-                    self._pixels[0][index] = red_binned
-                    self._pixels[1][index] = blue_binned
-                    self._pixels[2][index] = green_binned
-        self._header[3] = (num_levels)
+        self._file = open(filename, "a")
 
-    def crop(self, upper_left_row: int, upper_left_column: int, \
-    lower_right_row: int, lower_right_column: int) -> None:
+    def __call__(self, record: dict) -> None:
         '''
-        Method that crops the image by looping through the desired area and
-        appending pixels to the self._pixels instance variable appropriately,
-        then adjsuts the number of colums and rows accordingly so that the pixel
-        number for the resulting image matches the number looped through.
-        The approach varies depending on whether Fauxtoshop is operating on a PGM
-        file or PPM file and this change is illustrated via the use of an if
-        else statement which relates a specific set of steps to a specific
-        magic number.
+        Method that writes one record and flushes it, so that the file is complete even if
+        the program stops.
         Args:
             self: argument used for all methods within a given class
-            upper_left_row: int -- the integer row position of where the crop starts
-            upper_left_column: int -- the integer column position of where the crop starts
-            lower_right_row: int -- the integer row positon of where the crop ends
-            lower_right_column: int -- the integer column position of where the crop ends
+            record: dict -- the record, as described in setInstrumentation
         Returns:
-            Nothing. This method is nonfruitful
+            Nothing. This method is nonfruitful.
         '''
-        num_cols = self.getNumCols()
-        num_rows = self.getNumRows()
-        if self.isPGM() == True:
-            pixel_list = []
-            num_rows_final = (lower_right_row - upper_left_row)
-            num_cols_final = (lower_right_column - upper_left_column)
-            for r in range(upper_left_row, lower_right_row, 1):
-                for c in range(upper_left_column, lower_right_column, 1):
-                    index = ((num_cols * r) + c)
-                    pixel_list.append(self._pixels[index])
-            self._header[2][0] = num_cols_final
-            self._header[2][1] = num_rows_final
-            self._pixels = pixel_list
-        else:
-            reds = []
-            blues = []
-            greens = []
-            num_rows_final = (lower_right_row - upper_left_row)
-            num_cols_final = (lower_right_column - upper_left_column)
-            for r in range(upper_left_row, lower_right_row, 1):
-                for c in range(upper_left_column, lower_right_column, 1):
-                    index = ((num_cols * r) + c)
-                    reds.append(self._pixels[0][index])
-                    blues.append(self._pixels[1][index])
-                    greens.append(self._pixels[2][index])
-            pixel_list = [reds,greens,blues]
-            self._header[2][0] = num_cols_final
-            self._header[2][1] = num_rows_final
-            self._pixels = pixel_list
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
 
-    def toGrayscale(self) -> None:
+    def close(self) -> None:
         '''
-        Method that loops through a PPM image, altering each red, green, or blue
-        pixel and changing it to a gray pixel, then appends the result to
-        a 1D list to create a PGM by adjusting the magic number.
+        Method that closes the file.
         Args:
             self: argument used for all methods within a given class
         Returns:
-            Nothing. This method is nonfruitful
+            Nothing. This method is nonfruitful.
         '''
-        num_cols = self.getNumCols()
-        num_rows = self.getNumRows()
-        reds = self._pixels[0]
-        greens = self._pixels[1]
-        blues = self._pixels[2]
-        pixel_list = []
-        for r in range(num_rows):
-            for c in range(num_cols):
-                index = ((num_cols * r) + c)
-                gray_scale_pixel_at_index = int((0.2126*reds[index]) + (0.7152*blues[index]) + (0.0722*greens[index]))
-                pixel_list.append(gray_scale_pixel_at_index)
-        self._pixels = pixel_list
-        self._header[0] = "P2"
+        self._file.close()
 
-    def glass (self, radius: int) -> None:
-        '''
-        Method that loops through a PPM image, altering each red, green, or blue
-        pixels such that they become the values of the pixels in their immediate radius,
-        thereby creating a washing out effect.
-        Args:
-            radius: an integer corresponding to the value by which the original pixel
-        Returns:
-            Nothing. This method is nonfruitful
-        '''
-        red_list = []
-        blue_list = []
-        green_list = []
-        num_rows = self.getNumRows()
-        num_cols = self.getNumCols()
-        for r in range(num_rows):
-            for c in range(num_cols):
-                off_set_one = random.randint(-radius, radius)
-                off_set_two = random.randint(-radius, radius)
-                if off_set_one or off_set_two > num_rows:
-                    r_and_off_set = (((r + off_set_one) + num_rows) % num_rows)
-                    red_list.append(self._pixels[0][r_and_off_set])
-                    green_list.append(self._pixels[1][r_and_off_set])
-                    blue_list.append(self._pixels[2][r_and_off_set])
-                if off_set_one or off_set_two > num_cols:
-                    c_and_off_set = (((c + off_set_two) + num_cols) % num_cols)
-                    red_list.append(self._pixels[0][c_and_off_set])
-                    green_list.append(self._pixels[1][c_and_off_set])
-                    blue_list.append(self._pixels[2][c_and_off_set])
-                else:
-                    red_list.append(self._pixels[0][([r] + off_set_one, [c] + off_set_two)])
-                    green_list.append(self._pixels[1][([r] + off_set_one, [c] + off_set_two)])
-                    blue_list.append(self._pixels[2][([r] + off_set_one, [c] + off_set_two)])
-        pixel_list = [red_list, green_list, blue_list]
-        self._pixels = pixel_list
-
-
-def main():
-
-        #Tests to see if brightness is working on 4x4 4x5 and 5x4 grayscale images
-
-        image = Netpbm("images/pgm/sample4x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.changeBrightness(5)
-        image.writeImage("images/pgm/sample_bright1.pgm")
-        print("-"*100) #for the terminal!
-
-        image = Netpbm("images/pgm/sample4x5.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.changeBrightness(5)
-        image.writeImage("images/pgm/sample_bright2.pgm")
-        print("-"*100) #for the terminal!
-
-        image = Netpbm("images/pgm/sample5x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.changeBrightness(5)
-        image.writeImage("images/pgm/sample_bright3.pgm")
-        print("="*100) #for the terminal!
-
-        #Tests to see if invert is working on 4x4 4x5 and 5x4 grayscale images
-
-        image = Netpbm("images/pgm/sample4x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.invert()
-        image.writeImage("images/pgm/sample_invert1.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample4x5.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.invert()
-        image.writeImage("images/pgm/sample_invert2.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample5x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.invert()
-        image.writeImage("images/pgm/sample_invert3.pgm")
-        print("="*100)
-
-        #Tests to see if rotate is working on 4x4 4x5 and 5x4 grayscale images
-
-        image = Netpbm("images/pgm/sample4x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.rotate(True)
-        image.writeImage("images/pgm/sample_rotate1.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample4x5.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.rotate(False)
-        image.writeImage("images/pgm/sample_rotate2.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample5x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.rotate(True)
-        image.writeImage("images/pgm/sample_rotate3.pgm")
-        print("="*100)
-
-        #Tests to see if flip is working on 4x4 4x5 and 5x4 grayscale images
-
-        image = Netpbm("images/pgm/sample4x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.flip(True)
-        image.writeImage("images/pgm/sample_flip1.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample4x5.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.flip(True)
-        image.writeImage("images/pgm/sample_flip2.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample5x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.flip(False)
-        image.writeImage("images/pgm/sample_flip3.pgm")
-        print("="*100)
-
-        #Tests to see if posterize is working on 4x4 4x5 and 5x4 grayscale images
-
-        image = Netpbm("images/pgm/sample4x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.posterize(2)
-        image.writeImage("images/pgm/sample_posterize1.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample4x5.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.posterize(2)
-        image.writeImage("images/pgm/sample_posterize2.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample5x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.posterize(2)
-        image.writeImage("images/pgm/sample_posterize3.pgm")
-        print("="*100)
-
-        #Tests to see if crop is working on 4x4 4x5 and 5x4 grayscale images
-
-        image = Netpbm("images/pgm/sample4x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.crop(0,0,3,3)
-        image.writeImage("images/pgm/sample_crop1.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample4x5.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.crop(0,0,2,2)
-        image.writeImage("images/pgm/sample_crop2.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample5x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.crop(0,0,1,1)
-        image.writeImage("images/pgm/sample_crop3.pgm")
-        print("="*100)
-
-        #Tests to see if toGrayscale is working on 4x4 4x5 and 5x4 grayscale images
-        '''
-        image = Netpbm("images/pgm/sample4x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.toGrayscale()
-        image.writeImage("images/pgm/sample_crop.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample4x5.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.toGrayscale()
-        image.writeImage("images/pgm/sample_crop.pgm")
-        print("-"*100)
-
-        image = Netpbm("images/pgm/sample5x4.pgm")
-        print(f"Magic #: {image.getMagicNumber()}")
-        print(f"Dimensions: {image.getNumRows()} X {image.getNumCols()}")
-        print(f"Header: {image.getHeader()}")
-        print(f"Pixels: {image.getPixels()}")
-        image.toGrayscale()
-        image.writeImage("images/pgm/sample_crop.pgm")
-        print("="*100)
-        '''
-        #Tests to see if toGrayscale is working on 4x4 4x5 and 5x4 grayscale images
+
+#the depth of nested instrumented calls is kept in a context variable, so that threads and
+#asyncio tasks each count their own; _runAsync runs calls on the executor in the context of
+#the coroutine that awaits them, so they count as nested in aopen, awrite or arun
+_instrumentation = {"sink": None, "track_allocations": False, "started_tracing": False,
+                    "depth": contextvars.ContextVar("netpbm_instrumentation_depth", default=0),
+                    "originals": {}}
+
+
+def _instrumentedMethods(owner: type) -> dict:
+    '''
+    Function that finds the methods of a class setInstrumentation wraps: every public
+    method, class method and static method, and those named in INSTRUMENTED_PRIVATE.
+    Args:
+        owner: type -- the class
+    Returns:
+        A dictionary from the name of each method to the positions of its read and write
+        arguments, from INSTRUMENTED_IO, or (None, None) for a method that does no I/O
+    '''
+    positions = INSTRUMENTED_IO.get(owner.__name__, {})
+    methods = {}
+    for name, member in owner.__dict__.items():
+        if name.startswith("_") and name not in INSTRUMENTED_PRIVATE:
+            continue
+        if isinstance(member, (staticmethod, classmethod)) or inspect.isfunction(member):
+            methods[name] = positions.get(name, (None, None))
+    return methods
+
+
+#the methods setInstrumentation wraps, for each class, with the positions of their read and
+#write arguments; built from the classes, so new methods are instrumented without listing them
+INSTRUMENTED_METHODS = {owner.__name__: _instrumentedMethods(owner) for owner in (Netpbm, NetpbmStream)}
+
+
+def _ioSize(argument: 'str | bytes | BinaryIO', before: int = None) -> int:
+    '''
+    Function that measures how much I/O an argument of an instrumented method stands for.
+    Args:
+        argument: str | bytes | BinaryIO -- a filename, the bytes of an image, or a file handle
+        before: int -- for a file handle, its position before the call
+    Returns:
+        The size of the file for a filename, the length of the bytes, how far the handle
+        moved since before for a file handle, or the position of the handle when before is
+        None. Handles that cannot tell their position, such as pipes, count as 0.
+    '''
+    if isinstance(argument, str):
+        if os.path.exists(argument) == False:
+            return 0
+        return os.path.getsize(argument)
+    if isinstance(argument, (bytes, bytearray, memoryview)):
+        return memoryview(argument).nbytes
+    if hasattr(argument, "tell") == False or argument.closed:
+        return 0
+    try:
+        if before is None:
+            return argument.tell()
+        return argument.tell() - before
+    except OSError:
+        return 0
+
+
+def _dimensions(image: object) -> tuple:
+    '''
+    Function that reads the dimensions of an image for an instrumentation record straight
+    from its header, since the getters are instrumented themselves.
+    Args:
+        image: object -- a Netpbm or NetpbmStream object, or anything else
+    Returns:
+        The number of columns and rows, or None and None if there is no header yet
+    '''
+    if isinstance(image, NetpbmStream):
+        return image._image._header[2][0], image._num_rows
+    header = getattr(image, "_header", None) if isinstance(image, Netpbm) else None
+    if header is None:
+        return None, None
+    return header[2][0], header[2][1]
+
+
+def _instrument(owner: type, name: str, method: object) -> object:
+    '''
+    Function that wraps a method so that every call of it sends a record to the sink. The
+    record of a coroutine covers it up to its result, and the record of a generator covers
+    the time spent producing its items, which is sent once it is exhausted or closed.
+    Args:
+        owner: type -- the class the method belongs to
+        name: str -- the name of the method
+        method: object -- the method, class method or static method, as found in the class
+    Returns:
+        The wrapping function, made a class method or static method like the one it wraps
+    '''
+    read_index, write_index = INSTRUMENTED_METHODS[owner.__name__][name]
+    operation = owner.__name__ + "." + name
+    static = isinstance(method, staticmethod)
+    constructor = isinstance(method, classmethod) #the image is the result, not the first argument
+    function = method.__func__ if static or constructor else method
+    state = _instrumentation
+
+    def begin(args: tuple) -> dict:
+        arguments = args if static else args[1:]
+        read_argument = arguments[read_index] if read_index is not None and read_index < len(arguments) else None
+        write_argument = arguments[write_index] if write_index is not None and write_index < len(arguments) else None
+        call = {"depth": state["depth"].get(), "read": read_argument, "write": write_argument,
+                "read_position": None if isinstance(read_argument, str) else _ioSize(read_argument),
+                "write_position": None if isinstance(write_argument, str) else _ioSize(write_argument),
+                "tracking": state["track_allocations"] and tracemalloc.is_tracing(),
+                "wall_seconds": 0.0, "cpu_seconds": 0.0, "error": None}
+        if call["tracking"]:
+            call["allocated_before"] = tracemalloc.get_traced_memory()[0]
+        return call
+
+    def resume(call: dict) -> None:
+        call["token"] = state["depth"].set(call["depth"] + 1)
+        call["cpu_start"] = time.process_time()
+        call["wall_start"] = time.perf_counter()
+
+    def pause(call: dict) -> None:
+        call["wall_seconds"] = call["wall_seconds"] + time.perf_counter() - call["wall_start"]
+        call["cpu_seconds"] = call["cpu_seconds"] + time.process_time() - call["cpu_start"]
+        state["depth"].reset(call["token"])
+
+    def fail(call: dict, exception: Exception) -> None:
+        call["error"] = f"{type(exception).__name__}: {exception}"
+
+    def finish(call: dict, args: tuple, result: object) -> None:
+        allocated_bytes = None
+        if call["tracking"]:
+            allocated_bytes = tracemalloc.get_traced_memory()[0] - call["allocated_before"]
+        num_cols, num_rows = _dimensions(result if constructor else None if static else args[0])
+        record = {"operation": operation, "depth": call["depth"], "num_cols": num_cols, "num_rows": num_rows,
+                  "wall_seconds": call["wall_seconds"], "cpu_seconds": call["cpu_seconds"],
+                  "bytes_read": _ioSize(call["read"], call["read_position"]) if call["read"] is not None else 0,
+                  "bytes_written": _ioSize(call["write"], call["write_position"]) if call["write"] is not None else 0,
+                  "allocated_bytes": allocated_bytes, "error": call["error"]}
+        sink = state["sink"]
+        if sink is not None:
+            sink(record)
+
+    if inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            call = begin(args)
+            result = None
+            resume(call)
+            try:
+                result = await function(*args, **kwargs)
+                return result
+            except Exception as exception:
+                fail(call, exception)
+                raise
+            finally:
+                pause(call)
+                finish(call, args, result)
+    elif inspect.isgeneratorfunction(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            call = begin(args)
+            items = None
+            try:
+                while True:
+                    resume(call)
+                    try:
+                        if items is None:
+                            items = function(*args, **kwargs)
+                        item = next(items)
+                    except StopIteration:
+                        return
+                    finally:
+                        pause(call)
+                    yield item
+            except Exception as exception:
+                fail(call, exception)
+                raise
+            finally:
+                if items is not None:
+                    items.close()
+                finish(call, args, None)
+    else:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            call = begin(args)
+            result = None
+            resume(call)
+            try:
+                result = function(*args, **kwargs)
+                return result
+            except Exception as exception:
+                fail(call, exception)
+                raise
+            finally:
+                pause(call)
+                finish(call, args, result)
+
+    if static:
+        return staticmethod(wrapper)
+    if constructor:
+        return classmethod(wrapper)
+    return wrapper
+
+
+def setInstrumentation(sink: 'Callable' = None, track_allocations: bool = False) -> None:
+    '''
+    Function that turns instrumentation of the Netpbm and NetpbmStream classes on or off.
+    While it is on, every call of a method in INSTRUMENTED_METHODS (every public method of
+    the classes) sends a dictionary to the sink with these keys:
+        operation: the class and method name, such as "Netpbm.rotate"
+        depth: 0 for a call made by the program, 1 or more for calls made inside another
+            instrumented call of the same thread or asyncio task (__init__ calls readHeader,
+            for instance)
+        num_cols, num_rows: the dimensions of the image after the call
+        wall_seconds, cpu_seconds: the elapsed wall clock and CPU time of the call
+        bytes_read, bytes_written: the bytes of image file read and written by the call
+        allocated_bytes: the change in memory allocated by Python over the call, or None
+            unless track_allocations is True
+        error: the exception the call raised, or None
+    Instrumentation works by replacing the methods with wrappers, and turning it off puts
+    the original methods back, so it costs nothing while it is off. Records are made in
+    the process that runs the call; worker processes started while it is on inherit it.
+    Args:
+        sink: Callable -- called with each record (a LoggingSink, a JsonLinesSink or any
+        function), or None to turn instrumentation off
+        track_allocations: bool -- True to measure allocations with tracemalloc, which is
+        started if it is not running (and stopped again when instrumentation is turned
+        off); this slows allocation down noticeably
+    Returns:
+        Nothing. This function is nonfruitful
+    '''
+    originals = _instrumentation["originals"]
+    owners = {"Netpbm": Netpbm, "NetpbmStream": NetpbmStream}
+    if sink is None:
+        for (owner_name, name), original in originals.items():
+            setattr(owners[owner_name], name, original)
+        originals.clear()
+        if _instrumentation["started_tracing"]:
+            tracemalloc.stop()
+        _instrumentation["sink"] = None
+        _instrumentation["track_allocations"] = False
+        _instrumentation["started_tracing"] = False
+        return
+    if track_allocations and tracemalloc.is_tracing() == False:
+        tracemalloc.start()
+        _instrumentation["started_tracing"] = True
+    _instrumentation["sink"] = sink
+    _instrumentation["track_allocations"] = track_allocations
+    if len(originals) > 0:
+        return
+    for owner_name, methods in INSTRUMENTED_METHODS.items():
+        owner = owners[owner_name]
+        for name in methods:
+            original = owner.__dict__[name]
+            originals[(owner_name, name)] = original
+            setattr(owner, name, _instrument(owner, name, original))
+
+
+def getInstrumentation() -> 'Callable':
+    '''
+    Function that returns the sink instrumentation records are sent to.
+    Returns:
+        The sink, or None if instrumentation is off
+    '''
+    return _instrumentation["sink"]
+
+
+#recipe step names understood by the batch runner, with the Netpbm method each one calls
+#and a function turning the text after "=" into the arguments of that method
+RECIPE_STEPS = {
+    "brightness": ("changeBrightness", lambda value: (int(value),)),
+    "invert": ("invert", lambda value: ()),
+    "gamma": ("gamma", lambda value: (float(value),)),
+    "levels": ("levels", lambda value: tuple(float(part) if i == 2 else int(part)
+                                             for i, part in enumerate(value.split(":")))),
+    "rotate": ("rotate", lambda value: (value != "left",)),
+    "rotate180": ("rotate180", lambda value: ()),
+    "flip": ("flip", lambda value: (value != "horizontal",)),
+    "posterize": ("posterize", lambda value: (int(value),)),
+    "crop": ("crop", lambda value: tuple(int(part) for part in value.split(":"))),
+    "grayscale": ("toGrayscale", lambda value: (value,) if value else ()),
+    "glass": ("glass", lambda value: (int(value),)),
+    "boxblur": ("boxBlur", lambda value: (int(value),)),
+    "blur": ("gaussianBlur", lambda value: (float(value),)),
+    "sharpen": ("unsharpMask", lambda value: tuple(float(part) if i < 2 else int(part)
+                                                   for i, part in enumerate(value.split(":")))),
+    "edges": ("sobel", lambda value: ()),
+    "median": ("median", lambda value: (int(value),)),
+    "autolevels": ("autoLevels", lambda value: (float(value or 0),)),
+    "equalize": ("equalize", lambda value: ()),
+    "threshold": ("threshold", lambda value: (int(value),) if value else ()),
+    "resize": ("resize", lambda value: tuple(int(part) for part in value.split(":")[0].split("x"))
+                                        + tuple(value.split(":")[1:])),
+}
+
+#file name patterns picked up when the batch runner is given a directory
+IMAGE_PATTERNS = ("*.pgm", "*.ppm", "*.pnm")
+
+
+def parseRecipe(recipe: str) -> list:
+    '''
+    Function that turns a recipe such as "brightness=5,rotate=right,posterize=4" into the
+    Netpbm method calls it stands for. Steps are separated by commas and run in order; the
+    ones that need a value take it after "=" (several values are separated by ":", as in
+    "crop=0:0:100:100"). rotate takes right or left and flip takes vertical or horizontal.
+    Args:
+        recipe: str -- the recipe text
+    Returns:
+        A list of (method name, arguments tuple) pairs
+    Raises:
+        ValueError: if a step is not in RECIPE_STEPS, its value cannot be parsed, or it has
+        the wrong number of values for its method
+    '''
+    steps = []
+    for step in recipe.split(","):
+        step = step.strip()
+        if step == "":
+            continue
+        name, has_value, value = step.partition("=")
+        if name not in RECIPE_STEPS:
+            raise ValueError(f"Unknown recipe step: {name!r}")
+        method, parse = RECIPE_STEPS[name]
+        if name == "rotate" and value not in ("right", "left"):
+            raise ValueError(f"rotate takes right or left, not {value!r}")
+        if name == "flip" and value not in ("vertical", "horizontal"):
+            raise ValueError(f"flip takes vertical or horizontal, not {value!r}")
+        args = parse(value)
+        try:
+            inspect.signature(getattr(Netpbm, method)).bind(None, *args)
+        except TypeError:
+            raise ValueError(f"Wrong number of values for {name}: {value!r}") from None
+        if value != "" and len(args) == 0:
+            raise ValueError(f"{name} does not take a value, got {value!r}")
+        if name == "resize":
+            if len(args) < 2 or isinstance(args[1], int) == False:
+                raise ValueError(f"resize takes WIDTHxHEIGHT[:method], not {value!r}")
+            _checkResize(*args[:2], *(args[2:] or ("area",)))
+        steps.append((method, args))
+    return steps
+
+
+def findImages(inputs: list) -> list:
+    '''
+    Function that expands the inputs given to the batch runner into image filenames.
+    Args:
+        inputs: list -- directories (every file matching IMAGE_PATTERNS inside them),
+        glob patterns, or filenames
+    Returns:
+        A sorted list of filenames, without duplicates
+    '''
+    filenames = set()
+    for name in inputs:
+        if os.path.isdir(name):
+            for pattern in IMAGE_PATTERNS:
+                filenames.update(glob.glob(os.path.join(name, pattern)))
+        else:
+            filenames.update(glob.glob(name))
+    return sorted(filenames)
+
+
+def planOutputs(filenames: list, output_dir: str) -> list:
+    '''
+    Function that names the output file of each input of a batch. The path of each input
+    relative to the deepest directory holding all of them is mirrored under output_dir, so
+    inputs with the same name in different directories do not overwrite each other. A .ppm
+    input may come out as .pgm (see _processFile), so both names are taken into account.
+    Args:
+        filenames: list -- the images to process
+        output_dir: str -- the directory results are written to
+    Returns:
+        A list of output filenames, in the order of filenames
+    Raises:
+        ValueError: if two inputs would be written to the same file, or an output would
+        overwrite an input
+    '''
+    if len(filenames) == 0:
+        return []
+    sources = [os.path.abspath(filename) for filename in filenames]
+    root = os.path.commonpath([os.path.dirname(source) for source in sources])
+    inputs = {os.path.realpath(source) for source in sources}
+    claimed = {}
+    output_filenames = []
+    for filename, source in zip(filenames, sources):
+        output_filename = os.path.join(output_dir, os.path.relpath(source, root))
+        base, extension = os.path.splitext(output_filename)
+        candidates = [output_filename]
+        if extension == ".ppm":
+            candidates.append(base + ".pgm")
+        for candidate in candidates:
+            key = os.path.normcase(os.path.realpath(candidate))
+            if key in inputs:
+                raise ValueError(f"Writing {filename} to {candidate} would overwrite an input")
+            if key in claimed:
+                raise ValueError(f"{claimed[key]} and {filename} would both be written to {candidate}")
+            claimed[key] = filename
+        output_filenames.append(output_filename)
+    return output_filenames
+
+
+def _processFile(task: tuple) -> tuple:
+    '''
+    Function that a batch worker process runs on one file: it loads the image in lazy
+    mode, so the recipe runs as one fused pass, and writes the result.
+    Args:
+        task: tuple -- the input filename, the output filename (from planOutputs, whose
+        .ppm extension becomes .pgm if the recipe makes a PGM), the parsed recipe and the
+        binary argument of writeImage
+    Returns:
+        A tuple of the input filename, the output filename, the bytes read and the bytes written
+    '''
+    filename, output_filename, steps, binary = task
+    image = Netpbm(filename, lazy=True)
+    for method, args in steps:
+        getattr(image, method)(*args)
+    base, extension = os.path.splitext(output_filename)
+    if extension == ".ppm" and image.isPGM() == True:
+        output_filename = base + ".pgm"
+    os.makedirs(os.path.dirname(output_filename) or ".", exist_ok=True)
+    image.writeImage(output_filename, binary)
+    return (filename, output_filename, os.path.getsize(filename), os.path.getsize(output_filename))
+
+
+def runBatch(filenames: list, steps: list, output_dir: str, workers: int = None,
+             max_in_flight: int = None, binary: bool = None) -> dict:
+    '''
+    Function that applies a recipe to many files over a pool of worker processes. While
+    some workers are parsing their input others are writing their output, so reads and
+    writes overlap. At most max_in_flight files are handed out at once, which bounds the
+    memory in use however many files there are.
+    Args:
+        filenames: list -- the images to process
+        steps: list -- the recipe, as returned by parseRecipe
+        output_dir: str -- the directory results are written to (created if needed), under
+        the names given by planOutputs
+        workers: int -- the number of worker processes, or None for one per CPU
+        max_in_flight: int -- the most files being processed at once, or None for twice
+        the number of workers
+        binary: bool -- passed to writeImage: True for raw output, False for plain output,
+        None to keep the encoding of each input
+    Returns:
+        A dictionary with the number of files processed and failed, the bytes read and
+        written, the elapsed seconds, files per second and MB per second (of input),
+        and a list of (filename, error message) pairs for the failures
+    Raises:
+        ValueError: if the outputs would overwrite each other or an input (see planOutputs)
+    '''
+    output_filenames = planOutputs(filenames, output_dir)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_in_flight is None:
+        max_in_flight = 2 * workers
+    os.makedirs(output_dir, exist_ok=True)
+    summary = {"files": 0, "failed": 0, "bytes_read": 0, "bytes_written": 0, "errors": []}
+    start = time.perf_counter()
+    pending = {}
+    remaining = zip(filenames, output_filenames)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            while len(pending) < max_in_flight:
+                filename, output_filename = next(remaining, (None, None))
+                if filename is None:
+                    break
+                pending[executor.submit(_processFile, (filename, output_filename, steps, binary))] = filename
+            if len(pending) == 0:
+                break
+            done, still_running = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                filename = pending.pop(future)
+                try:
+                    source, output_filename, bytes_read, bytes_written = future.result()
+                except Exception as error:
+                    summary["failed"] = summary["failed"] + 1
+                    summary["errors"].append((filename, str(error)))
+                    continue
+                summary["files"] = summary["files"] + 1
+                summary["bytes_read"] = summary["bytes_read"] + bytes_read
+                summary["bytes_written"] = summary["bytes_written"] + bytes_written
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = elapsed
+    summary["files_per_second"] = summary["files"] / elapsed if elapsed > 0 else 0.0
+    summary["mb_per_second"] = (summary["bytes_read"] / 1e6) / elapsed if elapsed > 0 else 0.0
+    return summary
+
+
+def runFilter(steps: list, source: 'str | bytes | BinaryIO' = "-", destination: 'str | BinaryIO' = "-",
+              binary: bool = None) -> None:
+    '''
+    Function that applies a recipe to a single image read from source and writes the
+    result to destination, so that Netpbm can sit in a shell pipeline like the pnm tools:
+
+        pnmscale 0.5 big.ppm | python Netpbm.py - --recipe invert,rotate=right > small.ppm
+
+    Args:
+        steps: list -- the recipe, as returned by parseRecipe
+        source: str | bytes | BinaryIO -- where to read the image from, standard input by default
+        destination: str | BinaryIO -- where to write the result to, standard output by default
+        binary: bool -- passed to writeImage
+    Returns:
+        Nothing. This function is nonfruitful
+    '''
+    image = Netpbm(source, lazy=True)
+    for method, args in steps:
+        getattr(image, method)(*args)
+    image.writeImage(destination, binary)
+
+
+def main(argv: list = None) -> int:
+    '''
+    Function that runs the batch command line: every image named on the command line
+    (directly, through a glob pattern, or inside a directory) gets the recipe applied and
+    is written to the output directory (see planOutputs), then a throughput summary is
+    printed. Given the single input "-" it works as a filter instead (see runFilter), reading an image from
+    standard input and writing the result to standard output.
+
+        python Netpbm.py "scans/*.ppm" --recipe brightness=5,rotate=right,posterize=4 --output out
+        python Netpbm.py - --recipe equalize < scan.pgm > equalized.pgm
+
+    Args:
+        argv: list -- the command line arguments, or None to use sys.argv
+    Returns:
+        The exit status: 0 if every file was processed, 1 otherwise
+    '''
+    parser = argparse.ArgumentParser(description="Apply a recipe of Netpbm operations to many PGM/PPM files.")
+    parser.add_argument("inputs", nargs="+",
+                        help="image files, glob patterns or directories, or - to filter standard input to standard output")
+    parser.add_argument("--recipe", required=True,
+                        help="comma separated steps, e.g. brightness=5,rotate=right,posterize=4; "
+                             "steps: " + ", ".join(RECIPE_STEPS))
+    parser.add_argument("--output", help="directory to write the results to (not used with -)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="most files processed at once (default: twice the workers)")
+    encoding = parser.add_mutually_exclusive_group()
+    encoding.add_argument("--binary", dest="binary", action="store_true", default=None,
+                          help="write raw P5/P6 files")
+    encoding.add_argument("--plain", dest="binary", action="store_false", help="write plain P2/P3 files")
+    arguments = parser.parse_args(argv)
+
+    try:
+        steps = parseRecipe(arguments.recipe)
+    except ValueError as error:
+        parser.error(str(error))
+    if arguments.inputs == ["-"]:
+        runFilter(steps, binary=arguments.binary)
+        return 0
+    if arguments.output is None:
+        parser.error("the following arguments are required: --output")
+    filenames = findImages(arguments.inputs)
+    if len(filenames) == 0:
+        parser.error("no images found")
+
+    try:
+        summary = runBatch(filenames, steps, arguments.output, arguments.workers,
+                           arguments.max_in_flight, arguments.binary)
+    except ValueError as error:
+        parser.error(str(error))
+    for filename, message in summary["errors"]:
+        print(f"failed: {filename}: {message}", file=sys.stderr)
+    print(f"{summary['files']} files ({summary['failed']} failed) in {summary['seconds']:.2f} s: "
+          f"{summary['files_per_second']:.1f} files/s, {summary['mb_per_second']:.1f} MB/s read, "
+          f"{summary['bytes_written'] / 1e6:.1f} MB written")
+    if summary["failed"] > 0:
+        return 1
+    return 0
 
 if __name__ == "__main__": # won’t call Netpbm’s main when running Fauxtoshop
 
-    main()
+    sys.exit(main())
+
 
 
 
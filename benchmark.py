@@ -0,0 +1,338 @@
+'''
+    This program benchmarks the Netpbm class on synthetic plain (ASCII) PGM and PPM files.
+    For every image size it times parsing (__init__), writeImage and each operation, and
+    measures the peak memory each one allocates. Results are saved as JSON so that runs
+    of different versions can be compared side by side in a scaling table.
+
+    It can also time the chunked readers of the Netpbm class against the line-by-line
+    readers the class used to have, reporting throughput in MB/s of file text parsed, and
+    exits with an error if the current readers are slower than the legacy ones on any image.
+
+    Run it with:
+        python benchmark.py --output results.json
+        python benchmark.py --max-size 1024 --compare old_results.json
+        python benchmark.py --parsers
+'''
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from Netpbm import Netpbm
+
+#image edge lengths benchmarked by default, from 64x64 up to 8K
+SIZES = (64, 256, 1024, 2048, 4096, 8192)
+
+#operations benchmarked on every image: the name reported and the call made on a fresh copy.
+#flip and crop only record a view of the pixels, so the copy they defer to the next read
+#of the pixels is made (by getPixelView) inside the timed call too
+OPERATIONS = {
+    "changeBrightness": lambda image: image.changeBrightness(10),
+    "invert": lambda image: image.invert(),
+    "rotate": lambda image: image.rotate(True),
+    "flip": lambda image: (image.flip(True), image.getPixelView()),
+    "posterize": lambda image: image.posterize(4),
+    "crop": lambda image: (image.crop(image.getNumRows() // 4, image.getNumCols() // 4,
+                                      3 * image.getNumRows() // 4, 3 * image.getNumCols() // 4),
+                           image.getPixelView()),
+    "toGrayscale": lambda image: image.toGrayscale(),
+    "glass": lambda image: image.glass(2),
+}
+
+
+def legacyReadPGMPixels(image_file: 'TextIO') -> list:
+    '''
+    Function that reads PGM pixels the way Netpbm.readPGMPixels used to: one readline
+    and one int call per token, appended to a list.
+    Args:
+        image_file: 'TextIO' -- a text filehandle positioned on the pixel payload
+    Returns:
+        A 1d list of integers holding every pixel
+    '''
+    line = image_file.readline()
+    pixel_list = []
+    while line != '':
+        line_list = line.strip().split()
+        for i in range(len(line_list)):
+            pixel_list.append(int(line_list[i]))
+        line = image_file.readline()
+    return pixel_list
+
+
+def legacyReadPPMPixels(image_file: 'TextIO') -> list:
+    '''
+    Function that reads PPM pixels the way Netpbm.readPPMPixels used to: the whole
+    file as text, then three strided passes over the token list.
+    Args:
+        image_file: 'TextIO' -- a text filehandle positioned on the pixel payload
+    Returns:
+        A list of red, green and blue lists of integers
+    '''
+    all_values_list = (image_file.read().strip().split())
+    red_list = []
+    green_list = []
+    blue_list = []
+    for i in range(0, len(all_values_list),3):
+        red_list.append(int(all_values_list[i]))
+    for i in range(1, len(all_values_list),3):
+        green_list.append(int(all_values_list[i]))
+    for i in range(2, len(all_values_list), 3):
+        blue_list.append(int(all_values_list[i]))
+    return [red_list,green_list,blue_list]
+
+
+def writeSyntheticImage(filename: str, magic_number: str, num_cols: int, num_rows: int,
+                        max_level: int = 255, seed: int = 0) -> None:
+    '''
+    Function that writes a plain PGM (P2) or PPM (P3) file filled with random levels,
+    one image row per line.
+    Args:
+        filename: str -- where to write the image
+        magic_number: str -- "P2" or "P3"
+        num_cols: int -- the width of the image
+        num_rows: int -- the height of the image
+        max_level: int -- the maximum pixel level
+        seed: int -- the seed for the random levels, so runs are reproducible
+    Returns:
+        Nothing. This function is nonfruitful
+    '''
+    rng = random.Random(seed)
+    samples_per_row = num_cols
+    if magic_number == "P3":
+        samples_per_row = num_cols * 3
+    levels = [str(level) for level in range(max_level + 1)]
+    with open(filename, "w") as image_file:
+        image_file.write(f"{magic_number}\n# synthetic benchmark image\n{num_cols} {num_rows}\n{max_level}\n")
+        for r in range(num_rows):
+            row = rng.choices(levels, k=samples_per_row)
+            image_file.write(" ".join(row) + "\n")
+
+
+def timeReader(filename: str, reader: 'Callable') -> float:
+    '''
+    Function that times one call of a reader on the payload of a file.
+    Args:
+        filename: str -- the image to read
+        reader: Callable -- called with the filename, it must read the whole image
+    Returns:
+        The best wall time of three runs, in seconds
+    '''
+    best = None
+    for attempt in range(3):
+        start = time.perf_counter()
+        reader(filename)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def legacyLoad(filename: str) -> list:
+    '''
+    Function that loads an image with the legacy readers, skipping the four header lines
+    written by writeSyntheticImage.
+    Args:
+        filename: str -- the image to read
+    Returns:
+        The pixels as returned by the legacy reader
+    '''
+    with open(filename, "r") as image_file:
+        magic_number = image_file.readline().strip()
+        for i in range(3):
+            image_file.readline()
+        if magic_number == "P2":
+            return legacyReadPGMPixels(image_file)
+        return legacyReadPPMPixels(image_file)
+
+
+def benchmarkParsers(sizes: list) -> list:
+    '''
+    Function that compares the legacy readers against the current Netpbm readers on
+    synthetic P2 and P3 images of the given sizes.
+    Args:
+        sizes: list -- (num_cols, num_rows) pairs to benchmark
+    Returns:
+        A list of dictionaries, one per image, with the file size and the MB/s of each reader
+    '''
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for magic_number in ("P2", "P3"):
+            for num_cols, num_rows in sizes:
+                filename = os.path.join(directory, f"{magic_number}_{num_cols}x{num_rows}.pnm")
+                writeSyntheticImage(filename, magic_number, num_cols, num_rows)
+                megabytes = os.path.getsize(filename) / 1e6
+                legacy_time = timeReader(filename, legacyLoad)
+                current_time = timeReader(filename, Netpbm)
+                results.append({"magic_number": magic_number, "size": f"{num_cols}x{num_rows}",
+                                "megabytes": megabytes, "legacy_mb_per_s": megabytes / legacy_time,
+                                "current_mb_per_s": megabytes / current_time})
+    return results
+
+
+def measure(call: 'Callable', setup: 'Callable' = None, repeat: int = 3, memory: bool = True) -> dict:
+    '''
+    Function that measures the wall time and the peak memory of a call. The time is the best
+    of several runs; the peak memory comes from one extra run under tracemalloc, which is kept
+    out of the timed runs because tracing slows allocation down.
+    Args:
+        call: Callable -- called with the result of setup (or with no argument if there is none)
+        setup: Callable -- called before each run, untimed, to build the input of call
+        repeat: int -- the number of timed runs
+        memory: bool -- whether to measure the peak memory as well
+    Returns:
+        A dictionary with the best wall time in seconds ("seconds") and the peak number of
+        bytes allocated during the call ("peak_bytes", None when memory is False)
+    '''
+    def run() -> float:
+        if setup is None:
+            start = time.perf_counter()
+            call()
+            return time.perf_counter() - start
+        argument = setup()
+        start = time.perf_counter()
+        call(argument)
+        return time.perf_counter() - start
+
+    best = min(run() for attempt in range(repeat))
+    peak_bytes = None
+    if memory:
+        argument = setup() if setup is not None else None
+        tracemalloc.start()
+        if setup is None:
+            call()
+        else:
+            call(argument)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak_bytes}
+
+
+def benchmarkOperations(sizes: list, repeat: int = 3, memory: bool = True) -> list:
+    '''
+    Function that benchmarks parsing, writing and every operation in OPERATIONS on synthetic
+    square P2 and P3 images. Each operation runs on a fresh copy of the parsed image.
+    Args:
+        sizes: list -- the edge lengths of the images
+        repeat: int -- the number of timed runs of each measurement
+        memory: bool -- whether to measure peak memory
+    Returns:
+        A list of dictionaries, one per measurement, with the format, the size, the file size
+        in MB, the name of what was measured, the wall time and the peak memory
+    '''
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for magic_number in ("P2", "P3"):
+            for size in sizes:
+                filename = os.path.join(directory, f"{magic_number}_{size}.pnm")
+                output_filename = os.path.join(directory, "output.pnm")
+                writeSyntheticImage(filename, magic_number, size, size)
+                megabytes = os.path.getsize(filename) / 1e6
+                print(f"{magic_number} {size}x{size} ({megabytes:.1f} MB)", file=sys.stderr)
+
+                measurements = {"__init__": measure(lambda: Netpbm(filename), None, repeat, memory)}
+                image = Netpbm(filename)
+                measurements["writeImage"] = measure(lambda: image.writeImage(output_filename),
+                                                     None, repeat, memory)
+                for name, operation in OPERATIONS.items():
+                    if name == "toGrayscale" and magic_number != "P3":
+                        continue
+                    measurements[name] = measure(operation, image.copy, repeat, memory)
+
+                for name, measurement in measurements.items():
+                    results.append({"magic_number": magic_number, "size": size, "megabytes": megabytes,
+                                    "operation": name, **measurement})
+    return results
+
+
+def scalingTable(results: list, baseline: list = None) -> str:
+    '''
+    Function that lays benchmark results out as a table with one row per format and
+    operation and one column per image size. Each cell holds the wall time in milliseconds
+    and the peak memory in MB; when a baseline run is given the ratio of the times
+    (current / baseline, so below 1 is faster) is added.
+    Args:
+        results: list -- the results of benchmarkOperations
+        baseline: list -- the results of an earlier run to compare against, or None
+    Returns:
+        The table as a string
+    '''
+    def key(result: dict) -> tuple:
+        return (result["magic_number"], result["operation"], result["size"])
+
+    previous = {key(result): result for result in baseline or []}
+    cells = {key(result): result for result in results}
+    sizes = sorted({result["size"] for result in results})
+    rows = []
+    for result in results:
+        if (result["magic_number"], result["operation"]) not in rows:
+            rows.append((result["magic_number"], result["operation"]))
+
+    lines = [f"{'format':<8}{'operation':<18}" + "".join(f"{f'{size}x{size}':>28}" for size in sizes)]
+    for magic_number, operation in rows:
+        line = f"{magic_number:<8}{operation:<18}"
+        for size in sizes:
+            result = cells.get((magic_number, operation, size))
+            if result is None:
+                line = line + f"{'-':>28}"
+                continue
+            cell = f"{result['seconds'] * 1000:.1f} ms"
+            if result["peak_bytes"] is not None:
+                cell = cell + f" {result['peak_bytes'] / 1e6:.1f} MB"
+            old = previous.get((magic_number, operation, size))
+            if old is not None and old["seconds"] > 0:
+                cell = cell + f" x{result['seconds'] / old['seconds']:.2f}"
+            line = line + f"{cell:>28}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Netpbm parsing, writing and operations.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES),
+                        help="image edge lengths to benchmark (default: 64 up to 8192)")
+    parser.add_argument("--max-size", type=int, default=None, help="skip sizes larger than this")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement (best is kept)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip peak memory measurement")
+    parser.add_argument("--output", default=None, help="save the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="JSON results of an earlier run to compare against")
+    parser.add_argument("--parsers", action="store_true",
+                        help="compare the current readers against the legacy readers instead")
+    arguments = parser.parse_args(argv)
+
+    sizes = [size for size in arguments.sizes if arguments.max_size is None or size <= arguments.max_size]
+
+    if arguments.parsers:
+        results = benchmarkParsers([(size, size) for size in sizes])
+        print(f"{'format':<8}{'size':>12}{'MB':>10}{'legacy MB/s':>14}{'current MB/s':>14}{'speedup':>10}")
+        for result in results:
+            speedup = result["current_mb_per_s"] / result["legacy_mb_per_s"]
+            print(f"{result['magic_number']:<8}{result['size']:>12}{result['megabytes']:>10.1f}"
+                  f"{result['legacy_mb_per_s']:>14.1f}{result['current_mb_per_s']:>14.1f}{speedup:>9.1f}x")
+        slower = [f"{result['magic_number']} {result['size']}" for result in results
+                  if result["current_mb_per_s"] < result["legacy_mb_per_s"]]
+        if len(slower) > 0:
+            sys.exit("The current readers are slower than the legacy ones on: " + ", ".join(slower))
+        return
+
+    results = benchmarkOperations(sizes, arguments.repeat, arguments.memory)
+    baseline = None
+    if arguments.compare is not None:
+        with open(arguments.compare, "r") as results_file:
+            baseline = json.load(results_file)["results"]
+    print(scalingTable(results, baseline))
+    if arguments.output is not None:
+        with open(arguments.output, "w") as results_file:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results},
+                      results_file, indent=2)
+
+
+if __name__ == "__main__":
+
+    main()
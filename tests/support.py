@@ -0,0 +1,82 @@
+'''
+Helpers shared by the tests. Run the tests from the top of the repository with
+    python -m pytest -q
+or
+    python -m unittest discover tests
+'''
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def makeImage(magic_number: str, num_cols: int, num_rows: int, max_level: int = 255, seed: int = 0) -> bytes:
+    '''
+    Function that makes the bytes of a Netpbm file filled with random levels.
+    Args:
+        magic_number: str -- "P2", "P3", "P5" or "P6"
+        num_cols: int -- the width of the image
+        num_rows: int -- the height of the image
+        max_level: int -- the maximum pixel level
+        seed: int -- the seed for the random levels
+    Returns:
+        The encoded file as bytes
+    '''
+    rng = random.Random(seed)
+    channels = 3 if magic_number in ("P3", "P6") else 1
+    samples = [rng.randint(0, max_level) for i in range(num_cols * num_rows * channels)]
+    return encodeImage(magic_number, num_cols, num_rows, max_level, samples)
+
+
+def encodeImage(magic_number: str, num_cols: int, num_rows: int, max_level: int, samples: list) -> bytes:
+    '''
+    Function that encodes samples, in file order, as a Netpbm file.
+    Args:
+        magic_number: str -- "P2", "P3", "P5" or "P6"
+        num_cols: int -- the width of the image
+        num_rows: int -- the height of the image
+        max_level: int -- the maximum pixel level
+        samples: list -- the levels, with the samples of a PPM pixel next to each other
+    Returns:
+        The encoded file as bytes
+    '''
+    header = f"{magic_number}\n# test image\n{num_cols} {num_rows}\n{max_level}\n".encode()
+    if magic_number in ("P2", "P3"):
+        return header + " ".join(map(str, samples)).encode() + b"\n"
+    if max_level < 256:
+        return header + bytes(samples)
+    return header + b"".join(sample.to_bytes(2, "big") for sample in samples)
+
+
+class TempDirTestCase(unittest.TestCase):
+    '''
+    Test case with a temporary directory that is removed afterwards.
+    '''
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def writeFile(self, name: str, data: bytes) -> str:
+        filename = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, "wb") as image_file:
+            image_file.write(data)
+        return filename
+
+    def rewriteFile(self, filename: str, data: bytes) -> None:
+        '''
+        Method that replaces the contents of a file and moves its modification time on, so
+        the change is seen even on file systems with coarse timestamps.
+        '''
+        status = os.stat(filename)
+        with open(filename, "wb") as image_file:
+            image_file.write(data)
+        os.utime(filename, ns=(status.st_atime_ns, status.st_mtime_ns + 2_000_000_000))
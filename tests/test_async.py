@@ -0,0 +1,88 @@
+import asyncio
+import io
+import os
+import threading
+import time
+import unittest
+
+from support import TempDirTestCase, makeImage
+
+import Netpbm
+
+
+class Tracked(Netpbm.Netpbm):
+
+    running = 0
+    most_running = 0
+    lock = threading.Lock()
+
+    def hold(self, seconds: float) -> None:
+        with Tracked.lock:
+            Tracked.running = Tracked.running + 1
+            Tracked.most_running = max(Tracked.most_running, Tracked.running)
+        time.sleep(seconds)
+        with Tracked.lock:
+            Tracked.running = Tracked.running - 1
+
+
+class AsyncTests(TempDirTestCase):
+
+    def tearDown(self):
+        Netpbm.setAsyncLimits()
+        super().tearDown()
+
+    def testOpenRunAndWrite(self):
+        filename = self.writeFile("in.pgm", b"P2 3 1 255\n1 2 3\n")
+        output = os.path.join(self.directory, "out.pgm")
+
+        async def work():
+            image = await Netpbm.Netpbm.aopen(filename)
+            await image.arun("invert")
+            await image.arun("changeBrightness", -10)
+            await image.awrite(output)
+            return image
+
+        image = asyncio.run(work())
+        self.assertEqual(image.getPixels(), [244, 243, 242])
+        with open(output, "rb") as output_file:
+            self.assertEqual(output_file.read(), b"P2\n3 1\n255\n244 243 242\n")
+
+    def testSourcesAndDestinations(self):
+        data = makeImage("P6", 4, 3)
+        output = io.BytesIO()
+
+        async def work():
+            image = await Netpbm.Netpbm.aopen(data, lazy=True)
+            await image.arun("flip", True)
+            await image.awrite(output, True)
+
+        asyncio.run(work())
+        expected = Netpbm.Netpbm(data)
+        expected.flip(True)
+        self.assertEqual(output.getvalue(), expected.toBytes(True))
+
+    def testErrorsReachTheCaller(self):
+        async def work():
+            image = await Netpbm.Netpbm.aopen(b"P2 2 1 255\n1 2\n")
+            await image.arun("crop", 5, 5, 6, 6)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(work())
+        with self.assertRaises(FileNotFoundError):
+            asyncio.run(Netpbm.Netpbm.aopen(os.path.join(self.directory, "missing.pgm")))
+
+    def testConcurrencyLimit(self):
+        Netpbm.setAsyncLimits(max_concurrency=2, max_workers=8)
+        Tracked.most_running = 0
+
+        async def work():
+            images = await asyncio.gather(*[Tracked.aopen(b"P2 1 1 255\n0\n") for i in range(6)])
+            self.assertTrue(all(type(image) is Tracked for image in images))
+            await asyncio.gather(*[image.arun("hold", 0.05) for image in images])
+
+        asyncio.run(work())
+        self.assertEqual(Tracked.most_running, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import contextlib
+import io
+import os
+import unittest
+
+from support import TempDirTestCase, makeImage
+
+import Netpbm
+
+
+class RecipeTests(unittest.TestCase):
+
+    def testParse(self):
+        self.assertEqual(Netpbm.parseRecipe("brightness=5, rotate=left,flip=horizontal,levels=0:200:1.5,"
+                                            "crop=1:2:3:4,resize=3x4:bilinear,grayscale=rec601,invert"),
+                         [("changeBrightness", (5,)), ("rotate", (False,)), ("flip", (False,)),
+                          ("levels", (0, 200, 1.5)), ("crop", (1, 2, 3, 4)),
+                          ("resize", (3, 4, "bilinear")), ("toGrayscale", ("rec601",)), ("invert", ())])
+
+    def testBadRecipes(self):
+        for recipe in ("resize=3", "levels=1", "crop=0:0", "invert=2", "resize=0x4", "resize=3:4",
+                       "resize=3x4:cubic", "rotate=up", "flip", "brightness=x", "nosuchstep"):
+            with self.assertRaises(ValueError, msg=recipe):
+                Netpbm.parseRecipe(recipe)
+
+
+class BatchTests(TempDirTestCase):
+
+    def testKnownOutput(self):
+        filename = self.writeFile("in/a.pgm", b"P2 2 1 255\n10 20\n")
+        output_dir = os.path.join(self.directory, "out")
+        summary = Netpbm.runBatch([filename], Netpbm.parseRecipe("invert,flip=horizontal"), output_dir, workers=1)
+        self.assertEqual((summary["files"], summary["failed"]), (1, 0))
+        with open(os.path.join(output_dir, "a.pgm"), "rb") as output_file:
+            self.assertEqual(output_file.read(), b"P2\n2 1\n255\n235 245\n")
+
+    def testGrayscaleOutputIsRenamed(self):
+        filename = self.writeFile("in/a.ppm", makeImage("P6", 2, 2))
+        output_dir = os.path.join(self.directory, "out")
+        Netpbm.runBatch([filename], Netpbm.parseRecipe("grayscale"), output_dir, workers=1)
+        self.assertEqual(os.listdir(output_dir), ["a.pgm"])
+
+    def testSameNamesInDifferentDirectories(self):
+        first = self.writeFile(os.path.join("in1", "x.ppm"), makeImage("P6", 4, 4, seed=1))
+        second = self.writeFile(os.path.join("in2", "x.ppm"), makeImage("P6", 4, 4, seed=2))
+        output_dir = os.path.join(self.directory, "out")
+        summary = Netpbm.runBatch([first, second], Netpbm.parseRecipe("invert"), output_dir, workers=1)
+        self.assertEqual((summary["files"], summary["failed"]), (2, 0))
+        for name, filename in (("in1", first), ("in2", second)):
+            expected = Netpbm.Netpbm(filename)
+            expected.invert()
+            self.assertEqual(Netpbm.Netpbm(os.path.join(output_dir, name, "x.ppm")).getPixels(),
+                             expected.getPixels())
+
+    def testCollidingOutputs(self):
+        first = self.writeFile("x.ppm", makeImage("P6", 2, 2))
+        second = self.writeFile("x.pgm", makeImage("P5", 2, 2))
+        with self.assertRaises(ValueError):
+            Netpbm.planOutputs([first, second], os.path.join(self.directory, "out"))
+
+    def testOutputOverInput(self):
+        filename = self.writeFile("x.ppm", makeImage("P6", 2, 2))
+        with self.assertRaises(ValueError):
+            Netpbm.runBatch([filename], Netpbm.parseRecipe("invert"), self.directory, workers=1)
+
+    def testFailuresAreCounted(self):
+        good = self.writeFile("in/good.pgm", makeImage("P2", 4, 4))
+        bad = self.writeFile("in/bad.pgm", b"P2 4 4 255\n1 2 3\n")
+        summary = Netpbm.runBatch([good, bad], Netpbm.parseRecipe("invert"),
+                                  os.path.join(self.directory, "out"), workers=2)
+        self.assertEqual((summary["files"], summary["failed"]), (1, 1))
+        self.assertEqual([filename for filename, message in summary["errors"]], [bad])
+
+    def testFindImages(self):
+        first = self.writeFile("in/a.pgm", b"")
+        second = self.writeFile("in/b.ppm", b"")
+        self.writeFile("in/notes.txt", b"")
+        self.assertEqual(Netpbm.findImages([os.path.join(self.directory, "in"), first]), [first, second])
+
+    def testCommandLine(self):
+        filename = self.writeFile("in/a.pgm", makeImage("P2", 3, 3))
+        output_dir = os.path.join(self.directory, "out")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(Netpbm.main([filename, "--recipe", "invert", "--output", output_dir,
+                                          "--workers", "1"]), 0)
+        self.assertTrue(os.path.exists(os.path.join(output_dir, "a.pgm")))
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            Netpbm.main([filename, "--recipe", "resize=3", "--output", output_dir])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+from support import TempDirTestCase
+
+import benchmark
+import Netpbm
+
+
+class BenchmarkTests(TempDirTestCase):
+
+    def testSmokeRun(self):
+        output = os.path.join(self.directory, "results.json")
+        with contextlib.redirect_stdout(io.StringIO()) as table, contextlib.redirect_stderr(io.StringIO()):
+            benchmark.main(["--sizes", "8", "--repeat", "1", "--no-memory", "--output", output])
+        with open(output, "r") as results_file:
+            results = json.load(results_file)["results"]
+        operations = {(result["magic_number"], result["operation"]) for result in results}
+        expected = {(magic_number, name) for magic_number in ("P2", "P3")
+                    for name in ["__init__", "writeImage", *benchmark.OPERATIONS]}
+        self.assertEqual(operations, expected - {("P2", "toGrayscale")})
+        self.assertTrue(all(result["peak_bytes"] is None and result["seconds"] >= 0 for result in results))
+        self.assertEqual(len(table.getvalue().splitlines()), len(expected))
+
+    def testLegacyReadersAgree(self):
+        for magic_number in ("P2", "P3"):
+            filename = os.path.join(self.directory, f"{magic_number}.pnm")
+            benchmark.writeSyntheticImage(filename, magic_number, 9, 5)
+            self.assertEqual(benchmark.legacyLoad(filename), Netpbm.Netpbm(filename).getPixels())
+
+    def testParserResults(self):
+        results = benchmark.benchmarkParsers([(8, 8)])
+        self.assertEqual([(result["magic_number"], result["size"]) for result in results],
+                         [("P2", "8x8"), ("P3", "8x8")])
+
+    def testScalingTable(self):
+        results = [{"magic_number": "P2", "size": 8, "operation": "invert", "seconds": 0.002,
+                    "peak_bytes": 3_000_000}]
+        baseline = [dict(results[0], seconds=0.004)]
+        lines = benchmark.scalingTable(results, baseline).splitlines()
+        self.assertEqual(lines[1].split(), ["P2", "invert", "2.0", "ms", "3.0", "MB", "x0.50"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import unittest
+
+from support import TempDirTestCase, makeImage
+
+import Netpbm
+
+
+class ImageCacheTests(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache = Netpbm.ImageCache()
+
+    def counters(self) -> tuple:
+        statistics = self.cache.getStatistics()
+        return (statistics["hits"], statistics["misses"], statistics["evictions"], statistics["entries"])
+
+    def testHitsAndMisses(self):
+        filename = self.writeFile("a.pgm", makeImage("P2", 4, 3))
+        first = self.cache.open(filename)
+        second = self.cache.open(os.path.join(self.directory, ".", "a.pgm"))
+        self.assertEqual(self.counters(), (1, 1, 0, 1))
+        self.assertEqual(second.getPixels(), first.getPixels())
+        self.assertEqual(self.cache.getStatistics()["bytes"], 12)
+
+    def testChangedFilesAreParsedAgain(self):
+        filename = self.writeFile("a.pgm", b"P2 2 1 255\n1 2\n")
+        self.cache.open(filename)
+        self.rewriteFile(filename, b"P2 2 1 255\n3 4\n")
+        self.assertEqual(self.cache.open(filename).getPixels(), [3, 4])
+        self.assertEqual(self.counters(), (0, 2, 0, 1))
+
+    def testCopiesDoNotChangeTheCache(self):
+        filename = self.writeFile("a.ppm", b"P3 2 1 255\n1 2 3 4 5 6\n")
+        image = self.cache.open(filename)
+        image.invert()
+        image.crop(0, 0, 1, 1)
+        self.assertEqual(self.cache.open(filename).getPixels(), [[1, 4], [2, 5], [3, 6]])
+
+    def testRawCopiesDoNotChangeWithTheFile(self):
+        data = b"P6 2 1 255\n\x01\x02\x03\x04\x05\x06"
+        filename = self.writeFile("a.ppm", data)
+        first = self.cache.open(filename)
+        second = self.cache.open(filename)
+        #changed in place, so a memory map of the file would see the new bytes
+        with open(filename, "r+b") as image_file:
+            image_file.seek(len(data) - 6)
+            image_file.write(b"\xff" * 6)
+        self.assertEqual(bytes(first.getRaster()), b"\x01\x02\x03\x04\x05\x06")
+        self.assertEqual(first.getPixels(), [[1, 4], [2, 5], [3, 6]])
+        #reading a memory map past the end of a truncated file would crash the process
+        os.truncate(filename, 0)
+        self.assertEqual(bytes(second.getRaster()), b"\x01\x02\x03\x04\x05\x06")
+
+    def testLeastRecentlyUsedIsEvicted(self):
+        first = self.writeFile("a.pgm", makeImage("P5", 10, 10))
+        second = self.writeFile("b.pgm", makeImage("P5", 10, 10))
+        third = self.writeFile("c.pgm", makeImage("P5", 10, 10))
+        self.cache.setMaxBytes(250)
+        self.cache.open(first)
+        self.cache.open(second)
+        self.cache.open(first)
+        self.cache.open(third)
+        self.assertEqual(self.counters(), (1, 3, 1, 2))
+        self.cache.open(first)
+        self.assertEqual(self.counters()[:2], (2, 3))
+        self.cache.setMaxBytes(50)
+        self.assertEqual(self.counters()[2:], (3, 0))
+
+    def testLazyCopies(self):
+        filename = self.writeFile("a.pgm", b"P2 2 1 255\n1 2\n")
+        image = self.cache.open(filename, lazy=True)
+        image.invert()
+        self.assertEqual(image.getPixels(), [254, 253])
+        self.cache.clear()
+        self.assertEqual(self.counters()[3], 0)
+
+    def testOpenImage(self):
+        filename = self.writeFile("a.pgm", b"P2 2 1 255\n1 2\n")
+        self.assertIs(Netpbm.getImageCache(), Netpbm.getImageCache())
+        hits = Netpbm.getImageCache().getStatistics()["hits"]
+        Netpbm.openImage(filename)
+        Netpbm.openImage(filename)
+        self.assertEqual(Netpbm.getImageCache().getStatistics()["hits"], hits + 1)
+        Netpbm.getImageCache().clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import unittest
+
+from support import TempDirTestCase, makeImage
+
+import Netpbm
+
+
+class DiskCacheTests(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = os.path.join(self.directory, "cache")
+        Netpbm.setDiskCache(self.cache_dir)
+
+    def tearDown(self):
+        Netpbm.setDiskCache(None)
+        super().tearDown()
+
+    def sidecars(self) -> list:
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)]
+
+    def tamperWithSidecar(self) -> None:
+        #changing the cached pixels shows whether a later load used the sidecar
+        sidecar, = self.sidecars()
+        with open(sidecar, "r+b") as sidecar_file:
+            sidecar_file.seek(-1, os.SEEK_END)
+            sidecar_file.write(b"\x63")
+
+    def replaceKeepingTheTime(self, filename: str, data: bytes) -> None:
+        status = os.stat(filename)
+        with open(filename, "wb") as image_file:
+            image_file.write(data)
+        os.utime(filename, ns=(status.st_atime_ns, status.st_mtime_ns))
+
+    def testWarmLoadUsesTheSidecar(self):
+        filename = self.writeFile("a.pgm", b"P2\n# note\n2 1\n255\n1 2\n")
+        self.assertEqual(Netpbm.Netpbm(filename).getPixels(), [1, 2])
+        self.tamperWithSidecar()
+        image = Netpbm.Netpbm(filename)
+        self.assertEqual(image.getPixels(), [1, 99])
+        self.assertEqual(image.getHeader(), ["P2", "# note", [2, 1], 255])
+
+    def testColourAndSixteenBit(self):
+        for name, data in (("a.ppm", makeImage("P3", 5, 4)), ("b.pgm", makeImage("P2", 5, 4, 65535))):
+            filename = self.writeFile(name, data)
+            cold = Netpbm.Netpbm(filename)
+            warm = Netpbm.Netpbm(filename)
+            self.assertEqual(warm.getHeader(), cold.getHeader())
+            self.assertEqual(warm.getPixels(), Netpbm.Netpbm(data).getPixels())
+
+    def testChangedModificationTime(self):
+        filename = self.writeFile("a.pgm", b"P2 2 1 255\n1 2\n")
+        Netpbm.Netpbm(filename)
+        self.rewriteFile(filename, b"P2 2 1 255\n3 4\n")
+        self.assertEqual(Netpbm.Netpbm(filename).getPixels(), [3, 4])
+
+    def testSameModificationTime(self):
+        filename = self.writeFile("a.pgm", b"P2 2 1 255\n1 2\n")
+        Netpbm.Netpbm(filename)
+        self.replaceKeepingTheTime(filename, b"P2 2 1 255\n3 4\n")
+        #the mtime check misses a change that keeps the time and size; the hash check does not
+        self.assertEqual(Netpbm.Netpbm(filename).getPixels(), [1, 2])
+        Netpbm.setDiskCache(self.cache_dir, validate="hash")
+        self.assertEqual(Netpbm.Netpbm(filename).getPixels(), [3, 4])
+        self.replaceKeepingTheTime(filename, b"P2 2 1 255\n5 6\n")
+        self.assertEqual(Netpbm.Netpbm(filename).getPixels(), [5, 6])
+
+    def testSizeLimit(self):
+        for name in ("a.pgm", "b.pgm", "c.pgm"):
+            Netpbm.Netpbm(self.writeFile(name, makeImage("P2", 10, 10)))
+        self.assertEqual(len(self.sidecars()), 3)
+        Netpbm.setDiskCache(self.cache_dir, max_bytes=os.path.getsize(self.sidecars()[0]) * 2)
+        self.assertEqual(len(self.sidecars()), 2)
+
+    def testOnlyPlainFilesAreCached(self):
+        Netpbm.Netpbm(self.writeFile("a.pgm", makeImage("P5", 4, 4)))
+        self.assertEqual(self.sidecars(), [])
+        with self.assertRaises(ValueError):
+            Netpbm.setDiskCache(self.cache_dir, validate="size")
+
+
+if __name__ == "__main__":
+    unittest.main()
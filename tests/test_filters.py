@@ -0,0 +1,63 @@
+import unittest
+
+from support import encodeImage, makeImage
+
+import Netpbm
+
+DOT = b"P2 3 3 255\n0 0 0\n0 90 0\n0 0 0\n"
+RAMP = b"P2 4 1 255\n0 0 100 100\n"
+
+
+def filtered(data: bytes, operation: str, *args) -> list:
+    image = Netpbm.Netpbm(data)
+    getattr(image, operation)(*args)
+    return image.getPixels()
+
+
+class FilterTests(unittest.TestCase):
+
+    def testBoxBlur(self):
+        #with the edges repeated every 3x3 square holds the centre pixel exactly once
+        self.assertEqual(filtered(DOT, "boxBlur", 1), [10] * 9)
+        #(0 + 0 + 90) * 3 / 9 and (0 + 90 + 90) * 3 / 9
+        self.assertEqual(filtered(b"P2 2 1 255\n0 90\n", "boxBlur", 1), [30, 60])
+        self.assertEqual(filtered(DOT, "boxBlur", 0), [0, 0, 0, 0, 90, 0, 0, 0, 0])
+
+    def testMedian(self):
+        self.assertEqual(filtered(b"P2 5 1 255\n10 200 30 40 50\n", "median", 1), [10, 30, 40, 40, 50])
+        self.assertEqual(filtered(DOT, "median", 1), [0] * 9)
+        self.assertEqual(filtered(b"P2 3 1 65535\n1000 60000 2000\n", "median", 1), [1000, 2000, 2000])
+
+    def testSobel(self):
+        #a step from 0 to the maximum level gives the maximum level on both sides of it
+        step = encodeImage("P2", 4, 3, 255, [0, 0, 255, 255] * 3)
+        self.assertEqual(filtered(step, "sobel"), [0, 255, 255, 0] * 3)
+        step = encodeImage("P2", 4, 3, 255, [0, 0, 10, 10] * 3)
+        self.assertEqual(filtered(step, "sobel"), [0, 10, 10, 0] * 3)
+        self.assertEqual(filtered(encodeImage("P2", 2, 4, 255, [0, 0, 0, 0, 10, 10, 10, 10]), "sobel"),
+                         [0, 0, 10, 10, 10, 10, 0, 0])
+
+    def testGaussianBlurAndUnsharpMask(self):
+        self.assertEqual(filtered(RAMP, "gaussianBlur", 1.0), [0, 33, 67, 100])
+        #the differences from the blur, -33 and 33, are added once and clamped
+        self.assertEqual(filtered(RAMP, "unsharpMask", 1.0, 1.0), [0, 0, 133, 100])
+        self.assertEqual(filtered(RAMP, "unsharpMask", 1.0, 1.0, 40), [0, 0, 100, 100])
+
+    def testFlatImagesAreUnchanged(self):
+        flat = encodeImage("P3", 5, 4, 255, [50, 100, 150] * 20)
+        for operation, args in (("boxBlur", (2,)), ("gaussianBlur", (1.5,)), ("unsharpMask", (1.0, 2.0)),
+                                ("median", (2,))):
+            self.assertEqual(filtered(flat, operation, *args), [[50] * 20, [100] * 20, [150] * 20], operation)
+        self.assertEqual(filtered(flat, "sobel"), [[0] * 20] * 3)
+
+    def testKeepsTheHeader(self):
+        data = makeImage("P6", 7, 5, 65535)
+        for operation, args in (("boxBlur", (1,)), ("gaussianBlur", (2.0,)), ("sobel", ()), ("median", (1,))):
+            image = Netpbm.Netpbm(data)
+            getattr(image, operation)(*args)
+            self.assertEqual(image.getHeader(), Netpbm.Netpbm(data).getHeader(), operation)
+            self.assertTrue(all(0 <= level <= 65535 for plane in image.getPixels() for level in plane))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from support import makeImage
+
+import Netpbm
+
+SMALL = b"P2 3 2 255\n1 2 3\n4 5 6\n"
+
+
+class GeometryTests(unittest.TestCase):
+
+    def transformed(self, *calls) -> Netpbm.Netpbm:
+        image = Netpbm.Netpbm(SMALL)
+        for name, *args in calls:
+            getattr(image, name)(*args)
+        return image
+
+    def testRotate(self):
+        image = self.transformed(("rotate", True))
+        self.assertEqual((image.getNumCols(), image.getNumRows()), (2, 3))
+        self.assertEqual(image.getPixels(), [4, 1, 5, 2, 6, 3])
+        self.assertEqual(self.transformed(("rotate", False)).getPixels(), [3, 6, 2, 5, 1, 4])
+        self.assertEqual(self.transformed(("rotate180",)).getPixels(), [6, 5, 4, 3, 2, 1])
+
+    def testFlip(self):
+        self.assertEqual(self.transformed(("flip", True)).getPixels(), [4, 5, 6, 1, 2, 3])
+        self.assertEqual(self.transformed(("flip", False)).getPixels(), [3, 2, 1, 6, 5, 4])
+
+    def testCrop(self):
+        image = self.transformed(("crop", 0, 1, 2, 3))
+        self.assertEqual((image.getNumCols(), image.getNumRows()), (2, 2))
+        self.assertEqual(image.getPixels(), [2, 3, 5, 6])
+
+    def testChainedViews(self):
+        image = self.transformed(("crop", 0, 1, 2, 3), ("flip", True), ("rotate", True))
+        self.assertEqual(image.getPixels(), [2, 5, 3, 6])
+
+    def testColourImage(self):
+        image = Netpbm.Netpbm(b"P3 2 1 255 1 2 3 4 5 6")
+        image.rotate(True)
+        self.assertEqual(image.getPixels(), [[1, 4], [2, 5], [3, 6]])
+        image.flip(True)
+        self.assertEqual(image.getPixels(), [[4, 1], [5, 2], [6, 3]])
+
+    def testFourRotationsGiveTheImageBack(self):
+        data = makeImage("P6", 7, 5)
+        image = Netpbm.Netpbm(data)
+        for i in range(4):
+            image.rotate(True)
+        self.assertEqual(image.getPixels(), Netpbm.Netpbm(data).getPixels())
+
+    def testCropOutsideTheImage(self):
+        for area in ((0, 0, 0, 3), (0, 0, 3, 3), (0, 0, 2, 4), (-1, 0, 2, 2), (1, 2, 0, 3)):
+            with self.assertRaises(ValueError):
+                Netpbm.Netpbm(SMALL).crop(*area)
+
+
+if __name__ == "__main__":
+    unittest.main()
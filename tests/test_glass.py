@@ -0,0 +1,90 @@
+import unittest
+
+from support import encodeImage, makeImage
+
+import Netpbm
+
+NUM_COLS = 6
+NUM_ROWS = 5
+
+
+#every pixel holds its own index, so the pixel a level came from can be told from the level;
+#the green and blue channels of a PPM are offset by 100 and 200
+def numbered(magic_number: str = "P2") -> Netpbm.Netpbm:
+    levels = list(range(NUM_COLS * NUM_ROWS))
+    if magic_number == "P3":
+        levels = [level + offset for level in levels for offset in (0, 100, 200)]
+    return Netpbm.Netpbm(encodeImage(magic_number, NUM_COLS, NUM_ROWS, 255, levels))
+
+
+class GlassTests(unittest.TestCase):
+
+    def testKnownResult(self):
+        data = encodeImage("P2", 4, 3, 255, list(range(12)))
+        for mode, expected in (("wrap", [5, 5, 5, 7, 4, 6, 7, 7, 7, 0, 3, 10]),
+                               ("clamp", [5, 5, 5, 7, 4, 6, 7, 7, 4, 8, 11, 10])):
+            image = Netpbm.Netpbm(data)
+            image.glass(1, mode, seed=1)
+            self.assertEqual(image.getPixels(), expected, mode)
+
+    def testSeedIsRepeatable(self):
+        results = []
+        for seed in (3, 3, 4):
+            image = Netpbm.Netpbm(makeImage("P6", 9, 7))
+            image.glass(2, seed=seed)
+            results.append(image.getPixels())
+        self.assertEqual(results[0], results[1])
+        self.assertNotEqual(results[0], results[2])
+
+    def testOffsetsStayWithinTheRadius(self):
+        radius = 1
+        for mode in ("wrap", "clamp"):
+            for seed in range(20):
+                image = numbered()
+                image.glass(radius, mode, seed=seed)
+                for index, level in enumerate(image.getPixels()):
+                    row, column = divmod(index, NUM_COLS)
+                    source_row, source_column = divmod(level, NUM_COLS)
+                    if mode == "wrap":
+                        row_offset = (source_row - row + radius) % NUM_ROWS - radius
+                        column_offset = (source_column - column + radius) % NUM_COLS - radius
+                    else:
+                        row_offset = source_row - row
+                        column_offset = source_column - column
+                    self.assertLessEqual(abs(row_offset), radius)
+                    self.assertLessEqual(abs(column_offset), radius)
+
+    def testEdgeModes(self):
+        #over enough seeds the corner pixel takes a level from the opposite edge only when wrapping
+        corners = {"wrap": set(), "clamp": set()}
+        for mode in corners:
+            for seed in range(30):
+                image = numbered()
+                image.glass(1, mode, seed=seed)
+                corners[mode].add(image.getPixels()[0])
+        self.assertEqual(corners["clamp"], {0, 1, NUM_COLS, NUM_COLS + 1})
+        self.assertIn(NUM_COLS * NUM_ROWS - 1, corners["wrap"])
+
+    def testChannelsMoveTogether(self):
+        image = numbered("P3")
+        image.glass(2, seed=5)
+        red, green, blue = image.getPixels()
+        self.assertEqual([level + 100 for level in red], green)
+        self.assertEqual([level + 200 for level in red], blue)
+
+    def testFlatImageIsUnchanged(self):
+        image = Netpbm.Netpbm(encodeImage("P2", 5, 4, 65535, [1234] * 20))
+        image.glass(3, "clamp", seed=0)
+        self.assertEqual(image.getPixels(), [1234] * 20)
+
+    def testZeroRadiusAndBadMode(self):
+        data = makeImage("P5", 4, 4)
+        image = Netpbm.Netpbm(data)
+        image.glass(0, seed=1)
+        self.assertEqual(image.getPixels(), Netpbm.Netpbm(data).getPixels())
+        with self.assertRaises(ValueError):
+            image.glass(1, "mirror")
+
+
+if __name__ == "__main__":
+    unittest.main()
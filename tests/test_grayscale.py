@@ -0,0 +1,65 @@
+import io
+import unittest
+
+from support import makeImage
+
+import Netpbm
+from Netpbm import NetpbmStream
+
+#(r*weight_r + g*weight_g + b*weight_b + 32768) >> 16 worked out for each pixel of COLOUR
+COLOUR = b"P3 3 1 255\n200 100 50 255 255 255 0 0 0\n"
+EXPECTED = {"rec709": [118, 255, 0], "rec601": [124, 255, 0], "average": [117, 255, 0]}
+
+
+def grayscale(data: bytes, *args, lazy: bool = False) -> Netpbm.Netpbm:
+    image = Netpbm.Netpbm(data, lazy=lazy)
+    image.toGrayscale(*args)
+    return image
+
+
+class GrayscaleTests(unittest.TestCase):
+
+    def testKnownLevels(self):
+        self.assertEqual(grayscale(COLOUR).getPixels(), EXPECTED["rec709"])
+        for standard, expected in EXPECTED.items():
+            image = grayscale(COLOUR, standard)
+            self.assertEqual(image.getPixels(), expected, standard)
+            self.assertEqual(image.getHeader(), ["P2", "", [3, 1], 255])
+
+    def testWeightsAddUpToOne(self):
+        for standard, weights in Netpbm.GRAY_WEIGHTS.items():
+            self.assertEqual(sum(weights), 1 << Netpbm.GRAY_BITS, standard)
+
+    def testSixteenBit(self):
+        #full red alone gives the red weight itself
+        data = b"P6 2 1 65535\n\xff\xff\x00\x00\x00\x00" + b"\x03\xe8\x07\xd0\x0b\xb8"
+        for standard, expected in (("rec709", [13933, 1860]), ("rec601", [19595, 1815]), ("average", [21845, 2000])):
+            image = grayscale(data, standard)
+            self.assertEqual(image.getPixels(), expected, standard)
+            self.assertEqual(image.getHeader(), ["P5", "", [2, 1], 65535])
+
+    def testEveryPathAgrees(self):
+        for magic_number, max_level in (("P3", 255), ("P6", 255), ("P6", 65535)):
+            data = makeImage(magic_number, 7, 5, max_level)
+            expected = grayscale(data, "rec601").getPixels()
+            self.assertEqual(grayscale(data, "rec601", lazy=True).getPixels(), expected)
+            decoded = Netpbm.Netpbm(data)
+            decoded.getPixels()
+            decoded.toGrayscale("rec601")
+            self.assertEqual(decoded.getPixels(), expected)
+            stream = NetpbmStream(data, strip_rows=2)
+            stream.toGrayscale("rec601")
+            output = io.BytesIO()
+            stream.writeImage(output)
+            self.assertEqual(Netpbm.Netpbm(output.getvalue()).getPixels(), expected)
+
+    def testGrayImagesAndUnknownStandards(self):
+        self.assertEqual(grayscale(b"P2 2 1 255\n3 4\n").getPixels(), [3, 4])
+        with self.assertRaises(ValueError):
+            grayscale(COLOUR, "rec2020")
+        with self.assertRaises(ValueError):
+            NetpbmStream(COLOUR).toGrayscale("rec2020")
+
+
+if __name__ == "__main__":
+    unittest.main()
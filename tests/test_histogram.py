@@ -0,0 +1,78 @@
+import unittest
+
+from support import encodeImage
+
+import Netpbm
+
+LEVELS = [1, 2, 2, 3, 5, 5, 5, 6]
+GRAY = encodeImage("P2", 4, 2, 7, LEVELS)
+COLOUR = b"P3 2 1 255\n10 0 50 20 100 50\n"
+
+
+def adjusted(data: bytes, operation: str, *args) -> list:
+    image = Netpbm.Netpbm(data)
+    getattr(image, operation)(*args)
+    return image.getPixels()
+
+
+class HistogramTests(unittest.TestCase):
+
+    def testHistogram(self):
+        self.assertEqual(Netpbm.Netpbm(GRAY).histogram(), (0, 1, 2, 1, 0, 3, 1, 0))
+        red, green, blue = Netpbm.Netpbm(COLOUR).histogram()
+        self.assertEqual((len(red), red[10], red[20], sum(red)), (256, 1, 1, 2))
+        self.assertEqual((green[0], green[100], blue[50]), (1, 1, 2))
+
+    def testHistogramFollowsChanges(self):
+        image = Netpbm.Netpbm(GRAY)
+        image.histogram()
+        image.invert()
+        self.assertEqual(image.histogram(), (0, 1, 3, 0, 1, 2, 1, 0))
+
+    def testStatistics(self):
+        statistics = Netpbm.Netpbm(GRAY).statistics()
+        self.assertEqual((statistics["min"], statistics["max"], statistics["mean"]), (1, 6, 3.625))
+        #the squared deviations from 3.625 add up to 23.875
+        self.assertAlmostEqual(statistics["std"], (23.875 / 8) ** 0.5)
+        self.assertEqual([(channel["min"], channel["max"], channel["mean"], channel["std"])
+                          for channel in Netpbm.Netpbm(COLOUR).statistics()],
+                         [(10, 20, 15.0, 5.0), (0, 100, 50.0, 50.0), (50, 50, 50.0, 0.0)])
+
+    def testPercentile(self):
+        image = Netpbm.Netpbm(GRAY)
+        self.assertEqual([image.percentile(percent) for percent in (0, 25, 50, 51, 100)], [1, 2, 3, 5, 6])
+        self.assertEqual(Netpbm.Netpbm(COLOUR).percentile(50), [10, 0, 50])
+        for percent in (-1, 101):
+            with self.assertRaises(ValueError):
+                image.percentile(percent)
+
+    def testAutoLevels(self):
+        #1 to 6 is stretched to 0 to 7: round((level - 1) * 7 / 5)
+        self.assertEqual(adjusted(GRAY, "autoLevels"), [0, 1, 1, 3, 6, 6, 6, 7])
+        #with 12.5% (one pixel) allowed to saturate the white level drops to 5
+        self.assertEqual(adjusted(GRAY, "autoLevels", 12.5), [0, 2, 2, 4, 7, 7, 7, 7])
+        self.assertEqual(adjusted(COLOUR, "autoLevels"), [[0, 255], [0, 255], [50, 50]])
+        #all channels together stretch 0 to 100
+        self.assertEqual(adjusted(COLOUR, "autoLevels", 0.0, False), [[26, 51], [0, 255], [128, 128]])
+
+    def testEqualize(self):
+        #the cumulative counts are 1, 3, 4, 7 and 8 at the levels used, and the first is mapped to 0
+        self.assertEqual(adjusted(GRAY, "equalize"), [0, 2, 2, 3, 6, 6, 6, 7])
+        self.assertEqual(adjusted(b"P2 2 1 255\n9 9\n", "equalize"), [9, 9])
+
+    def testThreshold(self):
+        self.assertEqual(adjusted(GRAY, "threshold", 5), [0, 0, 0, 0, 7, 7, 7, 7])
+        self.assertEqual(adjusted(GRAY, "threshold", 3), [0, 0, 0, 7, 7, 7, 7, 7])
+        #Otsu's method splits 1, 2, 2, 3 from 5, 5, 5, 6
+        self.assertEqual(adjusted(GRAY, "threshold"), [0, 0, 0, 0, 7, 7, 7, 7])
+
+    def testEmptyImage(self):
+        image = Netpbm.Netpbm(b"P2 0 0 255\n")
+        with self.assertRaises(ValueError):
+            image.statistics()
+        with self.assertRaises(ValueError):
+            image.percentile(50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import io
+import json
+import logging
+import os
+import unittest
+
+from support import TempDirTestCase
+
+import Netpbm
+
+DATA = b"P2\n2 1\n255\n10 20\n"
+
+
+class InstrumentationTests(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.records = []
+        self.filename = self.writeFile("in.pgm", DATA)
+
+    def tearDown(self):
+        Netpbm.setInstrumentation(None)
+        super().tearDown()
+
+    def summary(self) -> list:
+        #the calls made by the program and those that did I/O, leaving out the getters called inside
+        return [(record["operation"], record["depth"], record["num_cols"], record["num_rows"],
+                 record["bytes_read"], record["bytes_written"], record["error"]) for record in self.records
+                if record["depth"] == 0 or record["bytes_read"] > 0 or record["bytes_written"] > 0]
+
+    def operations(self) -> set:
+        return {record["operation"] for record in self.records}
+
+    def testKnownRecords(self):
+        Netpbm.setInstrumentation(self.records.append)
+        image = Netpbm.Netpbm(self.filename)
+        image.invert()
+        image.writeImage(os.path.join(self.directory, "out.pgm"))
+        self.assertEqual(self.summary(), [
+            ("Netpbm.readHeader", 1, None, None, 11, 0, None),
+            ("Netpbm.readPGMPixels", 1, 2, 1, 6, 0, None),
+            ("Netpbm.__init__", 0, 2, 1, 17, 0, None),
+            ("Netpbm.invert", 0, 2, 1, 0, 0, None),
+            ("Netpbm.writeHeader", 1, 2, 1, 0, 11, None),
+            ("Netpbm.writePixels", 1, 2, 1, 0, 8, None),
+            ("Netpbm.writeImage", 0, 2, 1, 0, 19, None),
+        ])
+        self.assertTrue(all(record["allocated_bytes"] is None and record["wall_seconds"] >= 0
+                            for record in self.records))
+
+    def testErrorsAreRecorded(self):
+        Netpbm.setInstrumentation(self.records.append)
+        image = Netpbm.Netpbm(self.filename)
+        with self.assertRaises(ValueError):
+            image.crop(5, 5, 6, 6)
+        self.assertEqual(self.records[-1]["operation"], "Netpbm.crop")
+        self.assertTrue(self.records[-1]["error"].startswith("ValueError: "))
+
+    def testEveryPublicMethodIsInstrumented(self):
+        for owner in (Netpbm.Netpbm, Netpbm.NetpbmStream):
+            public = {name for name, member in vars(owner).items()
+                      if not name.startswith("_") and callable(getattr(owner, name))}
+            self.assertLessEqual(public, set(Netpbm.INSTRUMENTED_METHODS[owner.__name__]), owner.__name__)
+        originals = {(owner, name): vars(owner)[name] for owner in (Netpbm.Netpbm, Netpbm.NetpbmStream)
+                     for name in Netpbm.INSTRUMENTED_METHODS[owner.__name__]}
+        Netpbm.setInstrumentation(self.records.append)
+        for (owner, name), original in originals.items():
+            self.assertIsNot(vars(owner)[name], original, name)
+
+    def testOperationsOnCopiesAndViews(self):
+        Netpbm.setInstrumentation(self.records.append)
+        image = Netpbm.Netpbm(self.filename)
+        image.copy().resize(4, 2)
+        image.getPixelView()
+        image.getRaster()
+        self.assertLessEqual({"Netpbm.copy", "Netpbm.resize", "Netpbm.getPixelView", "Netpbm.getRaster"},
+                             self.operations())
+
+    def testStreams(self):
+        Netpbm.setInstrumentation(self.records.append)
+        stream = Netpbm.NetpbmStream(self.filename)
+        stream.invert()
+        stream.resize(4, 2)
+        strips = list(stream.getStrips())
+        self.assertEqual(strips[0].getPixels(), [245, 245, 235, 235, 245, 245, 235, 235])
+        self.assertLessEqual({"NetpbmStream.__init__", "NetpbmStream.invert", "NetpbmStream.resize",
+                              "NetpbmStream.getStrips"}, self.operations())
+        self.assertIn(("NetpbmStream.resize", 0, 4, 2, 0, 0, None), self.summary())
+
+    def testAsyncCallsNestUnderTheirCoroutine(self):
+        Netpbm.setInstrumentation(self.records.append)
+
+        async def main():
+            image = await Netpbm.Netpbm.aopen(self.filename)
+            await image.arun("invert")
+            await image.awrite(io.BytesIO())
+
+        asyncio.run(main())
+        self.assertEqual(self.summary(), [
+            ("Netpbm.readHeader", 2, None, None, 11, 0, None),
+            ("Netpbm.readPGMPixels", 2, 2, 1, 6, 0, None),
+            ("Netpbm.__init__", 1, 2, 1, 17, 0, None),
+            ("Netpbm.aopen", 0, 2, 1, 17, 0, None),
+            ("Netpbm.arun", 0, 2, 1, 0, 0, None),
+            ("Netpbm.writeHeader", 2, 2, 1, 0, 11, None),
+            ("Netpbm.writePixels", 2, 2, 1, 0, 8, None),
+            ("Netpbm.writeImage", 1, 2, 1, 0, 19, None),
+            ("Netpbm.awrite", 0, 2, 1, 0, 19, None),
+        ])
+        self.assertIn(("Netpbm.invert", 1), [(record["operation"], record["depth"]) for record in self.records])
+
+    def testAllocations(self):
+        Netpbm.setInstrumentation(self.records.append, track_allocations=True)
+        Netpbm.Netpbm(self.filename)
+        self.assertTrue(all(isinstance(record["allocated_bytes"], int) for record in self.records))
+
+    def testTurningOffRestoresTheMethods(self):
+        original = Netpbm.Netpbm.__dict__["invert"]
+        sink = self.records.append
+        Netpbm.setInstrumentation(sink)
+        self.assertIsNot(Netpbm.Netpbm.__dict__["invert"], original)
+        self.assertIs(Netpbm.getInstrumentation(), sink)
+        Netpbm.setInstrumentation(None)
+        self.assertIs(Netpbm.Netpbm.__dict__["invert"], original)
+        Netpbm.Netpbm(self.filename).invert()
+        self.assertEqual(self.records, [])
+
+    def testSinks(self):
+        filename = os.path.join(self.directory, "records.jsonl")
+        sink = Netpbm.JsonLinesSink(filename)
+        Netpbm.setInstrumentation(sink)
+        Netpbm.Netpbm(self.filename).invert()
+        sink.close()
+        with open(filename, "r") as records_file:
+            operations = [json.loads(line)["operation"] for line in records_file]
+        self.assertEqual([operation for operation in operations if operation in ("Netpbm.__init__", "Netpbm.invert")],
+                         ["Netpbm.__init__", "Netpbm.invert"])
+        with self.assertLogs("Netpbm", logging.INFO) as logs:
+            Netpbm.setInstrumentation(Netpbm.LoggingSink())
+            Netpbm.Netpbm(self.filename).invert()
+        self.assertTrue(logs.output[-1].startswith("INFO:Netpbm:Netpbm.invert 2x1 wall="))
+        self.assertTrue(logs.output[-1].endswith(" read=0 written=0 allocated=None"))
+
+
+if __name__ == "__main__":
+    unittest.main()
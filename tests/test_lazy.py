@@ -0,0 +1,65 @@
+import unittest
+
+from support import makeImage
+
+import Netpbm
+
+
+class LazyTests(unittest.TestCase):
+
+    def testKnownResult(self):
+        image = Netpbm.Netpbm(b"P2 2 2 255\n1 2\n3 4\n", lazy=True)
+        image.rotate(True)
+        image.invert()
+        image.changeBrightness(-10)
+        self.assertEqual((image.getNumCols(), image.getNumRows()), (2, 2))
+        self.assertEqual(image.getPixels(), [242, 244, 241, 243])
+
+    def testHeaderChangesStraightAway(self):
+        image = Netpbm.Netpbm(makeImage("P6", 6, 4), lazy=True)
+        image.crop(0, 1, 3, 6)
+        image.rotate(False)
+        image.toGrayscale()
+        self.assertEqual(image.getHeader()[0], "P5")
+        self.assertEqual((image.getNumCols(), image.getNumRows()), (3, 5))
+
+    def testLazyMatchesEager(self):
+        data = makeImage("P6", 8, 6)
+        eager = Netpbm.Netpbm(data)
+        lazy = Netpbm.Netpbm(data, lazy=True)
+        for image in (eager, lazy):
+            image.changeBrightness(10)
+            image.rotate(True)
+            image.crop(1, 1, 5, 4)
+            image.gamma(1.5)
+            image.flip(False)
+            image.rotate180()
+            image.levels(10, 240, 0.8)
+            image.curves([(0, 0), (100, 200), (255, 255)])
+            image.invert()
+            image.toGrayscale()
+            image.posterize(8)
+        self.assertEqual(lazy.getHeader(), eager.getHeader())
+        self.assertEqual(lazy.getPixels(), eager.getPixels())
+        self.assertEqual(lazy.toBytes(), eager.toBytes())
+
+    def testTurningLazyModeOffRunsTheRecordedOperations(self):
+        image = Netpbm.Netpbm(b"P2 3 1 255 1 2 3", lazy=True)
+        image.flip(False)
+        image.invert()
+        image.setLazy(False)
+        image.changeBrightness(1)
+        self.assertEqual(image.getPixels(), [253, 254, 255])
+
+    def testCopiesKeepTheirOwnOperations(self):
+        image = Netpbm.Netpbm(b"P2 2 1 255 10 20", lazy=True)
+        image.invert()
+        copy = image.copy()
+        copy.flip(False)
+        image.changeBrightness(-5)
+        self.assertEqual(image.getPixels(), [240, 230])
+        self.assertEqual(copy.getPixels(), [235, 245])
+
+
+if __name__ == "__main__":
+    unittest.main()
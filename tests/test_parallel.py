@@ -0,0 +1,47 @@
+import unittest
+
+from support import encodeImage, makeImage
+
+import Netpbm
+
+
+class ParallelTests(unittest.TestCase):
+
+    def testKnownResult(self):
+        levels = list(range(0, 240, 5))
+        image = Netpbm.Netpbm(encodeImage("P2", 4, 12, 255, levels))
+        image.parallel("invert", workers=2, strip_rows=5)
+        self.assertEqual(image.getPixels(), [255 - level for level in levels])
+        image = Netpbm.Netpbm(encodeImage("P2", 3, 6, 255, [0, 0, 0, 0, 90, 0] * 3))
+        image.parallel("boxBlur", 1, workers=2, strip_rows=2)
+        #each 3x3 square takes in one or two of the rows holding a 90, an edge row counting twice
+        self.assertEqual(image.getPixels(), [10] * 6 + [20] * 3 + [10] * 3 + [20] * 6)
+
+    def testMatchesSerial(self):
+        data = makeImage("P6", 16, 40)
+        for operation, args in (("changeBrightness", (-30,)), ("gamma", (2.0,)), ("posterize", (5,)),
+                                ("gaussianBlur", (1.5,)), ("median", (1,)), ("sobel", ()),
+                                ("unsharpMask", (1.0, 2.0, 3)), ("toGrayscale", ("rec601",))):
+            serial = Netpbm.Netpbm(data)
+            getattr(serial, operation)(*args)
+            parallel = Netpbm.Netpbm(data)
+            parallel.parallel(operation, *args, workers=2, strip_rows=7)
+            self.assertEqual(parallel.getHeader(), serial.getHeader(), operation)
+            self.assertEqual(parallel.getPixels(), serial.getPixels(), operation)
+
+    def testSeededOperationsDoNotDependOnWorkers(self):
+        data = makeImage("P5", 12, 30)
+        results = []
+        for workers in (1, 3):
+            image = Netpbm.Netpbm(data)
+            image.parallel("glass", 2, workers=workers, strip_rows=5, seed=7)
+            results.append(image.getPixels())
+        self.assertEqual(results[0], results[1])
+
+    def testUnknownOperation(self):
+        with self.assertRaises(ValueError):
+            Netpbm.Netpbm(makeImage("P5", 2, 2)).parallel("rotate", workers=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
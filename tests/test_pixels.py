@@ -0,0 +1,53 @@
+import unittest
+from array import array
+
+from support import TempDirTestCase, encodeImage, makeImage
+
+import Netpbm
+
+
+class PixelStorageTests(TempDirTestCase):
+
+    def testPGMLevels(self):
+        image = Netpbm.Netpbm(b"P2\n# gray\n3 2\n15\n0 1 2\n13 14 15\n")
+        self.assertEqual(image.getHeader(), ["P2", "# gray", [3, 2], 15])
+        self.assertEqual(image.getPixels(), [0, 1, 2, 13, 14, 15])
+        self.assertEqual(image.getPixelView().format, "B")
+
+    def testPPMChannels(self):
+        image = Netpbm.Netpbm(b"P3 2 1 255 1 2 3 4 5 6\n")
+        self.assertEqual(image.getPixels(), [[1, 4], [2, 5], [3, 6]])
+        self.assertEqual([view.tolist() for view in image.getPixelView()], [[1, 4], [2, 5], [3, 6]])
+
+    def testSixteenBitLevels(self):
+        image = Netpbm.Netpbm(b"P2 2 1 65535 0 65535\n")
+        self.assertEqual(image.getPixels(), [0, 65535])
+        self.assertEqual(image.getPixelView().format, "H")
+
+    def testWriteImage(self):
+        filename = self.writeFile("in.pgm", b"P2\n2 2\n255\n10 20\n30 40\n")
+        image = Netpbm.Netpbm(filename)
+        output_filename = self.directory + "/out.pgm"
+        image.writeImage(output_filename)
+        with open(output_filename, "rb") as output_file:
+            self.assertEqual(output_file.read(), b"P2\n2 2\n255\n10 20\n30 40\n")
+
+    def testEveryPlainFormatRoundTrips(self):
+        for magic_number in ("P2", "P3"):
+            for max_level in (1, 255, 1000, 65535):
+                data = makeImage(magic_number, 7, 5, max_level)
+                image = Netpbm.Netpbm(data)
+                again = Netpbm.Netpbm(image.toBytes())
+                self.assertEqual(again.getHeader(), image.getHeader())
+                self.assertEqual(again.getPixels(), image.getPixels())
+
+    def testStoredArrays(self):
+        samples = list(range(12))
+        image = Netpbm.Netpbm(encodeImage("P3", 2, 2, 300, samples))
+        self.assertEqual(image.getPixels(), [samples[0::3], samples[1::3], samples[2::3]])
+        self.assertEqual([view.format for view in image.getPixelView()], ["H", "H", "H"])
+        self.assertIsInstance(image.getPixels()[0], (list, array))
+
+
+if __name__ == "__main__":
+    unittest.main()
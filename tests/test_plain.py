@@ -0,0 +1,69 @@
+import io
+import random
+import unittest
+
+from support import TempDirTestCase, encodeImage
+
+import Netpbm
+
+
+class PlainParserTests(TempDirTestCase):
+
+    def testCommentsAnywhere(self):
+        data = b"P2\n# one\n3 # two\n2\n# three\n9\n1 2#four\n3\n# five\n4 5 6 # six\n"
+        image = Netpbm.Netpbm(data)
+        self.assertEqual(image.getComment(), "# one")
+        self.assertEqual(image.getPixels(), [1, 2, 3, 4, 5, 6])
+
+    def testAnyWhitespace(self):
+        image = Netpbm.Netpbm(b"P2 2 2 255\r\n1\t2\r\n\v3\f4")
+        self.assertEqual(image.getPixels(), [1, 2, 3, 4])
+
+    def testLeadingZeros(self):
+        self.assertEqual(Netpbm.Netpbm(b"P2 3 1 255\n007 010 0\n").getPixels(), [7, 10, 0])
+
+    def testPayloadLargerThanAChunk(self):
+        rng = random.Random(5)
+        samples = [rng.randint(0, 65535) for i in range(3 * 200 * 150)]
+        lines = []
+        for start in range(0, len(samples), 600):
+            lines.append(" ".join(map(str, samples[start:start + 600])))
+            lines.append("# a comment between lines")
+        data = b"P3\n200 150\n65535\n" + "\n".join(lines).encode()
+        self.assertGreater(len(data), Netpbm.CHUNK_SIZE)
+        self.assertEqual(Netpbm.Netpbm(data).getPixels(), [samples[0::3], samples[1::3], samples[2::3]])
+
+    def testSingleLinePayload(self):
+        samples = [i % 256 for i in range(Netpbm.CHUNK_SIZE // 2)]
+        data = encodeImage("P2", len(samples), 1, 255, samples).rstrip()
+        self.assertEqual(Netpbm.Netpbm(data).getPixels(), samples)
+
+    def testTruncatedPayload(self):
+        for data in (b"P2 2 2 255\n1 2 3\n", b"P3 2 1 255\n1 2 3 4 5\n", b"P2 2 2 255\n"):
+            with self.assertRaisesRegex(ValueError, "truncated"):
+                Netpbm.Netpbm(data)
+        filename = self.writeFile("short.pgm", b"P2 2 2 255\n1 2 3\n")
+        with self.assertRaisesRegex(ValueError, "truncated"):
+            Netpbm.Netpbm(filename)
+
+    def testExtraSamples(self):
+        for data in (b"P2 2 1 255\n1 2 3\n", b"P3 1 1 255\n1 2 3\n# comment\n4\n"):
+            with self.assertRaisesRegex(ValueError, "more samples"):
+                Netpbm.Netpbm(data)
+        filename = self.writeFile("long.pgm", b"P2 2 1 255\n1 2\n3\n")
+        with self.assertRaisesRegex(ValueError, "more samples"):
+            Netpbm.Netpbm(filename)
+
+    def testReadersStopAtTheEndOfThePayload(self):
+        data = b"P2 2 1 255\n1 2\n# between\nP2 1 1 255\n9\n"
+        filename = self.writeFile("two.pgm", data)
+        with open(filename, "rb") as image_file:
+            self.assertEqual(Netpbm.Netpbm(image_file).getPixels(), [1, 2])
+            self.assertEqual(Netpbm.Netpbm(image_file).getPixels(), [9])
+        source = io.BytesIO(data)
+        self.assertEqual(Netpbm.Netpbm(source).getPixels(), [1, 2])
+        self.assertEqual(Netpbm.Netpbm(source).getPixels(), [9])
+
+
+if __name__ == "__main__":
+    unittest.main()
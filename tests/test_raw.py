@@ -0,0 +1,75 @@
+import os
+import unittest
+
+from support import TempDirTestCase, makeImage
+
+import Netpbm
+
+
+class RawTests(TempDirTestCase):
+
+    def testRawPGM(self):
+        image = Netpbm.Netpbm(b"P5\n3 1\n255\n\x00\x7f\xff")
+        self.assertEqual(image.getPixels(), [0, 127, 255])
+        self.assertTrue(image.isBinary())
+        self.assertEqual(bytes(image.getRaster()), b"\x00\x7f\xff")
+
+    def testRawPPM(self):
+        image = Netpbm.Netpbm(b"P6 2 1 255\n\x01\x02\x03\x04\x05\x06")
+        self.assertEqual(image.getPixels(), [[1, 4], [2, 5], [3, 6]])
+
+    def testSixteenBitSamplesAreBigEndian(self):
+        image = Netpbm.Netpbm(b"P5 2 1 1000\n\x03\xe8\x01\x02")
+        self.assertEqual(image.getPixels(), [1000, 258])
+        self.assertEqual(image.toBytes(), b"P5\n2 1\n1000\n\x03\xe8\x01\x02")
+
+    def testPlainToRaw(self):
+        image = Netpbm.Netpbm(b"P3 2 1 255 1 2 3 4 5 6\n")
+        self.assertEqual(image.toBytes(binary=True), b"P6\n2 1\n255\n\x01\x02\x03\x04\x05\x06")
+        raw = Netpbm.Netpbm(b"P6 2 1 255\n\x01\x02\x03\x04\x05\x06")
+        self.assertEqual(raw.toBytes(binary=False), b"P3\n2 1\n255\n1 2 3 4 5 6\n")
+
+    def testMappedFileRoundTrip(self):
+        for magic_number in ("P5", "P6"):
+            for max_level in (255, 65535):
+                data = makeImage(magic_number, 9, 4, max_level)
+                filename = self.writeFile("in.pnm", data)
+                image = Netpbm.Netpbm(filename)
+                output_filename = os.path.join(self.directory, "out.pnm")
+                image.writeImage(output_filename)
+                with open(output_filename, "rb") as output_file:
+                    self.assertEqual(Netpbm.Netpbm(output_file.read()).getPixels(),
+                                     Netpbm.Netpbm(data).getPixels())
+
+    def testChangedRawImage(self):
+        image = Netpbm.Netpbm(b"P5 2 1 255\n\x00\x10")
+        image.invert()
+        self.assertEqual(bytes(image.getRaster()), b"\xff\xef")
+
+    def testTruncatedRawPayload(self):
+        with self.assertRaises(ValueError):
+            Netpbm.Netpbm(b"P6 2 2 255\n" + bytes(11)).getPixels()
+        filename = self.writeFile("short.ppm", b"P6 2 2 255\n" + bytes(11))
+        with self.assertRaises(ValueError):
+            Netpbm.Netpbm(filename).getPixels()
+
+    def testBadMagicNumber(self):
+        with self.assertRaises(ValueError):
+            Netpbm.Netpbm(b"P9\n1 1\n255\n0\n")
+
+    def testTextFilehandles(self):
+        filename = self.writeFile("plain.pgm", b"P2 2 1 255\n1 2\n")
+        with open(filename, "r") as text_file:
+            with self.assertRaises(TypeError):
+                Netpbm.Netpbm(text_file)
+            with self.assertRaises(TypeError):
+                Netpbm.NetpbmStream(text_file)
+            image = Netpbm.Netpbm(filename)
+            for reader in (image.readHeader, image.readRaster, image.readPGMPixels, image.readPPMPixels):
+                with self.assertRaises(TypeError):
+                    reader(text_file)
+            self.assertEqual(text_file.tell(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import io
+import unittest
+
+from support import TempDirTestCase, makeImage
+
+import Netpbm
+
+REGIONS = ((0, 0, 1, 1), (2, 3, 5, 9), (0, 0, 6, 11), (5, 10, 6, 11), (1, 0, 4, 11))
+
+
+class RegionTests(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Netpbm.setRowIndex(stride=2)
+
+    def tearDown(self):
+        Netpbm.setRowIndex()
+        super().tearDown()
+
+    def testKnownRegion(self):
+        image = Netpbm.Netpbm(b"P2 3 3 255\n1 2 3\n4 5 6\n7 8 9\n", region=(1, 1, 3, 3))
+        self.assertEqual(image.getHeader()[2], [2, 2])
+        self.assertEqual(image.getPixels(), [5, 6, 8, 9])
+        image = Netpbm.Netpbm(b"P6 2 2 255\n" + bytes(range(12)), region=(1, 0, 2, 1))
+        self.assertEqual(image.getPixels(), [[6], [7], [8]])
+
+    def testMatchesCrop(self):
+        for magic_number, max_level in (("P2", 255), ("P3", 255), ("P5", 255), ("P6", 255), ("P2", 65535),
+                                        ("P6", 65535)):
+            data = makeImage(magic_number, 11, 6, max_level)
+            filename = self.writeFile(f"image{magic_number}{max_level}.pnm", data)
+            for region in REGIONS:
+                expected = Netpbm.Netpbm(data)
+                expected.crop(*region)
+                for source in (filename, data, io.BytesIO(data)):
+                    image = Netpbm.Netpbm(source, region=region)
+                    self.assertEqual(image.getHeader(), expected.getHeader(), (magic_number, region))
+                    self.assertEqual(image.getPixels(), expected.getPixels(), (magic_number, region))
+
+    def testLazyRegion(self):
+        data = makeImage("P3", 11, 6)
+        image = Netpbm.Netpbm(data, lazy=True, region=(2, 3, 5, 9))
+        image.invert()
+        expected = Netpbm.Netpbm(data)
+        expected.crop(2, 3, 5, 9)
+        expected.invert()
+        self.assertEqual(image.getPixels(), expected.getPixels())
+
+    def testBadRegions(self):
+        filename = self.writeFile("image.pgm", makeImage("P2", 4, 3))
+        for region in ((0, 0, 0, 1), (0, 0, 4, 4), (-1, 0, 1, 1), (2, 2, 1, 3), (0, 0, 3, 5)):
+            for source in (filename, makeImage("P5", 4, 3)):
+                with self.assertRaises(ValueError, msg=region):
+                    Netpbm.Netpbm(source, region=region)
+
+
+if __name__ == "__main__":
+    unittest.main()
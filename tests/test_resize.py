@@ -0,0 +1,76 @@
+import io
+import unittest
+
+from support import encodeImage, makeImage
+
+import Netpbm
+from Netpbm import NetpbmStream
+
+ROW = b"P2 4 1 255\n0 10 20 30\n"
+SQUARE = encodeImage("P2", 4, 4, 255, list(range(0, 160, 10)))
+
+
+def resized(data: bytes, *args) -> list:
+    image = Netpbm.Netpbm(data)
+    image.resize(*args)
+    return image.getPixels()
+
+
+class ResizeTests(unittest.TestCase):
+
+    def testNearest(self):
+        #output pixel centres fall on source positions 0.5 and 2.5, which round up
+        self.assertEqual(resized(ROW, 2, 1, "nearest"), [10, 30])
+        self.assertEqual(resized(ROW, 8, 1, "nearest"), [0, 0, 10, 10, 20, 20, 30, 30])
+
+    def testBilinear(self):
+        self.assertEqual(resized(ROW, 2, 1, "bilinear"), [5, 25])
+        #source positions -0.25, 0.25, 0.75 ... 3.25, clamped at the edges
+        self.assertEqual(resized(ROW, 8, 1, "bilinear"), [0, 3, 8, 13, 18, 23, 28, 30])
+
+    def testArea(self):
+        self.assertEqual(resized(ROW, 2, 1), [5, 25])
+        #each output pixel covers one and a half source pixels: 30 * 0.5 / 1.5 and (15 + 60) / 1.5
+        self.assertEqual(resized(b"P2 3 1 255\n0 30 60\n", 2, 1), [10, 50])
+        self.assertEqual(resized(SQUARE, 2, 2), [25, 45, 105, 125])
+        self.assertEqual(resized(SQUARE, 1, 1), [75])
+        image = Netpbm.Netpbm(SQUARE)
+        image.resize(3, 2)
+        self.assertEqual(image.getHeader()[2], [3, 2])
+
+    def testColourAndSixteenBit(self):
+        self.assertEqual(resized(b"P3 2 1 255\n0 10 20 100 110 120\n", 1, 1), [[50], [60], [70]])
+        self.assertEqual(resized(b"P2 2 1 65535\n0 65535\n", 1, 1, "area"), [32768])
+
+    def testMipmaps(self):
+        image = Netpbm.Netpbm(SQUARE)
+        self.assertEqual([(level.getNumCols(), level.getNumRows(), level.getPixels()) for level in image.mipmaps()],
+                         [(2, 2, [25, 45, 105, 125]), (1, 1, [75])])
+        self.assertEqual(image.getNumCols(), 4)
+        levels = Netpbm.Netpbm(makeImage("P6", 5, 2)).mipmaps()
+        self.assertEqual([(level.getNumCols(), level.getNumRows()) for level in levels], [(2, 1), (1, 1)])
+        self.assertEqual(len(Netpbm.Netpbm(makeImage("P5", 16, 16)).mipmaps(4)), 2)
+
+    def testBadArguments(self):
+        for args in ((0, 1), (1, 0), (-2, 2), (2, 2, "cubic")):
+            with self.assertRaises(ValueError, msg=args):
+                Netpbm.Netpbm(ROW).resize(*args)
+            with self.assertRaises(ValueError, msg=args):
+                NetpbmStream(ROW).resize(*args)
+
+    def testStreamMatchesInMemory(self):
+        data = makeImage("P6", 13, 11)
+        for args in ((5, 4, "area"), (20, 17, "bilinear"), (6, 30, "nearest")):
+            stream = NetpbmStream(data, strip_rows=3)
+            stream.resize(*args)
+            output = io.BytesIO()
+            stream.writeImage(output)
+            image = Netpbm.Netpbm(data)
+            image.resize(*args)
+            streamed = Netpbm.Netpbm(output.getvalue())
+            self.assertEqual(streamed.getHeader()[2], image.getHeader()[2], args)
+            self.assertEqual(streamed.getPixels(), image.getPixels(), args)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import unittest
+
+from support import TempDirTestCase, makeImage
+
+import Netpbm
+
+
+class RotateFileTests(TempDirTestCase):
+
+    def testKnownRotation(self):
+        filename = self.writeFile("in.pgm", b"P5 3 2 255\n\x01\x02\x03\x04\x05\x06")
+        destination = os.path.join(self.directory, "out.pgm")
+        for degrees, expected in ((90, b"\x04\x01\x05\x02\x06\x03"), (180, b"\x06\x05\x04\x03\x02\x01"),
+                                  (270, b"\x03\x06\x02\x05\x01\x04")):
+            Netpbm.Netpbm.rotateFile(filename, destination, degrees)
+            image = Netpbm.Netpbm(destination)
+            self.assertEqual(bytes(image.getRaster()), expected, degrees)
+            self.assertEqual(image.getNumCols(), 3 if degrees == 180 else 2)
+
+    def testMatchesRotate(self):
+        for magic_number, max_level in (("P6", 255), ("P5", 65535)):
+            filename = self.writeFile("in.pnm", makeImage(magic_number, 5, 3, max_level))
+            for degrees in (90, 180, 270):
+                destination = os.path.join(self.directory, f"rotated{degrees}.pnm")
+                Netpbm.Netpbm.rotateFile(filename, destination, degrees)
+                image = Netpbm.Netpbm(filename)
+                for i in range(degrees // 90):
+                    image.rotate(True)
+                self.assertEqual(Netpbm.Netpbm(destination).getPixels(), image.getPixels())
+
+    def testRotateOntoItself(self):
+        data = makeImage("P6", 3, 2)
+        filename = self.writeFile("image.ppm", data)
+        os.link(filename, os.path.join(self.directory, "link.ppm"))
+        for destination in (filename, os.path.join(self.directory, ".", "image.ppm"),
+                            os.path.join(self.directory, "link.ppm")):
+            with self.assertRaises(ValueError):
+                Netpbm.Netpbm.rotateFile(filename, destination)
+        with open(filename, "rb") as image_file:
+            self.assertEqual(image_file.read(), data)
+
+    def testBadArguments(self):
+        filename = self.writeFile("plain.pgm", makeImage("P2", 2, 2))
+        with self.assertRaises(ValueError):
+            Netpbm.Netpbm.rotateFile(filename, os.path.join(self.directory, "out.pgm"))
+        with self.assertRaises(ValueError):
+            Netpbm.Netpbm.rotateFile(filename, os.path.join(self.directory, "out.pgm"), 45)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import unittest
+from array import array
+
+from support import TempDirTestCase, makeImage
+
+import Netpbm
+
+#rows 0 and 2 of both start 11 and 23 bytes in, though BROKEN breaks its lines in the middle of rows
+LINES = b"P2 3 4 255\n1 2 3\n4 5 6\n7 8 9\n10 11 12\n"
+BROKEN = b"P2 3 4 255\n1 2 3 4\n5 6 7 8 9 10 11 12\n"
+
+
+class RowIndexTests(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Netpbm.setRowIndex(stride=2)
+
+    def tearDown(self):
+        Netpbm.setRowIndex()
+        super().tearDown()
+
+    def readIndex(self, filename: str) -> tuple:
+        with open(filename + ".rowidx", "rb") as index_file:
+            data = index_file.read()
+        fields = Netpbm.ROW_INDEX_HEADER.unpack_from(data)
+        return fields[2:], array("Q", data[Netpbm.ROW_INDEX_HEADER.size:]).tolist()
+
+    def testKnownIndex(self):
+        for name, data in (("lines.pgm", LINES), ("broken.pgm", BROKEN)):
+            filename = self.writeFile(name, data)
+            Netpbm.buildRowIndex(filename)
+            self.assertEqual(self.readIndex(filename), ((len(data), 2, 4, 3), [11, 23]), name)
+            self.assertEqual(Netpbm.Netpbm(filename, region=(2, 1, 4, 3)).getPixels(), [8, 9, 11, 12])
+
+    def testIndexIsRebuiltWhenTheFileChanges(self):
+        filename = self.writeFile("image.pgm", LINES)
+        self.assertEqual(Netpbm.Netpbm(filename, region=(3, 0, 4, 3)).getPixels(), [10, 11, 12])
+        data = b"P2 3 4 255\n1 2 3 4 5 6\n70 80 90 100 110 120\n"
+        self.rewriteFile(filename, data)
+        self.assertEqual(Netpbm.Netpbm(filename, region=(3, 0, 4, 3)).getPixels(), [100, 110, 120])
+        self.assertEqual(self.readIndex(filename), ((len(data), 2, 4, 3), [11, 23]))
+
+    def testDamagedIndexFileIsRebuilt(self):
+        filename = self.writeFile("image.pgm", BROKEN)
+        Netpbm.buildRowIndex(filename)
+        with open(filename + ".rowidx", "r+b") as index_file:
+            index_file.write(b"NOTANIDX")
+        Netpbm.setRowIndex(stride=2) #forget the index held in memory
+        self.assertEqual(Netpbm.Netpbm(filename, region=(2, 0, 4, 3)).getPixels(), [7, 8, 9, 10, 11, 12])
+        self.assertEqual(self.readIndex(filename), ((len(BROKEN), 2, 4, 3), [11, 23]))
+
+    def testMatchesFullLoad(self):
+        data = makeImage("P3", 9, 23)
+        filename = self.writeFile("image.ppm", data)
+        for stride in (1, 4, 50):
+            Netpbm.setRowIndex(stride=stride)
+            for region in ((0, 0, 23, 9), (5, 2, 6, 7), (13, 0, 23, 9)):
+                expected = Netpbm.Netpbm(data)
+                expected.crop(*region)
+                self.assertEqual(Netpbm.Netpbm(filename, region=region).getPixels(), expected.getPixels())
+            self.assertEqual(Netpbm.Netpbm(filename, workers=2).getPixels(), Netpbm.Netpbm(data).getPixels())
+
+    def testWithoutPersisting(self):
+        Netpbm.setRowIndex(stride=2, persist=False)
+        filename = self.writeFile("image.pgm", LINES)
+        Netpbm.buildRowIndex(filename)
+        raw = self.writeFile("image.ppm", makeImage("P6", 2, 2))
+        Netpbm.setRowIndex()
+        Netpbm.buildRowIndex(raw)
+        self.assertEqual(sorted(os.listdir(self.directory)), ["image.pgm", "image.ppm"])
+        with self.assertRaises(ValueError):
+            Netpbm.setRowIndex(stride=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
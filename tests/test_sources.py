@@ -0,0 +1,103 @@
+import io
+import os
+import subprocess
+import sys
+import threading
+import tracemalloc
+import unittest
+
+from support import makeImage
+
+import Netpbm
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SourceTests(unittest.TestCase):
+
+    def testBytesSources(self):
+        data = b"P2 3 1 255\n1 2 3\n"
+        for source in (data, bytearray(data), memoryview(data), io.BytesIO(data)):
+            self.assertEqual(Netpbm.Netpbm(source).getPixels(), [1, 2, 3], type(source))
+
+    def testConcatenatedImages(self):
+        images = [b"P2 2 1 255\n1 2\n", b"P3 1 1 255 3 4 5 ", b"P5 2 1 255\n\x06\x07", makeImage("P6", 3, 2),
+                  b"P2 1 1 65535\n8\n"]
+        source = io.BytesIO(b"".join(images))
+        for data in images:
+            self.assertEqual(Netpbm.Netpbm(source).getPixels(), Netpbm.Netpbm(data).getPixels())
+        self.assertEqual(source.read(), b"")
+
+    def testStreamFromAFileObject(self):
+        source = io.BytesIO(makeImage("P2", 4, 4) + b"P2 1 1 255\n9\n")
+        stream = Netpbm.NetpbmStream(source, strip_rows=2)
+        stream.invert()
+        output = io.BytesIO()
+        stream.writeImage(output)
+        expected = Netpbm.Netpbm(makeImage("P2", 4, 4))
+        expected.invert()
+        self.assertEqual(Netpbm.Netpbm(output.getvalue()).getPixels(), expected.getPixels())
+        self.assertEqual(Netpbm.Netpbm(source).getPixels(), [9])
+
+    def readFromPipe(self, data: bytes, buffering: int, count: int) -> list:
+        read_end, write_end = os.pipe()
+
+        def write():
+            with open(write_end, "wb") as pipe:
+                pipe.write(data)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            with open(read_end, "rb", buffering=buffering) as pipe:
+                images = [Netpbm.Netpbm(pipe) for i in range(count)]
+                self.assertEqual(pipe.read(), b"")
+        finally:
+            writer.join()
+        return images
+
+    def testConcatenatedImagesFromPipes(self):
+        #the plain images end part way through a line, so the next image starts on the same line
+        images = [b"P2 2 1 255 1 2 P3 1 1 255 3 4 5 ", b"P5 2 1 255\n\x06\x07", makeImage("P6", 3, 2),
+                  b"P2 1 1 65535\n8\n"]
+        expected = [[1, 2], [[3], [4], [5]], [6, 7], Netpbm.Netpbm(images[2]).getPixels(), [8]]
+        for buffering in (-1, 0):
+            loaded = self.readFromPipe(b"".join(images), buffering, len(expected))
+            self.assertEqual([image.getPixels() for image in loaded], expected, buffering)
+
+    def testOneLineImageFromAPipe(self):
+        levels = Netpbm.Netpbm(makeImage("P2", 500, 500)).getPixels()
+        data = b"P2 500 500 255 " + " ".join(map(str, levels)).encode() + b" P2 1 1 255 9"
+        tracemalloc.start()
+        try:
+            first, second = self.readFromPipe(data, -1, 2)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(first.getPixels(), levels)
+        self.assertEqual(second.getPixels(), [9])
+        #the payload is about 0.9 MB of text; splitting all of it at once would take over 10 MB
+        self.assertLess(peak, 4_000_000)
+
+    def testToBytesAndFileObjects(self):
+        image = Netpbm.Netpbm(b"P2 2 1 1000\n5 999\n")
+        self.assertEqual(image.toBytes(), b"P2\n2 1\n1000\n5 999\n")
+        self.assertEqual(image.toBytes(True), b"P5\n2 1\n1000\n\x00\x05\x03\xe7")
+        output = io.BytesIO()
+        image.writeImage(output)
+        self.assertEqual(output.getvalue(), image.toBytes())
+        self.assertFalse(output.closed)
+
+    def testRunFilter(self):
+        output = io.BytesIO()
+        Netpbm.runFilter(Netpbm.parseRecipe("invert,rotate=right"), b"P2 2 1 255\n10 20\n", output)
+        self.assertEqual(output.getvalue(), b"P2\n1 2\n255\n245\n235\n")
+
+    def testCommandLineFilter(self):
+        result = subprocess.run([sys.executable, os.path.join(REPOSITORY, "Netpbm.py"), "-", "--recipe", "invert",
+                                 "--binary"], input=b"P2 2 1 255\n10 20\n", capture_output=True, check=True)
+        self.assertEqual(result.stdout, b"P5\n2 1\n255\n\xf5\xeb")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import io
+import unittest
+
+from support import TempDirTestCase, makeImage
+
+import Netpbm
+from Netpbm import NetpbmStream
+
+
+def streamBytes(stream: NetpbmStream, binary: bool = None) -> bytes:
+    output_file = io.BytesIO()
+    stream.writeImage(output_file, binary)
+    return output_file.getvalue()
+
+
+class StreamTests(TempDirTestCase):
+
+    def testKnownOutput(self):
+        stream = NetpbmStream(b"P2 2 3 255\n0 10\n20 30\n40 255\n", strip_rows=2)
+        stream.invert()
+        stream.flip(False)
+        self.assertEqual(streamBytes(stream), b"P2\n2 3\n255\n245 255\n225 235\n0 215\n")
+
+    def testStripsHoldStripRows(self):
+        stream = NetpbmStream(makeImage("P6", 4, 10), strip_rows=4)
+        strips = list(stream.getStrips())
+        self.assertEqual([strip.getNumRows() for strip in strips], [4, 4, 2])
+        whole = Netpbm.Netpbm(makeImage("P6", 4, 10))
+        self.assertEqual(sum((strip.getPixels()[0] for strip in strips), []), list(whole.getPixels()[0]))
+
+    def testMatchesInMemory(self):
+        for magic_number in ("P2", "P3", "P5", "P6"):
+            data = makeImage(magic_number, 11, 70)
+            image = Netpbm.Netpbm(data)
+            stream = NetpbmStream(data, strip_rows=8)
+            for target in (image, stream):
+                target.changeBrightness(-20)
+                target.gamma(0.7)
+                target.levels(5, 250)
+                target.curves([(0, 10), (128, 100), (255, 240)])
+                target.flip(False)
+                target.posterize(16)
+                target.invert()
+            self.assertEqual(streamBytes(stream), image.toBytes(), magic_number)
+
+    def testFromFile(self):
+        filename = self.writeFile("in.ppm", makeImage("P3", 5, 9))
+        stream = NetpbmStream(filename, strip_rows=2)
+        stream.toGrayscale()
+        image = Netpbm.Netpbm(filename)
+        image.toGrayscale()
+        self.assertEqual(streamBytes(stream, True), image.toBytes(True))
+
+    def testVerticalFlipCannotBeStreamed(self):
+        with self.assertRaises(ValueError):
+            NetpbmStream(makeImage("P5", 2, 2)).flip(True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import io
+import unittest
+
+from support import encodeImage
+
+import Netpbm
+from Netpbm import NetpbmStream
+
+LEVELS = [0, 1, 50, 127, 128, 200, 254, 255]
+
+
+def grayImage(levels: list = LEVELS, max_level: int = 255) -> Netpbm.Netpbm:
+    return Netpbm.Netpbm(encodeImage("P2", len(levels), 1, max_level, levels))
+
+
+class ToneTests(unittest.TestCase):
+
+    def testChangeBrightness(self):
+        image = grayImage()
+        image.changeBrightness(10)
+        self.assertEqual(image.getPixels(), [10, 11, 60, 137, 138, 210, 255, 255])
+        image = grayImage()
+        image.changeBrightness(-60)
+        self.assertEqual(image.getPixels(), [0, 0, 0, 67, 68, 140, 194, 195])
+
+    def testInvert(self):
+        image = grayImage()
+        image.invert()
+        self.assertEqual(image.getPixels(), [255, 254, 205, 128, 127, 55, 1, 0])
+        image = grayImage([0, 1000, 65535], 65535)
+        image.invert()
+        self.assertEqual(image.getPixels(), [65535, 64535, 0])
+
+    def testGamma(self):
+        image = grayImage()
+        image.gamma(2.0)
+        self.assertEqual(image.getPixels(), [0, 16, 113, 180, 181, 226, 254, 255])
+
+    def testLevels(self):
+        image = grayImage()
+        image.levels(50, 200)
+        self.assertEqual(image.getPixels(), [0, 0, 0, 131, 133, 255, 255, 255])
+        image = grayImage()
+        image.levels(0, 255, 2.0)
+        self.assertEqual(image.getPixels(), [0, 16, 113, 180, 181, 226, 254, 255])
+
+    def testCurves(self):
+        image = grayImage()
+        image.curves([(255, 100), (0, 50)])
+        self.assertEqual(image.getPixels(), [50, 50, 60, 75, 75, 89, 100, 100])
+
+    def testPosterize(self):
+        image = grayImage()
+        image.posterize(4)
+        self.assertEqual(image.getMaxLevel(), 4)
+        self.assertEqual(image.getPixels(), [0, 0, 0, 1, 2, 3, 3, 3])
+
+    def testEveryChannel(self):
+        image = Netpbm.Netpbm(b"P3 1 1 255 10 20 30")
+        image.invert()
+        self.assertEqual(image.getPixels(), [[245], [235], [225]])
+
+    def testBadArguments(self):
+        image = grayImage()
+        for call in (lambda: image.gamma(0), lambda: image.gamma(-2),
+                     lambda: image.levels(100, 100), lambda: image.levels(200, 100),
+                     lambda: image.levels(0, 255, 0), lambda: image.curves([]),
+                     lambda: image.curves([(0, 256)]), lambda: image.curves([(0, 1, 2)])):
+            with self.assertRaises(ValueError):
+                call()
+        stream = NetpbmStream(encodeImage("P2", 2, 1, 255, [1, 2]))
+        with self.assertRaises(ValueError):
+            stream.gamma(0)
+        with self.assertRaises(ValueError):
+            stream.levels(3, 3)
+
+    def testLevelsOutsideTheRange(self):
+        for data in (b"P2\n2 1\n1000\n5 2000\n", b"P2 2 1 255\n5 300\n", b"P2 2 1 255\n5 -3\n",
+                     b"P5 2 1 1000\n\x00\x05\x07\xd0", b"P5 2 1 100\n\x05\x65", b"P6 1 1 7\n\x01\x02\x08"):
+            with self.assertRaises(ValueError, msg=data):
+                Netpbm.Netpbm(data).invert()
+            with self.assertRaises(ValueError, msg=data):
+                NetpbmStream(data).writeImage(io.BytesIO())
+        image = Netpbm.Netpbm(b"P5 2 1 1000\n\x00\x05\x03\xe8")
+        image.invert()
+        self.assertEqual(image.getPixels(), [995, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import copy
+import unittest
+
+from support import makeImage
+
+import Netpbm
+
+GRAY = b"P2 3 1 255\n1 2 3\n"
+COLOUR = b"P3 2 1 255\n1 2 3 4 5 6\n"
+
+
+class ViewTests(unittest.TestCase):
+
+    def testCopyIsIndependent(self):
+        for data in (GRAY, COLOUR, makeImage("P5", 3, 1), makeImage("P6", 2, 1)):
+            image = Netpbm.Netpbm(data)
+            duplicate = image.copy()
+            duplicate.invert()
+            inverted = duplicate.getPixels()
+            self.assertEqual(image.getPixels(), Netpbm.Netpbm(data).getPixels())
+            image.changeBrightness(1)
+            self.assertEqual(duplicate.getPixels(), inverted)
+
+    def testCopyKeepsTheHeader(self):
+        image = Netpbm.Netpbm(b"P2\n# one\n3 1\n255\n1 2 3\n")
+        duplicate = copy.deepcopy(image)
+        duplicate.crop(0, 0, 1, 2)
+        self.assertEqual(image.getHeader(), ["P2", "# one", [3, 1], 255])
+        self.assertEqual(duplicate.getHeader(), ["P2", "# one", [2, 1], 255])
+        self.assertEqual(copy.copy(image).getPixels(), [1, 2, 3])
+
+    def testCopyOfALazyImage(self):
+        image = Netpbm.Netpbm(GRAY, lazy=True)
+        image.invert()
+        duplicate = image.copy()
+        duplicate.invert()
+        self.assertEqual(image.getPixels(), [254, 253, 252])
+        self.assertEqual(duplicate.getPixels(), [1, 2, 3])
+
+    def testAccessorsReturnCopies(self):
+        image = Netpbm.Netpbm(COLOUR)
+        image.getPixels()[0][0] = 99
+        image.getHeader()[2][0] = 99
+        self.assertEqual(image.getPixels(), [[1, 4], [2, 5], [3, 6]])
+        self.assertEqual(image.getHeader()[2], [2, 1])
+
+    def testPixelViewIsReadOnly(self):
+        view = Netpbm.Netpbm(GRAY).getPixelView()
+        self.assertEqual((view.format, view.readonly, view.tolist()), ("B", True, [1, 2, 3]))
+        with self.assertRaises(TypeError):
+            view[0] = 9
+        views = Netpbm.Netpbm(makeImage("P6", 2, 1, 65535)).getPixelView()
+        self.assertEqual([view.format for view in views], ["H", "H", "H"])
+
+    def testPixelViewKeepsOldPixels(self):
+        image = Netpbm.Netpbm(GRAY)
+        view = image.getPixelView()
+        image.invert()
+        self.assertEqual(view.tolist(), [1, 2, 3])
+        self.assertEqual(image.getPixelView().tolist(), [254, 253, 252])
+
+    def testRaster(self):
+        image = Netpbm.Netpbm(COLOUR)
+        self.assertEqual(bytes(image.getRaster()), b"\x01\x02\x03\x04\x05\x06")
+        self.assertTrue(image.getRaster().readonly)
+        image = Netpbm.Netpbm(b"P5 2 1 1000\n\x00\x05\x03\xe8")
+        self.assertEqual(bytes(image.getRaster()), b"\x00\x05\x03\xe8")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import io
+import unittest
+
+from support import makeImage
+
+import Netpbm
+
+
+class WritePixelsTests(unittest.TestCase):
+
+    def testKnownPlainOutput(self):
+        image = Netpbm.Netpbm(b"P3 2 2 255 1 2 3 4 5 6 7 8 9 10 11 12")
+        self.assertEqual(image.toBytes(), b"P3\n2 2\n255\n1 2 3 4 5 6\n7 8 9 10 11 12\n")
+
+    def testLinesFitIn70Characters(self):
+        for magic_number in ("P2", "P3"):
+            for max_level in (9, 255, 65535):
+                image = Netpbm.Netpbm(makeImage(magic_number, 100, 3, max_level))
+                data = image.toBytes()
+                self.assertLessEqual(max(len(line) for line in data.split(b"\n")), Netpbm.PLAIN_LINE_LENGTH)
+                self.assertEqual(Netpbm.Netpbm(data).getPixels(), image.getPixels())
+
+    def testRowsStartOnNewLinesAndPixelsStayTogether(self):
+        image = Netpbm.Netpbm(b"P3 7 2 255 " + b" ".join([b"255"] * 42))
+        lines = image.toBytes().split(b"\n")[3:-1]
+        self.assertEqual([len(line.split()) for line in lines], [15, 6, 15, 6])
+
+    def testLineWidthOverride(self):
+        image = Netpbm.Netpbm(makeImage("P2", 10, 2))
+        lines = image.toBytes(line_width=4).split(b"\n")[4:]
+        self.assertEqual([len(line.split()) for line in lines], [4, 4, 4, 4, 4, 0])
+
+    def testWritePixelsToAFileObject(self):
+        image = Netpbm.Netpbm(b"P2 3 1 255 7 8 9")
+        output_file = io.BytesIO()
+        image.writePixels(output_file, False)
+        self.assertEqual(output_file.getvalue(), b"7 8 9\n")
+        output_file = io.BytesIO()
+        image.writePixels(output_file, True)
+        self.assertEqual(output_file.getvalue(), b"\x07\x08\x09")
+
+
+if __name__ == "__main__":
+    unittest.main()